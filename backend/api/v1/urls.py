@@ -1,4 +1,10 @@
-from chemicals.views import ChemicalRenderView, UserRegistrationView
+from chemicals.views import (
+    ChemicalBatchRenderView,
+    ChemicalRenderView,
+    ChemicalSdfRenderView,
+    ChemicalVariantsRenderView,
+    UserRegistrationView,
+)
 from django.urls import path
 from drf_spectacular.utils import extend_schema
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -21,4 +27,11 @@ urlpatterns = [
     path("auth/token/refresh/", TaggedTokenRefreshView.as_view(), name="token_refresh"),
     # Chemicals API
     path("answer/", ChemicalRenderView.as_view(), name="answer"),
+    path("answer/batch/", ChemicalBatchRenderView.as_view(), name="answer-batch"),
+    path("answer/sdf/", ChemicalSdfRenderView.as_view(), name="answer-sdf"),
+    path(
+        "answer/variants/",
+        ChemicalVariantsRenderView.as_view(),
+        name="answer-variants",
+    ),
 ]
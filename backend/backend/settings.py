@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 from configurations import Configuration
@@ -9,6 +10,12 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def default_process_workers(web_workers: str | None) -> int:
+    """CPUs per web worker; gunicorn starts one worker per CPU by default."""
+    cpus = os.cpu_count() or 1
+    return max(1, cpus // max(1, int(web_workers or cpus)))
+
+
 class Base(Configuration):
     """Base configuration with common settings."""
 
@@ -41,13 +48,15 @@ class Base(Configuration):
             "rest_framework_simplejwt.authentication.JWTAuthentication",
         ],
         "DEFAULT_THROTTLE_CLASSES": [
-            "rest_framework.throttling.AnonRateThrottle",
-            "rest_framework.throttling.UserRateThrottle",
+            "chemicals.throttling.SharedAnonRateThrottle",
+            "chemicals.throttling.SharedUserRateThrottle",
         ],
         "DEFAULT_THROTTLE_RATES": {
-            "anon": "100/hour",
-            "user": "1000/hour",
+            "anon": os.getenv("THROTTLE_ANON_RATE", "100/hour"),
+            "user": os.getenv("THROTTLE_USER_RATE", "1000/hour"),
         },
+        # "format" is a render option, not a DRF renderer override
+        "URL_FORMAT_OVERRIDE": None,
     }
 
     # JWT settings
@@ -88,6 +97,7 @@ class Base(Configuration):
     }
 
     MIDDLEWARE = [
+        "chemicals.middleware.MetricsMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -158,6 +168,168 @@ class Base(Configuration):
     # Default primary key field type
     DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+    # Tests keep caches, metrics and throttle state in a temporary directory
+    TEST_RUNNER = "chemicals.tests.runner.IsolatedPathsTestRunner"
+
+    # Chemical rendering
+    INDIGO_SESSION_MAX_RENDERS = int(os.getenv("INDIGO_SESSION_MAX_RENDERS", "1000"))
+
+    # In-memory render cache (bytes per worker, TTL in seconds, 0 = no expiry)
+    RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", "67108864"))
+    RENDER_CACHE_TTL = int(os.getenv("RENDER_CACHE_TTL", "3600"))
+
+    # Parsed and laid-out molecules per Indigo session (estimated bytes per
+    # worker), so other sizes and formats of a molecule only run the final
+    # render
+    RENDER_PREPARED_CACHE_MAX_BYTES = int(
+        os.getenv("RENDER_PREPARED_CACHE_MAX_BYTES", "16777216")
+    )
+
+    # SMILES Indigo rejected, remembered so repeats fail without parsing
+    RENDER_REJECTED_SMILES_CACHE_SIZE = int(
+        os.getenv("RENDER_REJECTED_SMILES_CACHE_SIZE", "10000")
+    )
+
+    # Host-wide render cache on local disk shared by all workers (0 = disabled)
+    RENDER_DISK_CACHE_DIR = os.getenv(
+        "RENDER_DISK_CACHE_DIR", str(MEDIA_ROOT / "render_cache")
+    )
+    RENDER_DISK_CACHE_MAX_BYTES = int(
+        os.getenv("RENDER_DISK_CACHE_MAX_BYTES", "1073741824")
+    )
+
+    # Process pool for batch rendering. Every gunicorn worker has its own
+    # pool, so the default splits the CPUs between GUNICORN_WORKERS workers
+    # instead of starting cpu_count processes in each of them
+    RENDER_PROCESS_WORKERS = int(
+        os.getenv(
+            "RENDER_PROCESS_WORKERS",
+            str(default_process_workers(os.getenv("GUNICORN_WORKERS"))),
+        )
+    )
+    RENDER_BATCH_MAX_ITEMS = int(os.getenv("RENDER_BATCH_MAX_ITEMS", "500"))
+    RENDER_VARIANTS_MAX_ITEMS = int(os.getenv("RENDER_VARIANTS_MAX_ITEMS", "10"))
+    RENDER_SDF_MAX_RECORDS = int(os.getenv("RENDER_SDF_MAX_RECORDS", "10000"))
+    RENDER_SDF_MAX_RECORD_BYTES = int(
+        os.getenv("RENDER_SDF_MAX_RECORD_BYTES", str(1024 * 1024))
+    )
+
+    # Pre-warming the render cache with popular RequestLog renders
+    RENDER_WARM_ON_START = os.getenv("RENDER_WARM_ON_START", "False").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    RENDER_WARM_TOP_N = int(os.getenv("RENDER_WARM_TOP_N", "500"))
+    RENDER_WARM_WINDOW_HOURS = float(os.getenv("RENDER_WARM_WINDOW_HOURS", "24"))
+    RENDER_WARM_TIME_BUDGET = float(os.getenv("RENDER_WARM_TIME_BUDGET", "10"))
+    RENDER_WARM_MAX_BYTES = int(
+        os.getenv("RENDER_WARM_MAX_BYTES", str(32 * 1024 * 1024))
+    )
+    RENDER_WARM_CONCURRENCY = int(os.getenv("RENDER_WARM_CONCURRENCY", "2"))
+
+    # Isolated rendering: run Indigo in supervised subprocesses per web worker
+    RENDER_ISOLATED = os.getenv("RENDER_ISOLATED", "False").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    # One subprocess per gunicorn thread, so no request thread waits for a
+    # worker that another thread holds
+    RENDER_WORKER_PROCESSES = int(
+        os.getenv("RENDER_WORKER_PROCESSES", os.getenv("GUNICORN_THREADS", "4"))
+    )
+    RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "10"))
+    RENDER_WORKER_MAX_TASKS = int(os.getenv("RENDER_WORKER_MAX_TASKS", "1000"))
+    RENDER_WORKER_MAX_RSS_MB = int(os.getenv("RENDER_WORKER_MAX_RSS_MB", "512"))
+
+    # Identical concurrent renders share one render; with a lock directory,
+    # workers also wait for each other and reuse the result from the disk cache
+    RENDER_SINGLE_FLIGHT = os.getenv("RENDER_SINGLE_FLIGHT", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    RENDER_SINGLE_FLIGHT_TIMEOUT = float(
+        os.getenv("RENDER_SINGLE_FLIGHT_TIMEOUT", str(RENDER_TIMEOUT))
+    )
+    RENDER_SINGLE_FLIGHT_LOCK_DIR = os.getenv("RENDER_SINGLE_FLIGHT_LOCK_DIR", "")
+
+    # Admission control: concurrent renders per worker (0 disables), how many
+    # more may wait and for how long before getting 503 + Retry-After.
+    # Renders estimated under RENDER_ADMISSION_CHEAP_COST ms skip it; waiters
+    # go cheapest first, each second of waiting counting as
+    # RENDER_ADMISSION_AGING ms less cost
+    RENDER_ADMISSION_MAX_CONCURRENT = int(
+        os.getenv("RENDER_ADMISSION_MAX_CONCURRENT", "4")
+    )
+    RENDER_ADMISSION_MAX_QUEUE = int(os.getenv("RENDER_ADMISSION_MAX_QUEUE", "16"))
+    RENDER_ADMISSION_QUEUE_TIMEOUT = float(
+        os.getenv("RENDER_ADMISSION_QUEUE_TIMEOUT", "2")
+    )
+    RENDER_ADMISSION_RETRY_AFTER = float(os.getenv("RENDER_ADMISSION_RETRY_AFTER", "1"))
+    RENDER_ADMISSION_CHEAP_COST = float(os.getenv("RENDER_ADMISSION_CHEAP_COST", "6"))
+    RENDER_ADMISSION_AGING = float(os.getenv("RENDER_ADMISSION_AGING", "250"))
+
+    # RequestLog writes: batched on a background thread unless disabled
+    # (set REQUEST_LOG_ASYNC=False for tests that assert on RequestLog rows)
+    REQUEST_LOG_ASYNC = os.getenv("REQUEST_LOG_ASYNC", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    REQUEST_LOG_QUEUE_SIZE = int(os.getenv("REQUEST_LOG_QUEUE_SIZE", "10000"))
+    REQUEST_LOG_BATCH_SIZE = int(os.getenv("REQUEST_LOG_BATCH_SIZE", "200"))
+    REQUEST_LOG_FLUSH_INTERVAL = float(os.getenv("REQUEST_LOG_FLUSH_INTERVAL", "1.0"))
+    REQUEST_LOG_SPILL_PATH = os.getenv("REQUEST_LOG_SPILL_PATH", "")
+
+    # RequestLog retention: raw rows older than this many days are pruned
+    # once rolled up into RequestLogDaily (0 keeps them forever)
+    REQUEST_LOG_RETENTION_DAYS = int(os.getenv("REQUEST_LOG_RETENTION_DAYS", "90"))
+    REQUEST_LOG_PRUNE_CHUNK_SIZE = int(
+        os.getenv("REQUEST_LOG_PRUNE_CHUNK_SIZE", "5000")
+    )
+    REQUEST_LOG_PRUNE_PAUSE = float(os.getenv("REQUEST_LOG_PRUNE_PAUSE", "0.1"))
+
+    # HTTP caching headers for GET renders
+    RENDER_CACHE_CONTROL = os.getenv("RENDER_CACHE_CONTROL", "public, max-age=86400")
+    RENDER_VARY_HEADERS = [
+        header
+        for header in os.getenv("RENDER_VARY_HEADERS", "Accept-Encoding").split(",")
+        if header
+    ]
+
+    # Throttle counters shared by all worker processes: a SQLite file on
+    # this host, or Redis (THROTTLE_BACKEND=redis, needs the redis package)
+    THROTTLE_BACKEND = os.getenv("THROTTLE_BACKEND", "sqlite")
+    THROTTLE_SQLITE_PATH = os.getenv(
+        "THROTTLE_SQLITE_PATH",
+        os.path.join(tempfile.gettempdir(), "chemical_treatment_throttle.sqlite3"),
+    )
+    THROTTLE_REDIS_URL = os.getenv("THROTTLE_REDIS_URL", "redis://localhost:6379/0")
+
+    # Per-stage request timings in a Server-Timing response header
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "False").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+    # Prometheus metrics: per-process snapshots merged on scrape
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+    METRICS_DIR = os.getenv(
+        "METRICS_DIR",
+        os.path.join(tempfile.gettempdir(), "chemical_treatment_metrics"),
+    )
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "2.0"))
+    # Bearer token Prometheus sends to /metrics; without it only staff
+    # users can read the metrics
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 
 class Development(Base):
     """Development configuration."""
@@ -1,4 +1,4 @@
-from chemicals.views import index_view
+from chemicals.views import index_view, metrics_view
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -12,6 +12,7 @@ from drf_spectacular.views import (
 urlpatterns = [
     path("", index_view, name="home"),
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     # API
     path("api/v1/", include("api.v1.urls")),
     # Documentation
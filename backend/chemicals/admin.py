@@ -1,6 +1,81 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters, ShowFacets
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 
-from .models import RequestLog
+from .admin_pagination import EstimatedCountPaginator, KeysetChangeList
+from .models import RequestLog, RequestLogDaily
+from .services import ChemicalRenderer
+
+
+class ImageFormatFilter(admin.SimpleListFilter):
+    """Filter on the supported formats instead of a DISTINCT over all rows."""
+
+    title = "image format"
+    parameter_name = "image_format"
+
+    def lookups(self, request, model_admin):
+        return [
+            (image_format, image_format.upper())
+            for image_format in ChemicalRenderer.SUPPORTED_FORMATS
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(image_format=self.value())
+        return queryset
+
+
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """User filter with an autocomplete box instead of a link per user."""
+
+    title = "user"
+    parameter_name = "user"
+    template = "admin/chemicals/autocomplete_filter.html"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.field = model._meta.get_field("user")
+        self.admin_site = model_admin.admin_site
+
+    def lookups(self, request, model_admin):
+        # Only the selected user is listed, so no query over all users.
+        user = self.selected_user()
+        return [(str(user.pk), str(user))] if user else []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            try:
+                return queryset.filter(user_id=self.value())
+            except (ValueError, ValidationError) as e:
+                raise IncorrectLookupParameters(e)
+        return queryset
+
+    def selected_user(self):
+        if not self.value():
+            return None
+        try:
+            return get_user_model().objects.filter(pk=self.value()).first()
+        except (ValueError, ValidationError):
+            return None
+
+    def widget(self):
+        select = AutocompleteSelect(
+            self.field,
+            self.admin_site,
+            attrs={"data-filter-parameter": self.parameter_name},
+        )
+        field = forms.ModelChoiceField(
+            queryset=get_user_model().objects.all(),
+            widget=select,
+            required=False,
+        )
+        return field.widget.render(self.parameter_name, self.value())
 
 
 @admin.register(RequestLog)
@@ -20,19 +95,28 @@ class RequestLogAdmin(admin.ModelAdmin):
     list_filter = [
         "method",
         "success",
-        "image_format",
-        "user",
+        ImageFormatFilter,
+        UserAutocompleteFilter,
         "created_at",
     ]
+    # Prefix match, backed by a trigram index on PostgreSQL; SMILES are
+    # case-sensitive, so no case folding either.
     search_fields = [
-        "smiles",
-        "user_agent",
-        "user__username",
+        "smiles__startswith",
+        "=user__username",
     ]
+    search_help_text = "SMILES prefix or exact username"
+    list_select_related = ["user"]
+    # Tables with millions of rows: no exact COUNT(*), no per-filter
+    # facet counts and no OFFSET paging.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = ShowFacets.NEVER
     readonly_fields = [
         "user",
         "method",
         "smiles",
+        "smiles_hash",
         "has_molfile",
         "width",
         "height",
@@ -40,12 +124,24 @@ class RequestLogAdmin(admin.ModelAdmin):
         "success",
         "error_message",
         "response_time_ms",
+        "stage_timings",
         "user_agent",
         "created_at",
     ]
-    date_hierarchy = "created_at"
     ordering = ["-created_at"]
 
+    @property
+    def media(self):
+        select = AutocompleteSelect(RequestLog._meta.get_field("user"), self.admin_site)
+        return (
+            super().media
+            + select.media
+            + forms.Media(js=["chemicals/admin/autocomplete_filter.js"])
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
     @admin.display(description="SMILES")
     def smiles_preview(self, obj):
         """Show truncated SMILES string."""
@@ -56,3 +152,43 @@ class RequestLogAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         """Disable manual creation of logs."""
         return False
+
+
+@admin.register(RequestLogDaily)
+class RequestLogDailyAdmin(admin.ModelAdmin):
+    """Read-only admin interface for daily RequestLog rollups."""
+
+    list_display = [
+        "day",
+        "image_format",
+        "user",
+        "requests",
+        "errors",
+        "latency_avg",
+        "p50_ms",
+        "p95_ms",
+        "p99_ms",
+        "max_ms",
+    ]
+    list_filter = [
+        "image_format",
+        "day",
+    ]
+    search_fields = [
+        "user__username",
+    ]
+    date_hierarchy = "day"
+    ordering = ["-day", "image_format"]
+
+    @admin.display(description="Avg (ms)")
+    def latency_avg(self, obj):
+        """Show the mean response time."""
+        avg = obj.latency_avg_ms
+        return "-" if avg is None else round(avg, 1)
+
+    def has_add_permission(self, request):
+        """Rollups are written by the rollup_request_logs command."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,138 @@
+import json
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ALL_VAR, ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+BEFORE_VAR = "before"
+AFTER_VAR = "after"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the PostgreSQL planner's row estimate as the count.
+
+    ``COUNT(*)`` over tens of millions of rows takes seconds; the estimate
+    comes from table statistics. Small results (below ``exact_threshold``
+    rows by estimate) and other databases are counted exactly.
+    """
+
+    exact_threshold = 10000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor != "postgresql":
+            return super().count
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < self.exact_threshold:
+            return super().count
+        self.estimated = True
+        return estimate
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Change list paginated by ``(created_at, id)`` keyset instead of OFFSET.
+
+    Pages are addressed by ``?before=<id>`` (older rows) and ``?after=<id>``
+    (newer rows), so deep pages cost the same as the first one. A custom
+    sort order or "show all" falls back to regular page numbers.
+    """
+
+    keyset_field = "created_at"
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset_before = _parse_id(request.GET.get(BEFORE_VAR))
+        self.keyset_after = _parse_id(request.GET.get(AFTER_VAR))
+        self.keyset = ORDER_VAR not in request.GET and ALL_VAR not in request.GET
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(BEFORE_VAR, None)
+        lookup_params.pop(AFTER_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Changing filters or search starts again from the newest rows.
+        new_params = {BEFORE_VAR: None, AFTER_VAR: None, **(new_params or {})}
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        if not self.keyset:
+            super().get_results(request)
+            return
+
+        # Only the total is shown, from the paginator's (estimated) count;
+        # the page itself never goes through an OFFSET query.
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        self.result_count = self.paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = (
+            self.root_queryset.count() if self.show_full_result_count else None
+        )
+        self.show_admin_actions = not self.show_full_result_count or bool(
+            self.full_result_count
+        )
+        self.can_show_all = self.result_count <= self.list_max_show_all
+
+        anchor = None
+        anchor_id = self.keyset_after or self.keyset_before
+        if anchor_id:
+            anchor = (
+                self.model._default_manager.filter(pk=anchor_id)
+                .values_list(self.keyset_field, flat=True)
+                .first()
+            )
+        field = self.keyset_field
+        rows = None
+        if anchor is not None and self.keyset_after:
+            # Walk forwards from the anchor, then show the page newest first.
+            newer = self.queryset.filter(
+                Q(**{f"{field}__gt": anchor})
+                | Q(**{field: anchor, "pk__gt": anchor_id})
+            ).order_by(field, "pk")
+            rows = list(newer[: self.list_per_page + 1])
+            has_newer, has_older = len(rows) > self.list_per_page, True
+            rows = rows[: self.list_per_page][::-1]
+            if not has_newer:
+                # Reached the newest rows: show a full first page instead.
+                anchor = rows = None
+        if rows is None:
+            queryset = self.queryset.order_by(f"-{field}", "-pk")
+            if anchor is not None:
+                queryset = queryset.filter(
+                    Q(**{f"{field}__lt": anchor})
+                    | Q(**{field: anchor, "pk__lt": anchor_id})
+                )
+            rows = list(queryset[: self.list_per_page + 1])
+            has_older = len(rows) > self.list_per_page
+            rows = rows[: self.list_per_page]
+            has_newer = anchor is not None
+
+        if not rows and anchor is not None:
+            raise IncorrectLookupParameters
+        self.result_list = rows
+        self.multi_page = has_older or has_newer
+        self.keyset_newest_url = self.get_query_string() if has_newer else None
+        self.keyset_newer_url = (
+            self.get_query_string({AFTER_VAR: rows[0].pk}) if has_newer else None
+        )
+        self.keyset_older_url = (
+            self.get_query_string({BEFORE_VAR: rows[-1].pk}) if has_older else None
+        )
+
+
+def _parse_id(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,33 @@
+import os
+
+RENDER_PROCESS_ENV = "CHEMICALS_RENDER_PROCESS"
+
+
+def init_render_process():
+    """
+    Configure Django in a freshly spawned render process.
+
+    Spawned children unpickle their target before running it, so this
+    module must stay importable without Django: importing chemicals.services
+    loads models, which needs configured settings.
+    """
+    os.environ[RENDER_PROCESS_ENV] = "1"
+
+    import configurations
+
+    configurations.setup()
+
+
+def init_background_render_process(niceness: int = 10):
+    """Like init_render_process, at a lower CPU priority than web workers."""
+    os.nice(niceness)
+    init_render_process()
+
+
+def run_render_worker(conn):
+    """Entry point of a supervised render worker process."""
+    init_render_process()
+
+    from chemicals.services.render_workers import serve_render_calls
+
+    serve_render_calls(conn)
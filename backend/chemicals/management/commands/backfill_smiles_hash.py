@@ -0,0 +1,56 @@
+import time
+
+from chemicals.models import RequestLog, hash_smiles
+from chemicals.services import ChemicalRenderer
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill RequestLog.smiles_hash for rows logged before the column existed, "
+        "hashing the canonical SMILES, in batches ordered by id."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows updated per batch"
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches",
+        )
+
+    def handle(self, *args, **options):
+        # Canonicalization only; nothing is rendered.
+        renderer = ChemicalRenderer()
+        pending = RequestLog.objects.filter(
+            smiles_hash__isnull=True, smiles__isnull=False
+        ).exclude(smiles="")
+        last_id = 0
+        total = 0
+
+        while True:
+            batch = list(
+                pending.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "smiles")[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            for record in batch:
+                try:
+                    canonical = renderer.canonical_smiles(record.smiles)
+                except Exception:
+                    # Same fallback as new rows: the SMILES as given.
+                    canonical = record.smiles
+                record.smiles_hash = hash_smiles(canonical)
+            RequestLog.objects.bulk_update(batch, ["smiles_hash"])
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f"{total} rows hashed (up to id {last_id})")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled smiles_hash on {total} rows"))
@@ -0,0 +1,228 @@
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from chemicals.services import ChemicalRenderer, IndigoPool, LRURenderCache
+from chemicals.services.render_cache import PreparedMoleculeCache
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+CORPUS_DIR = Path(settings.BASE_DIR).parent / "benchmarks" / "corpus"
+
+# Upper atom-count bound (exclusive) for each complexity bucket.
+ATOM_BUCKETS = (("small", 20), ("medium", 50), ("large", None))
+
+# Per-stage wall time and peak Python heap allocation (tracemalloc does not
+# see Indigo's native allocations).
+STAGE_FIELDS = (
+    "parse_ms",
+    "layout_ms",
+    "render_ms",
+    "parse_alloc",
+    "layout_alloc",
+    "render_alloc",
+)
+
+
+def atom_bucket(atom_count: int) -> str:
+    for name, upper in ATOM_BUCKETS:
+        if upper is None or atom_count < upper:
+            return name
+    return ATOM_BUCKETS[-1][0]
+
+
+def load_corpus(include_molfiles: bool) -> list[tuple[str, str]]:
+    """Return (name, SMILES or molfile) pairs from the benchmark corpus."""
+    corpus = []
+    for line in (CORPUS_DIR / "smiles.tsv").read_text().splitlines():
+        if line and not line.startswith("#"):
+            name, smiles = line.split("\t")[:2]
+            corpus.append((name, smiles))
+    if include_molfiles:
+        for path in sorted((CORPUS_DIR / "molfiles").glob("*.mol")):
+            corpus.append((f"{path.stem}.mol", path.read_text()))
+    return corpus
+
+
+def measure(func):
+    """Run func and return (result, elapsed ms, Python bytes allocated)."""
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    return result, elapsed, max(peak - before, 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ChemicalRenderer without HTTP: time parse, layout and "
+        "render stages per format, size and molecule size bucket, and "
+        "compare renderer configurations (pooled/fresh Indigo, cache on/off)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--formats", nargs="+", default=["png", "svg", "pdf"])
+        parser.add_argument("--sizes", nargs="+", type=int, default=[300, 1000])
+        parser.add_argument("--iterations", type=int, default=5)
+        parser.add_argument(
+            "--configs",
+            nargs="+",
+            default=["pooled", "fresh", "cached"],
+            choices=["pooled", "fresh", "cached"],
+            help="Renderer configurations to compare end-to-end",
+        )
+        parser.add_argument(
+            "--molfiles",
+            action="store_true",
+            help="Include MOL files from the corpus (stages only)",
+        )
+        parser.add_argument("--output", help="Write results as JSON to this path")
+
+    def handle(self, *args, **options):
+        corpus = load_corpus(options["molfiles"])
+        tracemalloc.start()
+        try:
+            stages = self.benchmark_stages(corpus, options)
+            configs = self.benchmark_configs(corpus, options)
+        finally:
+            tracemalloc.stop()
+
+        self.print_stages(stages)
+        self.print_configs(configs)
+
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps({"stages": stages, "configs": configs}, indent=2) + "\n"
+            )
+
+    def benchmark_stages(self, corpus, options) -> list[dict]:
+        """Time parse, layout and render separately on a pooled session."""
+        renderer = ChemicalRenderer(
+            pool=IndigoPool(),
+            cache=LRURenderCache(0),
+            prepared=PreparedMoleculeCache(0),
+        )
+        samples: dict[tuple, dict[str, list]] = {}
+
+        for _, source in corpus:
+            for image_format in options["formats"]:
+                for size in options["sizes"]:
+                    for _ in range(options["iterations"]):
+                        with renderer.pool.session() as session:
+                            molecule, parse_ms, parse_alloc = measure(
+                                lambda: session.indigo.loadMolecule(source)
+                            )
+                            _, layout_ms, layout_alloc = measure(molecule.layout)
+                            _, render_ms, render_alloc = measure(
+                                lambda: renderer._render_molecule(
+                                    session.indigo,
+                                    session.renderer,
+                                    molecule,
+                                    size,
+                                    size,
+                                    image_format,
+                                )
+                            )
+                            atoms = molecule.countHeavyAtoms()
+
+                        key = (atom_bucket(atoms), image_format, size)
+                        bucket = samples.setdefault(
+                            key, {name: [] for name in STAGE_FIELDS}
+                        )
+                        for name, value in zip(
+                            STAGE_FIELDS,
+                            (
+                                parse_ms,
+                                layout_ms,
+                                render_ms,
+                                parse_alloc,
+                                layout_alloc,
+                                render_alloc,
+                            ),
+                        ):
+                            bucket[name].append(value)
+
+        results = []
+        for (bucket, image_format, size), values in sorted(samples.items()):
+            row = {"bucket": bucket, "format": image_format, "size": size}
+            row["samples"] = len(values["parse_ms"])
+            for name, series in values.items():
+                row[name] = round(statistics.median(series), 3)
+            results.append(row)
+        return results
+
+    def benchmark_configs(self, corpus, options) -> list[dict]:
+        """Time render_smiles end-to-end under each renderer configuration."""
+        smiles = [source for name, source in corpus if not name.endswith(".mol")]
+        factories = {
+            "pooled": lambda: ChemicalRenderer(
+                pool=IndigoPool(),
+                cache=LRURenderCache(0),
+                prepared=PreparedMoleculeCache(0),
+            ),
+            # A session recycled after every render behaves like a fresh Indigo.
+            "fresh": lambda: ChemicalRenderer(
+                pool=IndigoPool(max_uses=1),
+                cache=LRURenderCache(0),
+                prepared=PreparedMoleculeCache(0),
+            ),
+            "cached": lambda: ChemicalRenderer(
+                pool=IndigoPool(),
+                cache=LRURenderCache(),
+                prepared=PreparedMoleculeCache(),
+            ),
+        }
+
+        results = []
+        for config in options["configs"]:
+            renderer = factories[config]()
+            timings = []
+            for image_format in options["formats"]:
+                for size in options["sizes"]:
+                    for _ in range(options["iterations"]):
+                        for source in smiles:
+                            _, elapsed, _ = measure(
+                                lambda: renderer.render_smiles(
+                                    source, size, size, image_format
+                                )
+                            )
+                            timings.append(elapsed)
+            results.append(
+                {
+                    "config": config,
+                    "calls": len(timings),
+                    "mean_ms": round(statistics.fmean(timings), 3),
+                    "median_ms": round(statistics.median(timings), 3),
+                    "total_s": round(sum(timings) / 1000, 3),
+                }
+            )
+        return results
+
+    def print_stages(self, stages: list[dict]):
+        self.stdout.write(
+            f"{'bucket':<8} {'fmt':<4} {'size':>5} {'parse ms':>9} {'layout ms':>10} "
+            f"{'render ms':>10} {'parse KB':>9} {'layout KB':>10} {'render KB':>10}"
+        )
+        for row in stages:
+            self.stdout.write(
+                f"{row['bucket']:<8} {row['format']:<4} {row['size']:>5} "
+                f"{row['parse_ms']:>9.3f} {row['layout_ms']:>10.3f} "
+                f"{row['render_ms']:>10.3f} {row['parse_alloc'] / 1024:>9.1f} "
+                f"{row['layout_alloc'] / 1024:>10.1f} "
+                f"{row['render_alloc'] / 1024:>10.1f}"
+            )
+        self.stdout.write("")
+
+    def print_configs(self, configs: list[dict]):
+        self.stdout.write(
+            f"{'config':<8} {'calls':>7} {'mean ms':>9} {'median ms':>10} {'total s':>8}"
+        )
+        for row in configs:
+            self.stdout.write(
+                f"{row['config']:<8} {row['calls']:>7} {row['mean_ms']:>9.3f} "
+                f"{row['median_ms']:>10.3f} {row['total_s']:>8.3f}"
+            )
@@ -0,0 +1,27 @@
+from chemicals.services.partitioning import partition_request_log_table
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "PostgreSQL only: range-partition the RequestLog table by month of "
+        "created_at, so prune_request_logs can drop old months whole. The "
+        "existing table becomes the first partition. Run again (e.g. monthly) "
+        "to create upcoming partitions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Create monthly partitions this many months ahead",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Table partitioning needs PostgreSQL")
+        for partition in partition_request_log_table(options["months_ahead"]):
+            self.stdout.write(f"Partition {partition}")
+        self.stdout.write(self.style.SUCCESS("RequestLog table is partitioned"))
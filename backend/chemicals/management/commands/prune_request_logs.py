@@ -0,0 +1,67 @@
+from chemicals.models import RequestLog
+from chemicals.services.retention import (
+    drop_old_partitions,
+    prune_cutoff,
+    prune_request_logs,
+)
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete raw RequestLog rows older than the retention period in small "
+        "chunks. Only days already rolled up into RequestLogDaily are deleted "
+        "unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.REQUEST_LOG_RETENTION_DAYS,
+            help="Keep raw rows for this many days (0 keeps them forever)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.REQUEST_LOG_PRUNE_CHUNK_SIZE,
+            help="Rows deleted per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=settings.REQUEST_LOG_PRUNE_PAUSE,
+            help="Seconds to sleep between chunks",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Also delete rows of days that were not rolled up",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = prune_cutoff(options["days"], force=options["force"])
+        if cutoff is None:
+            self.stdout.write(
+                "Nothing to prune: retention is disabled or no day has been "
+                "rolled up yet (run rollup_request_logs or pass --force)"
+            )
+            return
+
+        if options["dry_run"]:
+            count = RequestLog.objects.filter(created_at__lt=cutoff).count()
+            self.stdout.write(f"Would delete {count} rows created before {cutoff}")
+            return
+
+        for partition in drop_old_partitions(cutoff):
+            self.stdout.write(f"Dropped partition {partition}")
+        total = sum(prune_request_logs(cutoff, options["chunk_size"], options["pause"]))
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {total} rows created before {cutoff}")
+        )
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+
+from chemicals.bootstrap import init_render_process
+from chemicals.services import ChemicalRenderer
+from chemicals.services.bulk import iter_bulk_inputs, render_bulk_chunk
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def input_fingerprint(paths: list[str], options: dict) -> str:
+    """Identify an input set and render options, to refuse mismatched resumes."""
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(
+            f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime}|".encode()
+        )
+    for name in ("formats", "width", "height", "chunk_size", "output_dir"):
+        digest.update(f"{name}={options[name]}|".encode())
+    return digest.hexdigest()
+
+
+def load_state(path: Path, fingerprint: str) -> set[int]:
+    """Return the start indexes of chunks completed by a previous run."""
+    if not path.exists():
+        return set()
+    with open(path) as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("fingerprint") != fingerprint:
+            raise CommandError(
+                f"State file {path} belongs to a different input or options; "
+                "pass --restart to discard it."
+            )
+        return {int(line) for line in f if line.strip()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Render SMILES (.smi), SDF and MOL files offline on a process pool, writing "
+        "images to a directory or into the disk render cache. Interrupted runs "
+        "resume from the last completed chunk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("inputs", nargs="+", help="SMILES or SDF files (.gz ok)")
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--output-dir", help="Write images to this directory")
+        target.add_argument(
+            "--to-cache",
+            action="store_true",
+            help="Store images in the disk render cache instead of files",
+        )
+        parser.add_argument(
+            "--formats",
+            nargs="+",
+            default=[ChemicalRenderer.DEFAULT_FORMAT],
+            choices=ChemicalRenderer.SUPPORTED_FORMATS,
+        )
+        parser.add_argument("--width", type=int, default=ChemicalRenderer.DEFAULT_WIDTH)
+        parser.add_argument(
+            "--height", type=int, default=ChemicalRenderer.DEFAULT_HEIGHT
+        )
+        # Offline runs have the machine to themselves: one process per CPU.
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--chunk-size", type=int, default=64, help="Items per worker task"
+        )
+        parser.add_argument(
+            "--state",
+            help="Resume state file (default: .render_bulk.state in the output "
+            "directory, or render_bulk.state)",
+        )
+        parser.add_argument(
+            "--failures",
+            help="JSON Lines failure report (default: failures.jsonl in the "
+            "output directory, or render_bulk_failures.jsonl)",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore and overwrite previous resume state",
+        )
+        parser.add_argument(
+            "--progress-interval",
+            type=float,
+            default=5.0,
+            help="Seconds between progress lines",
+        )
+
+    def handle(self, *args, **options):
+        for path in options["inputs"]:
+            if not os.path.isfile(path):
+                raise CommandError(f"Input file not found: {path}")
+        if options["to_cache"] and not settings.RENDER_DISK_CACHE_MAX_BYTES:
+            raise CommandError("--to-cache needs the disk render cache enabled")
+
+        output_dir = options["output_dir"]
+        base = Path(output_dir) if output_dir else Path.cwd()
+        if output_dir:
+            base.mkdir(parents=True, exist_ok=True)
+        state_path = Path(
+            options["state"]
+            or base / (".render_bulk.state" if output_dir else "render_bulk.state")
+        )
+        failures_path = Path(
+            options["failures"]
+            or base / ("failures.jsonl" if output_dir else "render_bulk_failures.jsonl")
+        )
+
+        fingerprint = input_fingerprint(options["inputs"], options)
+        if options["restart"]:
+            state_path.unlink(missing_ok=True)
+            failures_path.unlink(missing_ok=True)
+        done_chunks = load_state(state_path, fingerprint)
+        if not done_chunks:
+            state_path.write_text(json.dumps({"fingerprint": fingerprint}) + "\n")
+        else:
+            self.stdout.write(f"Resuming: {len(done_chunks)} chunks already done")
+
+        executor = ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_render_process,
+        )
+        totals = {"items": 0, "rendered": 0, "failed": 0, "skipped": 0}
+        started = last_report = time.monotonic()
+        pending = set()
+        # Enough queued chunks to keep every worker busy, without reading
+        # the whole input up front.
+        window = options["workers"] * 2
+
+        try:
+            with open(state_path, "a") as state, open(failures_path, "a") as report:
+                chunks = self.iter_chunks(options, done_chunks, totals)
+                while True:
+                    for chunk in islice(chunks, window - len(pending)):
+                        pending.add(executor.submit(render_bulk_chunk, chunk))
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self.record(done, state, report, totals)
+                    if time.monotonic() - last_report >= options["progress_interval"]:
+                        self.report_progress(totals, started)
+                        last_report = time.monotonic()
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.report_progress(totals, started)
+            raise CommandError("Interrupted; run the same command again to resume.")
+        executor.shutdown()
+
+        self.report_progress(totals, started)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {totals['rendered']} images from {totals['items']} items "
+                f"({totals['skipped']} skipped as already done, "
+                f"{totals['failed']} failures in {failures_path})"
+            )
+        )
+
+    def iter_chunks(self, options: dict, done_chunks: set[int], totals: dict):
+        """Yield worker tasks of chunk_size consecutive items."""
+        items = iter_bulk_inputs(options["inputs"])
+        while True:
+            batch = list(islice(items, options["chunk_size"]))
+            if not batch:
+                return
+            start = batch[0]["index"]
+            if start in done_chunks:
+                totals["skipped"] += len(batch)
+                continue
+            yield {
+                "start": start,
+                "items": batch,
+                "formats": options["formats"],
+                "width": options["width"],
+                "height": options["height"],
+                "output_dir": options["output_dir"],
+            }
+
+    def record(self, futures, state, report, totals: dict):
+        """Write failures, then mark the chunks done in the state file."""
+        for future in futures:
+            result = future.result()
+            for failure in result["failures"]:
+                report.write(json.dumps(failure) + "\n")
+            report.flush()
+            state.write(f"{result['start']}\n")
+            state.flush()
+            totals["items"] += result["items"]
+            totals["rendered"] += result["rendered"]
+            totals["failed"] += len(result["failures"])
+
+    def report_progress(self, totals: dict, started: float):
+        elapsed = time.monotonic() - started
+        rate = totals["items"] / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"{totals['items']} items, {totals['rendered']} images, "
+            f"{totals['failed']} failures, {elapsed:.1f}s, {rate:.1f} items/s"
+        )
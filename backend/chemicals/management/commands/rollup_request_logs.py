@@ -0,0 +1,36 @@
+from datetime import date
+
+from chemicals.services.retention import rollup_request_logs
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate raw RequestLog rows into RequestLogDaily: requests, errors "
+        "and response time percentiles per day, image format and user. "
+        "Continues from the last rolled-up day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            help="Recompute from this day (YYYY-MM-DD) instead of the last one",
+        )
+        parser.add_argument(
+            "--include-today",
+            action="store_true",
+            help="Also roll up the current, incomplete day",
+        )
+
+    def handle(self, *args, **options):
+        days = 0
+        for day, rows in rollup_request_logs(
+            since=options["since"], include_today=options["include_today"]
+        ):
+            if rows is None:
+                self.stdout.write(f"{day}: no raw rows, kept existing rollup")
+                continue
+            days += 1
+            self.stdout.write(f"{day}: {rows} rollup rows")
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {days} days"))
@@ -0,0 +1,94 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from chemicals.bootstrap import init_background_render_process
+from chemicals.services.warming import popular_render_requests, warm_render_cache
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render the most requested SMILES renders from RequestLog into the "
+        "disk render cache, within a time and byte budget, on low-priority "
+        "worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=settings.RENDER_WARM_TOP_N,
+            help="Number of most popular (smiles, size, format) combinations",
+        )
+        parser.add_argument(
+            "--window-hours",
+            type=float,
+            default=settings.RENDER_WARM_WINDOW_HOURS,
+            help="Only count requests from this many recent hours",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=60.0,
+            help="Stop starting new renders after this many seconds",
+        )
+        parser.add_argument(
+            "--max-bytes",
+            type=int,
+            default=settings.RENDER_WARM_MAX_BYTES,
+            help="Stop once this many image bytes have been rendered",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=settings.RENDER_WARM_CONCURRENCY
+        )
+        parser.add_argument(
+            "--nice",
+            type=int,
+            default=10,
+            help="CPU niceness of the worker processes",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the candidates without rendering",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.RENDER_DISK_CACHE_MAX_BYTES:
+            # Memory caches belong to the web workers; only the disk tier is
+            # shared with this process.
+            raise CommandError("warm_render_cache needs the disk render cache enabled")
+
+        items = popular_render_requests(options["top"], options["window_hours"])
+        if options["dry_run"]:
+            for item in items:
+                self.stdout.write(
+                    f"{item['hits']:>7} {item['format']:<4} "
+                    f"{item['width']}x{item['height']} {item['smiles']}"
+                )
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_background_render_process,
+            initargs=(options["nice"],),
+        )
+        with executor:
+            stats = warm_render_cache(
+                items,
+                executor,
+                concurrency=options["workers"],
+                time_budget=options["time_budget"],
+                byte_budget=options["max_bytes"],
+            )
+
+        stopped = f", stopped by {stats['stopped']} budget" if stats["stopped"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Warmed {stats['rendered']} of {stats['candidates']} renders "
+                f"({stats['bytes'] / 1024:.0f} KiB, {stats['failed']} failed, "
+                f"{stats['skipped']} skipped) in {stats['elapsed']:.1f}s{stopped}"
+            )
+        )
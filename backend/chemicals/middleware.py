@@ -0,0 +1,32 @@
+import time
+
+from chemicals.services.metrics import get_metrics_registry
+from rest_framework import status
+
+
+class MetricsMiddleware:
+    """Record response status codes, latency and throttle rejections."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unmatched"
+        metrics = get_metrics_registry()
+        metrics.inc(
+            "http_responses_total",
+            {
+                "view": view,
+                "method": request.method,
+                "status": str(response.status_code),
+            },
+        )
+        metrics.observe("http_request_duration_seconds", elapsed, {"view": view})
+        if response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            metrics.inc("throttle_rejections_total", {"view": view})
+        return response
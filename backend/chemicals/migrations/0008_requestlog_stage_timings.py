@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chemicals", "0007_remove_ip_address"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="requestlog",
+            name="stage_timings",
+            field=models.JSONField(
+                blank=True, null=True, verbose_name="Stage Timings (ms)"
+            ),
+        ),
+    ]
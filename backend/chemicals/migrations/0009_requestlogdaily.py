@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chemicals", "0008_requestlog_stage_timings"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestLogDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(db_index=True, verbose_name="Day")),
+                (
+                    "image_format",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Image Format"
+                    ),
+                ),
+                (
+                    "requests",
+                    models.PositiveIntegerField(default=0, verbose_name="Requests"),
+                ),
+                (
+                    "errors",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Failed Requests"
+                    ),
+                ),
+                (
+                    "latency_sum_ms",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Response Time Sum (ms)"
+                    ),
+                ),
+                (
+                    "latency_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Timed Requests"
+                    ),
+                ),
+                (
+                    "p50_ms",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Response Time p50 (ms)"
+                    ),
+                ),
+                (
+                    "p95_ms",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Response Time p95 (ms)"
+                    ),
+                ),
+                (
+                    "p99_ms",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Response Time p99 (ms)"
+                    ),
+                ),
+                (
+                    "max_ms",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Response Time Max (ms)"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="request_log_dailies",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Request Log Daily Rollup",
+                "verbose_name_plural": "Request Log Daily Rollups",
+                "ordering": ["-day", "image_format"],
+            },
+        ),
+    ]
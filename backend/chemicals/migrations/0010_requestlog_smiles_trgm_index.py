@@ -0,0 +1,44 @@
+from django.db import migrations
+
+INDEX_NAME = "chemicals_requestlog_smiles_trgm"
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    Back admin SMILES search with a pg_trgm GIN index on PostgreSQL.
+
+    A btree cannot hold arbitrarily long SMILES; a trigram index serves
+    prefix and substring LIKE alike. Built concurrently so writes to a
+    large table are not blocked (not possible on a partitioned table).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("chemicals", "RequestLog")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+        row = cursor.fetchone()
+        concurrently = "" if row and row[0] == "p" else "CONCURRENTLY"
+        cursor.execute(
+            f"CREATE INDEX {concurrently} IF NOT EXISTS {INDEX_NAME} "
+            f"ON {table} USING gin (smiles gin_trgm_ops)"
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("chemicals", "0009_requestlogdaily"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import migrations, models
+
+INDEXES = [
+    models.Index(fields=["smiles_hash"], name="reqlog_smiles_hash_idx"),
+    models.Index(fields=["user", "created_at"], name="reqlog_user_created_idx"),
+    models.Index(fields=["success", "created_at"], name="reqlog_success_created_idx"),
+]
+
+
+def _concurrently(schema_editor, model) -> bool:
+    """PostgreSQL can build indexes without blocking writes, except on a
+    partitioned table."""
+    if schema_editor.connection.vendor != "postgresql":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE relname = %s",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return not (row and row[0] == "p")
+
+
+def add_indexes(apps, schema_editor):
+    model = apps.get_model("chemicals", "RequestLog")
+    if _concurrently(schema_editor, model):
+        for index in INDEXES:
+            schema_editor.add_index(model, index, concurrently=True)
+    else:
+        for index in INDEXES:
+            schema_editor.add_index(model, index)
+
+
+def remove_indexes(apps, schema_editor):
+    model = apps.get_model("chemicals", "RequestLog")
+    for index in INDEXES:
+        schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("chemicals", "0010_requestlog_smiles_trgm_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="requestlog",
+            name="smiles_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="BLAKE2b-128 of the canonical SMILES (of the input if it "
+                "did not parse)",
+                max_length=32,
+                null=True,
+                verbose_name="SMILES Hash",
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="requestlog", index=index)
+                for index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_indexes, remove_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chemicals", "0011_requestlog_smiles_hash_indexes"),
+    ]
+
+    # auto_now_add and a Python default produce the same column, so only the
+    # model state changes (no table rebuild on SQLite or partitioned tables).
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="requestlog",
+                    name="created_at",
+                    field=models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="Created At",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,5 +1,40 @@
+import hashlib
+
 from django.conf import settings
 from django.db import models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def hash_smiles(smiles: str) -> str:
+    """Fixed-width (32 hex chars) hash of a SMILES string, meant for canonical SMILES."""
+    return hashlib.blake2b(smiles.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RequestLogQuerySet(models.QuerySet):
+    """Queries shaped to use the RequestLog indexes."""
+
+    def for_user(self, user):
+        """A user's requests, newest first (user, created_at index)."""
+        return self.filter(user=user).order_by("-created_at")
+
+    def failed_since(self, since):
+        """Failed requests since a moment, newest first (success, created_at index)."""
+        return self.filter(success=False, created_at__gte=since).order_by("-created_at")
+
+    def for_canonical_smiles(self, canonical_smiles: str):
+        """Requests for a molecule, by the hash of its canonical SMILES."""
+        return self.filter(smiles_hash=hash_smiles(canonical_smiles))
+
+    def count_by_smiles(self):
+        """Request counts per SMILES hash, most requested first."""
+        return (
+            self.exclude(smiles_hash=None)
+            .order_by()
+            .values("smiles_hash")
+            .annotate(requests=Count("id"))
+            .order_by("-requests")
+        )
 
 
 class RequestLog(models.Model):
@@ -27,6 +62,13 @@ class RequestLog(models.Model):
         null=True,
         verbose_name="SMILES String",
     )
+    smiles_hash = models.CharField(
+        max_length=32,
+        blank=True,
+        null=True,
+        verbose_name="SMILES Hash",
+        help_text="BLAKE2b-128 of the canonical SMILES (of the input if it did not parse)",
+    )
     has_molfile = models.BooleanField(
         default=False,
         verbose_name="MOL File Uploaded",
@@ -60,21 +102,37 @@ class RequestLog(models.Model):
         blank=True,
         verbose_name="Response Time (ms)",
     )
+    stage_timings = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Stage Timings (ms)",
+    )
     user_agent = models.TextField(
         blank=True,
         null=True,
         verbose_name="User Agent",
     )
+    # Set when the record is built, not when the log sink writes it.
     created_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name="Created At",
         db_index=True,
     )
 
+    objects = RequestLogQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Request Log"
         verbose_name_plural = "Request Logs"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["smiles_hash"], name="reqlog_smiles_hash_idx"),
+            models.Index(fields=["user", "created_at"], name="reqlog_user_created_idx"),
+            models.Index(
+                fields=["success", "created_at"], name="reqlog_success_created_idx"
+            ),
+        ]
 
     def __str__(self):
         smiles_short = (
@@ -83,3 +141,75 @@ class RequestLog(models.Model):
             else (self.smiles or "-")
         )
         return f"{self.method} | {smiles_short} | {self.image_format or '-'}"
+
+
+class RequestLogDaily(models.Model):
+    """Daily rollup of RequestLog rows per image format and user."""
+
+    day = models.DateField(
+        verbose_name="Day",
+        db_index=True,
+    )
+    image_format = models.CharField(
+        max_length=10,
+        blank=True,
+        verbose_name="Image Format",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="request_log_dailies",
+        verbose_name="User",
+    )
+    requests = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Requests",
+    )
+    errors = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Failed Requests",
+    )
+    latency_sum_ms = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Response Time Sum (ms)",
+    )
+    latency_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Timed Requests",
+    )
+    p50_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Response Time p50 (ms)",
+    )
+    p95_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Response Time p95 (ms)",
+    )
+    p99_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Response Time p99 (ms)",
+    )
+    max_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Response Time Max (ms)",
+    )
+
+    class Meta:
+        verbose_name = "Request Log Daily Rollup"
+        verbose_name_plural = "Request Log Daily Rollups"
+        ordering = ["-day", "image_format"]
+
+    def __str__(self):
+        return f"{self.day} | {self.image_format or '-'} | {self.requests}"
+
+    @property
+    def latency_avg_ms(self) -> float | None:
+        if not self.latency_count:
+            return None
+        return self.latency_sum_ms / self.latency_count
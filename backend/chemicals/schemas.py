@@ -1,4 +1,9 @@
-from chemicals.serializers import ChemicalPostSerializer
+from chemicals.serializers import (
+    BatchRenderSerializer,
+    ChemicalPostSerializer,
+    SdfRenderSerializer,
+    VariantsRenderSerializer,
+)
 from chemicals.services import ChemicalRenderer
 from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schema
 
@@ -15,6 +20,11 @@ IMAGE_RESPONSES = {
     400: {"description": "Invalid input or parameters"},
 }
 
+GET_IMAGE_RESPONSES = {
+    **IMAGE_RESPONSES,
+    304: {"description": "Not modified (If-None-Match matches the ETag)"},
+}
+
 get_extended_schema = extend_schema(
     tags=["Chemical Rendering"],
     summary="Render chemical structure from SMILES",
@@ -74,7 +84,7 @@ get_extended_schema = extend_schema(
             description="Set to true to download file instead of displaying",
         ),
     ],
-    responses=IMAGE_RESPONSES,
+    responses=GET_IMAGE_RESPONSES,
 )
 
 post_extended_schema = extend_schema(
@@ -102,3 +112,93 @@ post_extended_schema = extend_schema(
     ],
     responses=IMAGE_RESPONSES,
 )
+
+batch_extended_schema = extend_schema(
+    tags=["Chemical Rendering"],
+    summary="Render many SMILES strings in one request",
+    description=(
+        "Render a list of SMILES strings in parallel and return a ZIP archive. "
+        "Each item may override the shared width, height and format. The "
+        "archive contains one image per rendered item and a manifest.json "
+        "describing every item, including per-item errors."
+    ),
+    request=BatchRenderSerializer,
+    examples=[
+        OpenApiExample(
+            "Batch Example",
+            value={
+                "format": "png",
+                "width": 300,
+                "height": 300,
+                "items": [
+                    {"smiles": "CCO"},
+                    {"smiles": "c1ccccc1", "format": "svg"},
+                    {"smiles": "CC(=O)Oc1ccccc1C(=O)O", "width": 600},
+                ],
+            },
+            request_only=True,
+        ),
+    ],
+    responses={
+        200: {
+            "content": {"application/zip": {}},
+            "description": "ZIP archive with rendered images and manifest.json",
+        },
+        400: {"description": "Invalid input or parameters"},
+    },
+)
+
+variants_extended_schema = extend_schema(
+    tags=["Chemical Rendering"],
+    summary="Render one SMILES string in several sizes and formats",
+    description=(
+        "Parse and lay out the molecule once and render every requested "
+        "variant from it. Returns a ZIP archive with one image per variant "
+        "and a manifest.json; each manifest entry has the GET URL of the "
+        "variant, which is then served from the render cache."
+    ),
+    request=VariantsRenderSerializer,
+    examples=[
+        OpenApiExample(
+            "Variants Example",
+            value={
+                "smiles": "CC(=O)Oc1ccccc1C(=O)O",
+                "variants": [
+                    {"format": "png", "width": 150, "height": 150},
+                    {"format": "png", "width": 600, "height": 600},
+                    {"format": "svg"},
+                ],
+            },
+            request_only=True,
+        ),
+    ],
+    responses={
+        200: {
+            "content": {"application/zip": {}},
+            "description": "ZIP archive with rendered images and manifest.json",
+        },
+        400: {"description": "Invalid input or parameters"},
+    },
+)
+
+sdf_extended_schema = extend_schema(
+    tags=["Chemical Rendering"],
+    summary="Render every record of an SDF file",
+    description=(
+        "Upload an SDF file (plain or gzip-compressed) and receive a ZIP "
+        "archive with one image per record and a manifest.json with record "
+        "names and per-record errors. Records are parsed and rendered as the "
+        "file is read and the archive is streamed back while rendering "
+        "continues."
+    ),
+    request={
+        "multipart/form-data": SdfRenderSerializer,
+    },
+    responses={
+        200: {
+            "content": {"application/zip": {}},
+            "description": "Streamed ZIP archive with rendered images and manifest.json",
+        },
+        400: {"description": "Invalid input or parameters"},
+    },
+)
@@ -1,8 +1,13 @@
 from chemicals.serializers.auth import UserRegistrationSerializer, UserSerializer
 from chemicals.serializers.chemical import (
+    BatchItemSerializer,
+    BatchRenderSerializer,
     ChemicalPostSerializer,
     RenderOptionsSerializer,
+    SdfRenderSerializer,
     SmilesGetSerializer,
+    VariantSerializer,
+    VariantsRenderSerializer,
 )
 
 __all__ = [
@@ -11,4 +16,9 @@ __all__ = [
     "RenderOptionsSerializer",
     "SmilesGetSerializer",
     "ChemicalPostSerializer",
+    "BatchItemSerializer",
+    "BatchRenderSerializer",
+    "SdfRenderSerializer",
+    "VariantSerializer",
+    "VariantsRenderSerializer",
 ]
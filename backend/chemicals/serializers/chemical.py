@@ -1,7 +1,16 @@
 from chemicals.services import ChemicalRenderer
+from chemicals.services.smiles_syntax import smiles_syntax_error
+from django.conf import settings
 from rest_framework import serializers
 
 
+def validate_smiles_syntax(value: str):
+    """Reject malformed SMILES without calling Indigo."""
+    error = smiles_syntax_error(value)
+    if error:
+        raise serializers.ValidationError(f"Invalid SMILES: {error}")
+
+
 class RenderOptionsSerializer(serializers.Serializer):
     """Common render options for chemical structure visualization."""
 
@@ -32,6 +41,7 @@ class SmilesGetSerializer(RenderOptionsSerializer):
 
     smiles = serializers.CharField(
         required=True,
+        validators=[validate_smiles_syntax],
         help_text="SMILES string representing the chemical structure (e.g., CCO for ethanol)",
     )
     download = serializers.BooleanField(
@@ -46,6 +56,7 @@ class ChemicalPostSerializer(RenderOptionsSerializer):
 
     smiles = serializers.CharField(
         required=False,
+        validators=[validate_smiles_syntax],
         help_text="SMILES string representing the chemical structure",
     )
     molfile = serializers.FileField(
@@ -69,3 +80,82 @@ class ChemicalPostSerializer(RenderOptionsSerializer):
             )
 
         return attrs
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Single molecule in a batch request; its options override the shared ones."""
+
+    smiles = serializers.CharField(
+        required=True,
+        help_text="SMILES string representing the chemical structure",
+    )
+    width = serializers.IntegerField(
+        required=False,
+        min_value=50,
+        max_value=2000,
+        help_text="Image width in pixels (50-2000)",
+    )
+    height = serializers.IntegerField(
+        required=False,
+        min_value=50,
+        max_value=2000,
+        help_text="Image height in pixels (50-2000)",
+    )
+    format = serializers.ChoiceField(
+        required=False,
+        choices=[(f, f.upper()) for f in ChemicalRenderer.SUPPORTED_FORMATS],
+        help_text="Output image format",
+    )
+
+
+class BatchRenderSerializer(RenderOptionsSerializer):
+    """Serializer for batch rendering of many SMILES strings."""
+
+    items = BatchItemSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.RENDER_BATCH_MAX_ITEMS,
+        help_text="Molecules to render with optional per-item options",
+    )
+
+    def validate(self, attrs):
+        """Resolve per-item options against the shared defaults."""
+        attrs["items"] = [
+            {
+                "smiles": item["smiles"],
+                "width": item.get("width", attrs["width"]),
+                "height": item.get("height", attrs["height"]),
+                "format": item.get("format", attrs["format"]),
+            }
+            for item in attrs["items"]
+        ]
+        return attrs
+
+
+class SdfRenderSerializer(RenderOptionsSerializer):
+    """Serializer for rendering every record of an uploaded SDF file."""
+
+    sdf = serializers.FileField(
+        required=True,
+        help_text="SDF file with one or more records, optionally gzip-compressed",
+    )
+
+
+class VariantSerializer(RenderOptionsSerializer):
+    """One output variant of a variants request."""
+
+
+class VariantsRenderSerializer(serializers.Serializer):
+    """Serializer for rendering one SMILES string in several sizes and formats."""
+
+    smiles = serializers.CharField(
+        required=True,
+        validators=[validate_smiles_syntax],
+        help_text="SMILES string representing the chemical structure",
+    )
+    variants = VariantSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.RENDER_VARIANTS_MAX_ITEMS,
+        help_text="Sizes and formats to render, e.g. a thumbnail, a full PNG and an SVG",
+    )
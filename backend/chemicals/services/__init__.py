@@ -1,8 +1,49 @@
-from chemicals.services.chemical_renderer import ChemicalRenderer, get_chemical_renderer
+from chemicals.services.chemical_renderer import (
+    ChemicalRenderer,
+    IsolatedChemicalRenderer,
+    get_chemical_renderer,
+    warm_up_renderer,
+)
+from chemicals.services.disk_cache import DiskRenderCache
+from chemicals.services.exceptions import (
+    RenderError,
+    RenderRejected,
+    RenderServiceError,
+    RenderTimeout,
+    RenderWorkerCrashed,
+)
+from chemicals.services.indigo_pool import IndigoPool, get_indigo_pool
+from chemicals.services.log_sink import RequestLogSink, get_request_log_sink
 from chemicals.services.logging import with_logging
+from chemicals.services.metrics import MetricsRegistry, get_metrics_registry
+from chemicals.services.render_cache import (
+    LRURenderCache,
+    TieredRenderCache,
+    get_render_cache,
+)
+from chemicals.services.render_workers import RenderWorkerPool, get_render_worker_pool
 
 __all__ = [
     "ChemicalRenderer",
+    "IsolatedChemicalRenderer",
     "get_chemical_renderer",
+    "warm_up_renderer",
+    "RenderError",
+    "RenderRejected",
+    "RenderServiceError",
+    "RenderTimeout",
+    "RenderWorkerCrashed",
+    "RenderWorkerPool",
+    "get_render_worker_pool",
+    "IndigoPool",
+    "get_indigo_pool",
+    "LRURenderCache",
+    "DiskRenderCache",
+    "TieredRenderCache",
+    "get_render_cache",
+    "RequestLogSink",
+    "get_request_log_sink",
     "with_logging",
+    "MetricsRegistry",
+    "get_metrics_registry",
 ]
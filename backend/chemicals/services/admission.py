@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from chemicals.services.exceptions import RenderRejected
+from chemicals.services.metrics import get_metrics_registry
+from chemicals.services.timing import timed_stage
+from django.conf import settings
+
+
+class _Waiter:
+    def __init__(self, priority: float, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.event = threading.Event()
+        self.admitted = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """
+    Bound the number of concurrent renders in this process.
+
+    Up to ``max_concurrent`` renders run at once; up to ``max_queue`` more
+    wait for at most ``queue_timeout`` seconds. Anything beyond that is
+    rejected at once with RenderRejected, so a burst gets fast 503s instead
+    of piling up until the proxy times out. A ``max_concurrent`` of 0
+    disables admission control.
+
+    A freed slot goes to the waiter with the lowest estimated cost, less
+    ``aging`` per second it has waited, so small molecules overtake large
+    ones but a large render is not starved by a stream of small ones.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: float = 1.0,
+        aging: float = 0.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.aging = aging
+        self._lock = threading.Lock()
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._admitted = 0
+        self._queued_total = 0
+        self._shed_queue_full = 0
+        self._shed_timeout = 0
+        self._reordered = 0
+
+    @contextmanager
+    def admit(self, cost: float = 0.0):
+        """Hold a render slot for the block; ``cost`` orders the wait queue."""
+        if not self.max_concurrent:
+            yield
+            return
+        self._acquire(cost)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _acquire(self, cost: float):
+        with self._lock:
+            if self._in_flight < self.max_concurrent and not self._queue:
+                self._in_flight += 1
+                self._admitted += 1
+                return
+            if len(self._queue) >= self.max_queue:
+                self._shed_queue_full += 1
+                raise RenderRejected(
+                    "Render capacity exhausted, try again later", self.retry_after
+                )
+            # Waiting lowers the priority value by ``aging`` per second;
+            # relative to other waiters that is the same as adding it at
+            # enqueue time, so the heap order never changes.
+            waiter = _Waiter(cost + self.aging * time.monotonic(), next(self._seq))
+            heapq.heappush(self._queue, waiter)
+            self._queued_total += 1
+
+        with timed_stage("queue"):
+            waiter.event.wait(self.queue_timeout)
+        with self._lock:
+            if waiter.admitted:
+                return
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            self._shed_timeout += 1
+        raise RenderRejected(
+            f"No render capacity within {self.queue_timeout:g}s, try again later",
+            self.retry_after,
+        )
+
+    def _release(self):
+        with self._lock:
+            # Hand the slot straight to the cheapest (aged) waiter.
+            if self._queue:
+                waiter = heapq.heappop(self._queue)
+                if any(other.seq < waiter.seq for other in self._queue):
+                    self._reordered += 1
+                waiter.admitted = True
+                self._admitted += 1
+                waiter.event.set()
+            else:
+                self._in_flight -= 1
+
+    def stats(self) -> dict:
+        """Return slot occupancy and shedding counters."""
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self._in_flight,
+                "queued": len(self._queue),
+                "admitted": self._admitted,
+                "queued_total": self._queued_total,
+                "shed_queue_full": self._shed_queue_full,
+                "shed_timeout": self._shed_timeout,
+                "reordered": self._reordered,
+            }
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide render admission controller (RENDER_ADMISSION_*)."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    max_concurrent=settings.RENDER_ADMISSION_MAX_CONCURRENT,
+                    max_queue=settings.RENDER_ADMISSION_MAX_QUEUE,
+                    queue_timeout=settings.RENDER_ADMISSION_QUEUE_TIMEOUT,
+                    retry_after=settings.RENDER_ADMISSION_RETRY_AFTER,
+                    aging=settings.RENDER_ADMISSION_AGING,
+                )
+                get_metrics_registry().register_collector(
+                    "render_admission", _controller.stats
+                )
+    return _controller
@@ -0,0 +1,210 @@
+import io
+import json
+import zipfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from chemicals.services.chemical_renderer import get_chemical_renderer
+from chemicals.services.processes import get_render_executor, reset_render_executor
+from chemicals.services.smiles_syntax import smiles_syntax_error
+from django.conf import settings
+
+# Raster and PDF output is already compressed.
+ZIP_COMPRESSION = {
+    "png": zipfile.ZIP_STORED,
+    "svg": zipfile.ZIP_DEFLATED,
+    "pdf": zipfile.ZIP_STORED,
+}
+
+
+def render_batch_item(item: dict) -> dict:
+    """Render one batch item, capturing errors instead of raising."""
+    result = {
+        "smiles": item["smiles"],
+        "width": item["width"],
+        "height": item["height"],
+        "format": item["format"],
+    }
+    # Malformed items fail here, not the whole batch in the serializer.
+    error = smiles_syntax_error(item["smiles"])
+    if error:
+        result["error"] = f"Invalid SMILES: {error}"
+        return result
+    try:
+        image_bytes, content_type = get_chemical_renderer().render_smiles(
+            smiles=item["smiles"],
+            width=item["width"],
+            height=item["height"],
+            image_format=item["format"],
+        )
+    except Exception as e:
+        result["error"] = str(e)
+    else:
+        result["image"] = bytes(image_bytes)
+        result["content_type"] = content_type
+    return result
+
+
+def render_molfile_item(item: dict) -> dict:
+    """Render one SDF record, capturing errors instead of raising."""
+    result = {
+        "name": item["name"],
+        "width": item["width"],
+        "height": item["height"],
+        "format": item["format"],
+    }
+    if "error" in item:
+        result["error"] = item["error"]
+        return result
+    try:
+        image_bytes, content_type = get_chemical_renderer().render_molfile(
+            molfile_content=item["molfile"],
+            width=item["width"],
+            height=item["height"],
+            image_format=item["format"],
+        )
+    except Exception as e:
+        result["error"] = str(e)
+    else:
+        result["image"] = bytes(image_bytes)
+        result["content_type"] = content_type
+    return result
+
+
+def _failed_item(item: dict, error: str) -> dict:
+    return {
+        "smiles": item["smiles"],
+        "width": item["width"],
+        "height": item["height"],
+        "format": item["format"],
+        "error": error,
+    }
+
+
+def render_batch(items: list[dict]) -> list[dict]:
+    """
+    Render items in parallel on the render process pool, keeping order.
+
+    Each result has to arrive within RENDER_TIMEOUT seconds of the previous
+    one. A render that takes longer fails with a timeout error, as do the
+    items still unfinished at that point, and the pool is replaced so the
+    stuck worker is killed. Items lost with a crashed worker fail the same
+    way; the rest of the batch is kept.
+    """
+    executor = get_render_executor()
+    futures = [executor.submit(render_batch_item, item) for item in items]
+    timeout = settings.RENDER_TIMEOUT
+    timed_out = broken = False
+    results = []
+    for item, future in zip(items, futures):
+        try:
+            result = future.result(timeout=0 if timed_out else timeout)
+        except FuturesTimeoutError:
+            future.cancel()
+            result = _failed_item(
+                item,
+                "Not rendered: an earlier item timed out"
+                if timed_out
+                else f"Rendering timed out after {timeout:g} seconds",
+            )
+            timed_out = True
+        except BrokenProcessPool:
+            broken = True
+            result = _failed_item(item, "Render worker exited unexpectedly")
+        results.append(result)
+    if timed_out or broken:
+        reset_render_executor(kill=timed_out)
+    return results
+
+
+def render_sdf_stream(items: Iterable[dict]) -> Iterator[dict]:
+    """
+    Render SDF records from a lazy iterable on the process pool, in order.
+
+    At most a few records per worker are in flight, so memory stays flat
+    however many records the iterable produces.
+    """
+    executor = get_render_executor()
+    window = settings.RENDER_PROCESS_WORKERS * 4
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(render_molfile_item, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    except BrokenProcessPool:
+        reset_render_executor()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _write_entries(archive: zipfile.ZipFile, results: Iterable[dict]) -> Iterator:
+    """Write images and a manifest with per-item errors, yielding per entry."""
+    manifest = []
+    for index, result in enumerate(results, start=1):
+        entry = {"index": index}
+        entry.update(
+            (key, value)
+            for key, value in result.items()
+            if key not in ("image", "content_type")
+        )
+        if "error" not in result:
+            entry["file"] = f"{index:04d}.{result['format']}"
+            archive.writestr(
+                entry["file"],
+                result["image"],
+                compress_type=ZIP_COMPRESSION[result["format"]],
+            )
+        manifest.append(entry)
+        yield
+    archive.writestr(
+        "manifest.json",
+        json.dumps(manifest, indent=2),
+        compress_type=zipfile.ZIP_DEFLATED,
+    )
+
+
+def build_zip_archive(results: list[dict]) -> bytes:
+    """Pack rendered images and a manifest with per-item errors into a ZIP."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for _ in _write_entries(archive, results):
+            pass
+    return buffer.getvalue()
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that hands out what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip_archive(results: Iterable[dict]) -> Iterator[bytes]:
+    """Like build_zip_archive, but yield the ZIP in chunks as entries are added."""
+    buffer = _ChunkBuffer()
+    # zipfile uses data descriptors when the output is not seekable.
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for _ in _write_entries(archive, results):
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    yield buffer.drain()
@@ -0,0 +1,127 @@
+import gzip
+import re
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+from chemicals.services.chemical_renderer import ChemicalRenderer
+from chemicals.services.disk_cache import DiskRenderCache
+from chemicals.services.render_cache import LRURenderCache
+from chemicals.services.sdf import iter_sdf_records
+from django.conf import settings
+
+SDF_SUFFIXES = (".sdf", ".sd", ".mol", ".sdf.gz", ".sd.gz", ".mol.gz")
+
+# Output files are spread over subdirectories of this many items.
+FILES_PER_DIRECTORY = 1000
+
+
+def iter_bulk_inputs(paths: list[str]) -> Iterator[dict]:
+    """
+    Yield items from SMILES and SDF files, numbered across all inputs.
+
+    SMILES files hold one ``SMILES [name]`` per line (``#`` starts a
+    comment); .sdf/.sd files, and single .mol files, are read record by
+    record. Either kind may be gzip-compressed.
+    """
+    index = 0
+    for path in paths:
+        if path.lower().endswith(SDF_SUFFIXES):
+            with open(path, "rb") as f:
+                for record in iter_sdf_records(f, max_records=sys.maxsize):
+                    index += 1
+                    yield {**record, "index": index}
+            continue
+
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                smiles, *name = line.split(None, 1)
+                index += 1
+                yield {"index": index, "name": "".join(name), "smiles": smiles}
+
+
+def bulk_output_path(output_dir: str, item: dict, image_format: str) -> Path:
+    """Deterministic output path for an item, e.g. ``png/0001/0001234_name.png``."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", item["name"])[:64].strip("._")
+    filename = f"{item['index']:07d}_{slug}" if slug else f"{item['index']:07d}"
+    return (
+        Path(output_dir)
+        / image_format
+        / f"{item['index'] // FILES_PER_DIRECTORY:04d}"
+        / f"{filename}.{image_format}"
+    )
+
+
+_bulk_renderer: ChemicalRenderer | None = None
+
+
+def _get_bulk_renderer(to_cache: bool) -> ChemicalRenderer:
+    global _bulk_renderer
+    if _bulk_renderer is None:
+        if to_cache:
+            # Only the disk tier outlives this process.
+            cache = DiskRenderCache(
+                root=settings.RENDER_DISK_CACHE_DIR,
+                max_bytes=settings.RENDER_DISK_CACHE_MAX_BYTES,
+            )
+        else:
+            cache = LRURenderCache(max_bytes=0)
+        _bulk_renderer = ChemicalRenderer(cache=cache)
+    return _bulk_renderer
+
+
+def render_bulk_chunk(chunk: dict) -> dict:
+    """
+    Render a chunk of items in a worker process.
+
+    Images are written to ``chunk["output_dir"]`` or, without one, only
+    stored in the disk render cache. Returns counts and per-item failures.
+    """
+    output_dir = chunk["output_dir"]
+    renderer = _get_bulk_renderer(to_cache=not output_dir)
+    rendered = 0
+    failures = []
+
+    for item in chunk["items"]:
+        if "error" in item:
+            failures.append(
+                {"index": item["index"], "name": item["name"], "error": item["error"]}
+            )
+            continue
+        for image_format in chunk["formats"]:
+            try:
+                if "smiles" in item:
+                    image_bytes, _ = renderer.render_smiles(
+                        item["smiles"], chunk["width"], chunk["height"], image_format
+                    )
+                else:
+                    image_bytes, _ = renderer.render_molfile(
+                        item["molfile"], chunk["width"], chunk["height"], image_format
+                    )
+            except Exception as e:
+                failures.append(
+                    {
+                        "index": item["index"],
+                        "name": item["name"],
+                        "smiles": item.get("smiles"),
+                        "format": image_format,
+                        "error": str(e),
+                    }
+                )
+                continue
+            if output_dir:
+                path = bulk_output_path(output_dir, item, image_format)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(image_bytes)
+            rendered += 1
+
+    return {
+        "start": chunk["start"],
+        "items": len(chunk["items"]),
+        "rendered": rendered,
+        "failures": failures,
+    }
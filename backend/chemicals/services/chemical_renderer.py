@@ -1,3 +1,34 @@
+import time
+from contextlib import nullcontext
+
+from chemicals.services.admission import AdmissionController, get_admission_controller
+from chemicals.services.exceptions import RenderError
+from chemicals.services.indigo_pool import IndigoPool, get_indigo_pool
+from chemicals.services.metrics import get_metrics_registry, size_class
+from chemicals.services.processes import is_render_process
+from chemicals.services.render_cache import (
+    CanonicalSmilesCache,
+    LRURenderCache,
+    PreparedMoleculeCache,
+    RejectedSmilesCache,
+    TieredRenderCache,
+    get_prepared_molecule_cache,
+    get_render_cache,
+    make_molfile_key,
+    make_render_key,
+    make_smiles_key,
+)
+from chemicals.services.render_cost import (
+    estimate_render_cost,
+    molfile_size,
+    smiles_size,
+)
+from chemicals.services.render_workers import get_render_worker_pool
+from chemicals.services.singleflight import SingleFlight, get_single_flight
+from chemicals.services.timing import timed_stage
+from django.conf import settings
+
+
 class ChemicalRenderer:
     """Renders chemical structures to images using Indigo library."""
 
@@ -5,15 +36,89 @@ class ChemicalRenderer:
     DEFAULT_WIDTH = 300
     DEFAULT_HEIGHT = 300
     DEFAULT_FORMAT = "png"
+    CONTENT_TYPES = {
+        "png": "image/png",
+        "svg": "image/svg+xml",
+        "pdf": "application/pdf",
+    }
+
+    def __init__(
+        self,
+        pool: IndigoPool | None = None,
+        cache: LRURenderCache | TieredRenderCache | None = None,
+        flights: SingleFlight | None = None,
+        admission: AdmissionController | None = None,
+        prepared: PreparedMoleculeCache | None = None,
+    ):
+        self.pool = pool or get_indigo_pool()
+        self.cache = cache if cache is not None else get_render_cache()
+        self.prepared = (
+            prepared if prepared is not None else get_prepared_molecule_cache()
+        )
+        self.canonical_cache = CanonicalSmilesCache()
+        self.rejected_smiles = RejectedSmilesCache(
+            settings.RENDER_REJECTED_SMILES_CACHE_SIZE
+        )
+        self.flights = flights if flights is not None else get_single_flight()
+        self.admission = admission or get_admission_controller()
+
+    @classmethod
+    def normalize_options(
+        cls,
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str | None = None,
+    ) -> tuple[int, int, str]:
+        """Apply defaults and fall back to the default format if unsupported."""
+        width = width or cls.DEFAULT_WIDTH
+        height = height or cls.DEFAULT_HEIGHT
+        image_format = (image_format or cls.DEFAULT_FORMAT).lower()
 
-    def _get_indigo(self):
-        """Lazy load Indigo to avoid import-time initialization issues."""
-        from indigo import Indigo
-        from indigo.renderer import IndigoRenderer
+        if image_format not in cls.SUPPORTED_FORMATS:
+            image_format = cls.DEFAULT_FORMAT
 
-        indigo = Indigo()
-        renderer = IndigoRenderer(indigo)
-        return indigo, renderer
+        return width, height, image_format
+
+    def canonical_smiles(self, smiles: str) -> str:
+        """Return Indigo canonical SMILES, parsing only unseen inputs."""
+        canonical = self.canonical_cache.get(smiles)
+        if canonical is None:
+            self._raise_if_rejected(smiles)
+            with self.pool.session() as session:
+                molecule = self._load_molecule(session.indigo, smiles, "smiles")
+                with timed_stage("parse"):
+                    canonical = molecule.canonicalSmiles()
+            self.canonical_cache.set(smiles, canonical)
+        return canonical
+
+    def molecule_key(self, smiles: str) -> str:
+        """
+        Return the cache identity of a SMILES input: its canonical SMILES,
+        extended with the input when that drops atom maps or extensions.
+        """
+        return make_smiles_key(smiles, self.canonical_smiles(smiles))
+
+    @classmethod
+    def render_key(
+        cls,
+        molecule_key: str,
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str | None = None,
+    ) -> str:
+        """Return the render cache key for a molecule key and options."""
+        width, height, image_format = cls.normalize_options(width, height, image_format)
+        return make_render_key(molecule_key, width, height, image_format)
+
+    def smiles_render_key(
+        self,
+        smiles: str,
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str | None = None,
+    ) -> str:
+        """Return the render cache key for a SMILES string and options."""
+        return self.render_key(self.molecule_key(smiles), width, height, image_format)
 
     def render_smiles(
         self,
@@ -22,12 +127,78 @@ class ChemicalRenderer:
         height: int | None = None,
         image_format: str | None = None,
     ) -> tuple[bytes, str]:
-        """Render SMILES string to image."""
-        indigo, renderer = self._get_indigo()
-        molecule = indigo.loadMolecule(smiles)
-        return self._render_molecule(
-            indigo, renderer, molecule, width, height, image_format
+        """
+        Render SMILES string to image.
+
+        The Indigo session is only taken once this request leads the render
+        and holds an admission slot; waiting for either does not tie up the
+        thread's session.
+        """
+        width, height, image_format = self.normalize_options(
+            width, height, image_format
         )
+        molecule_key = self.molecule_key(smiles)
+        key = make_render_key(molecule_key, width, height, image_format)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        cost = estimate_render_cost(*smiles_size(smiles), width, height, image_format)
+        return self._render_once(
+            key,
+            lambda: self._render_prepared(
+                smiles, molecule_key, width, height, image_format
+            ),
+            cost,
+        )
+
+    def render_variants(
+        self, smiles: str, variants: list[tuple[str, int, int]]
+    ) -> list[tuple[bytes, str]]:
+        """
+        Render one SMILES as several ``(format, width, height)`` variants.
+
+        Variants missing from the render cache are rendered from a single
+        parsed, laid-out molecule in one Indigo session and cached under the
+        same keys as single renders, so later GETs for them are cache hits.
+        """
+        molecule_key = self.molecule_key(smiles)
+        results: list[tuple[bytes, str] | None] = []
+        missing = []
+        for image_format, width, height in variants:
+            width, height, image_format = self.normalize_options(
+                width, height, image_format
+            )
+            key = make_render_key(molecule_key, width, height, image_format)
+            cached = self._cache_get(key)
+            if cached is None:
+                missing.append((len(results), key, width, height, image_format))
+            results.append(cached)
+        if not missing:
+            return results
+
+        atoms, bonds = smiles_size(smiles)
+        cost = sum(
+            estimate_render_cost(atoms, bonds, width, height, image_format)
+            for _, _, width, height, image_format in missing
+        )
+        with self._admitted(cost), self.pool.session() as session:
+            molecule = self._prepared_molecule(
+                session,
+                molecule_key,
+                lambda: self._load_molecule(session.indigo, smiles, "smiles"),
+            )
+            for index, key, width, height, image_format in missing:
+                result = self._render_molecule(
+                    session.indigo,
+                    session.renderer,
+                    molecule,
+                    width,
+                    height,
+                    image_format,
+                )
+                self._cache_set(key, result)
+                results[index] = result
+        return results
 
     def render_molfile(
         self,
@@ -37,12 +208,131 @@ class ChemicalRenderer:
         image_format: str | None = None,
     ) -> tuple[bytes, str]:
         """Render MOL file content to image."""
-        indigo, renderer = self._get_indigo()
-        molecule = indigo.loadMolecule(molfile_content)
-        return self._render_molecule(
-            indigo, renderer, molecule, width, height, image_format
+        width, height, image_format = self.normalize_options(
+            width, height, image_format
+        )
+        key = make_render_key(
+            make_molfile_key(molfile_content), width, height, image_format
+        )
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        cost = estimate_render_cost(
+            *molfile_size(molfile_content), width, height, image_format
+        )
+        return self._render_once(
+            key,
+            lambda: self._parse_and_render(
+                molfile_content, "molfile", width, height, image_format
+            ),
+            cost,
         )
 
+    def _admitted(self, cost: float):
+        """
+        Admission slot for a render of estimated ``cost`` ms; renders under
+        RENDER_ADMISSION_CHEAP_COST skip the queue.
+        """
+        if cost <= settings.RENDER_ADMISSION_CHEAP_COST:
+            return nullcontext()
+        return self.admission.admit(cost)
+
+    def _render_once(self, key: str, render, cost: float) -> tuple[bytes, str]:
+        """
+        Run ``render`` and cache its result, coalescing concurrent requests
+        for the same key into one render. Only the leading request takes an
+        admission slot; cache hits and coalesced duplicates never do.
+        """
+
+        def render_and_store():
+            with self._admitted(cost):
+                result = render()
+            self._cache_set(key, result)
+            return result
+
+        return self.flights.do(
+            key, render_and_store, recheck=lambda: self._cache_get(key)
+        )
+
+    def _render_prepared(
+        self, smiles: str, molecule_key: str, width: int, height: int, image_format: str
+    ) -> tuple[bytes, str]:
+        with self.pool.session() as session:
+            molecule = self._prepared_molecule(
+                session,
+                molecule_key,
+                lambda: self._load_molecule(session.indigo, smiles, "smiles"),
+            )
+            return self._render_molecule(
+                session.indigo,
+                session.renderer,
+                molecule,
+                width,
+                height,
+                image_format,
+            )
+
+    def _prepared_molecule(self, session, molecule_key: str, load):
+        """
+        Return the session's laid-out molecule for ``molecule_key``, or lay
+        out the molecule returned by ``load`` and keep a clone of it.
+        """
+        molecule = self.prepared.get_molecule(session, molecule_key)
+        if molecule is None:
+            molecule = load()
+            if not molecule.hasCoord():
+                with timed_stage("layout"):
+                    molecule.layout()
+            self.prepared.set_molecule(session, molecule_key, molecule)
+        return molecule
+
+    def _parse_and_render(
+        self, source: str, input_type: str, width: int, height: int, image_format: str
+    ) -> tuple[bytes, str]:
+        with self.pool.session() as session:
+            molecule = self._load_molecule(session.indigo, source, input_type)
+            return self._render_molecule(
+                session.indigo,
+                session.renderer,
+                molecule,
+                width,
+                height,
+                image_format,
+            )
+
+    def _cache_get(self, key: str):
+        with timed_stage("cache"):
+            return self.cache.get(key)
+
+    def _cache_set(self, key: str, result: tuple[bytes, str]):
+        with timed_stage("cache"):
+            self.cache.set(key, result)
+
+    def _raise_if_rejected(self, smiles: str):
+        """Fail fast on SMILES that Indigo recently rejected."""
+        message = self.rejected_smiles.get(smiles)
+        if message is not None:
+            get_metrics_registry().inc("render_rejected_smiles_hits_total")
+            raise RenderError(message)
+
+    def _load_molecule(self, indigo, source: str, input_type: str):
+        """
+        Parse SMILES or MOL file content, counting parse failures.
+
+        Failures are raised as RenderError: they are the client's input, not
+        a broken session, so the pool keeps the session.
+        """
+        try:
+            with timed_stage("parse"):
+                return indigo.loadMolecule(source)
+        except Exception as e:
+            get_metrics_registry().inc(
+                "render_parse_failures_total", {"input": input_type}
+            )
+            if input_type == "smiles":
+                self.rejected_smiles.set(source, str(e))
+            raise RenderError(str(e)) from e
+
     def _render_molecule(
         self,
         indigo,
@@ -53,30 +343,150 @@ class ChemicalRenderer:
         image_format: str | None = None,
     ) -> tuple[bytes, str]:
         """Render molecule object to image bytes."""
-        width = width or self.DEFAULT_WIDTH
-        height = height or self.DEFAULT_HEIGHT
-        image_format = (image_format or self.DEFAULT_FORMAT).lower()
+        width, height, image_format = self.normalize_options(
+            width, height, image_format
+        )
 
-        if image_format not in self.SUPPORTED_FORMATS:
-            image_format = self.DEFAULT_FORMAT
+        # Same layout the renderer would compute, done up front so it is
+        # timed separately; molecules with coordinates keep their depiction.
+        if not molecule.hasCoord():
+            with timed_stage("layout"):
+                molecule.layout()
 
+        started = time.perf_counter()
         indigo.setOption("render-output-format", image_format)
         indigo.setOption("render-image-width", width)
         indigo.setOption("render-image-height", height)
-        indigo.setOption("render-coloring", True)
-        indigo.setOption("render-margins", 10, 10)
 
-        image_bytes = renderer.renderToBuffer(molecule)
+        with timed_stage("render"):
+            image_bytes = renderer.renderToBuffer(molecule)
+        get_metrics_registry().observe(
+            "render_duration_seconds",
+            time.perf_counter() - started,
+            {"format": image_format, "size": size_class(width, height)},
+        )
+
+        return bytes(image_bytes), self.CONTENT_TYPES[image_format]
+
+
+class IsolatedChemicalRenderer(ChemicalRenderer):
+    """
+    Renderer that runs every Indigo call in a supervised subprocess.
+
+    A hanging or crashing render only takes down its worker process, which
+    is replaced; the web worker gets a RenderTimeout or RenderWorkerCrashed.
+    Caching happens inside the workers.
+    """
+
+    def __init__(self, admission: AdmissionController | None = None):
+        """Indigo sessions and render caches live in the worker processes."""
+        self.admission = admission or get_admission_controller()
+        # Kept here too, so known-bad SMILES do not cost a worker round trip.
+        self.rejected_smiles = RejectedSmilesCache(
+            settings.RENDER_REJECTED_SMILES_CACHE_SIZE
+        )
+
+    def _call(
+        self,
+        method: str,
+        size: tuple[int, int],
+        width,
+        height,
+        image_format,
+        **kwargs,
+    ):
+        # Cache hits happen inside the workers, so every costly render
+        # takes an admission slot here.
+        width, height, image_format = self.normalize_options(
+            width, height, image_format
+        )
+        kwargs.update(width=width, height=height, image_format=image_format)
+        cost = estimate_render_cost(*size, width, height, image_format)
+        with self._admitted(cost):
+            return get_render_worker_pool().call(method, **kwargs)
+
+    def canonical_smiles(self, smiles: str) -> str:
+        self._raise_if_rejected(smiles)
+        try:
+            return get_render_worker_pool().call("canonical_smiles", smiles=smiles)
+        except RenderError as e:
+            self.rejected_smiles.set(smiles, str(e))
+            raise
+
+    def render_smiles(
+        self,
+        smiles: str,
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str | None = None,
+    ) -> tuple[bytes, str]:
+        self._raise_if_rejected(smiles)
+        return self._call(
+            "render_smiles",
+            smiles_size(smiles),
+            width,
+            height,
+            image_format,
+            smiles=smiles,
+        )
+
+    def render_variants(
+        self, smiles: str, variants: list[tuple[str, int, int]]
+    ) -> list[tuple[bytes, str]]:
+        self._raise_if_rejected(smiles)
+        atoms, bonds = smiles_size(smiles)
+        cost = sum(
+            estimate_render_cost(
+                atoms, bonds, *self.normalize_options(width, height, image_format)
+            )
+            for image_format, width, height in variants
+        )
+        with self._admitted(cost):
+            return get_render_worker_pool().call(
+                "render_variants", smiles=smiles, variants=variants
+            )
+
+    def render_molfile(
+        self,
+        molfile_content: str,
+        width: int | None = None,
+        height: int | None = None,
+        image_format: str | None = None,
+    ) -> tuple[bytes, str]:
+        return self._call(
+            "render_molfile",
+            molfile_size(molfile_content),
+            width,
+            height,
+            image_format,
+            molfile_content=molfile_content,
+        )
 
-        content_type_map = {
-            "png": "image/png",
-            "svg": "image/svg+xml",
-            "pdf": "application/pdf",
-        }
 
-        return bytes(image_bytes), content_type_map[image_format]
+_renderer: ChemicalRenderer | None = None
 
 
 def get_chemical_renderer():
-    """Get chemical renderer instance."""
-    return ChemicalRenderer()
+    """
+    Get the shared chemical renderer instance.
+
+    With RENDER_ISOLATED enabled, web processes render through subprocesses;
+    the render processes themselves always render in-process.
+    """
+    global _renderer
+    if _renderer is None:
+        if settings.RENDER_ISOLATED and not is_render_process():
+            _renderer = IsolatedChemicalRenderer()
+        else:
+            _renderer = ChemicalRenderer()
+    return _renderer
+
+
+WARM_UP_SMILES = "CC(=O)Oc1ccccc1C(=O)O"
+
+
+def warm_up_renderer(renderer: ChemicalRenderer | None = None):
+    """Render a small molecule in every format to load native code and fonts."""
+    renderer = renderer or get_chemical_renderer()
+    for image_format in ChemicalRenderer.SUPPORTED_FORMATS:
+        renderer.render_smiles(WARM_UP_SMILES, image_format=image_format)
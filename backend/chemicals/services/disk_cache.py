@@ -0,0 +1,217 @@
+import fcntl
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DiskRenderCache:
+    """
+    Host-wide render cache stored as files on local disk.
+
+    Files are sharded by the leading characters of the content hash and
+    written atomically, so every worker on the host can read and fill the
+    same directory. Hits are served from a read-only memory map and returned
+    as a ``memoryview`` over the page cache instead of a copy on the Python
+    heap. Recency is tracked with file mtimes; when the directory grows past
+    ``max_bytes`` a background thread removes the least recently used files,
+    so writers never walk the directory themselves.
+    """
+
+    LOW_WATERMARK = 0.9
+    TOUCH_INTERVAL = 60
+    STALE_TMP_AGE = 3600
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int = 1024 * 1024 * 1024,
+        scan_interval: int = 300,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        self._lock = threading.Lock()
+        self._estimated_bytes = 0
+        self._last_scan = 0.0
+        self._scan_pending = False
+        self._scan_requested = threading.Event()
+        self._evictor_pid: int | None = None
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> tuple[memoryview, str] | None:
+        """Return a memory-mapped view of the cached image or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                mtime = os.fstat(f.fileno()).st_mtime
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self._misses += 1
+            return None
+
+        header_end = mapped.find(b"\n", 0, 128)
+        if header_end < 0:
+            mapped.close()
+            self._unlink(path)
+            with self._lock:
+                self._misses += 1
+            return None
+
+        if time.time() - mtime > self.TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            self._hits += 1
+        content_type = mapped[:header_end].decode("ascii")
+        return memoryview(mapped)[header_end + 1 :], content_type
+
+    def set(self, key: str, value: tuple[bytes, str]):
+        """Atomically write image to disk unless it is already stored."""
+        image_bytes, content_type = value
+        path = self._path(key)
+        if path.exists():
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content_type.encode("ascii") + b"\n")
+                f.write(image_bytes)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._unlink(tmp_path)
+            raise
+
+        self._ensure_evictor()
+        with self._lock:
+            self._writes += 1
+            self._estimated_bytes += len(image_bytes)
+            needs_scan = not self._scan_pending and (
+                self._estimated_bytes > self.max_bytes
+                or time.monotonic() - self._last_scan > self.scan_interval
+            )
+            if needs_scan:
+                self._scan_pending = True
+        if needs_scan:
+            self._scan_requested.set()
+
+    def evict(self):
+        """Remove least recently used files until under the low watermark."""
+        try:
+            self._scan()
+        finally:
+            with self._lock:
+                self._scan_pending = False
+                self._last_scan = time.monotonic()
+
+    def _scan(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".evict.lock", "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is already scanning the directory.
+                return
+
+            now = time.time()
+            entries = []
+            total = 0
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    if name.startswith("."):
+                        if (
+                            name.endswith(".tmp")
+                            and now - stat.st_mtime > self.STALE_TMP_AGE
+                        ):
+                            self._unlink(path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            evicted = 0
+            if total > self.max_bytes:
+                target = self.max_bytes * self.LOW_WATERMARK
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    self._unlink(path)
+                    total -= size
+                    evicted += 1
+
+        with self._lock:
+            self._estimated_bytes = total
+            self._evictions += evicted
+
+    def clear(self):
+        """Remove every cached file."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name != ".evict.lock":
+                    self._unlink(os.path.join(dirpath, name))
+        with self._lock:
+            self._estimated_bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit, miss, write and eviction counters for this process."""
+        with self._lock:
+            return {
+                "bytes": self._estimated_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "evictions": self._evictions,
+            }
+
+    def _ensure_evictor(self):
+        if self._evictor_pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive fork, so start one per process.
+            if self._evictor_pid != os.getpid():
+                self._evictor_pid = os.getpid()
+                self._scan_pending = False
+                threading.Thread(
+                    target=self._run_evictor,
+                    name="render-disk-cache-evictor",
+                    daemon=True,
+                ).start()
+
+    def _run_evictor(self):
+        while True:
+            self._scan_requested.wait()
+            self._scan_requested.clear()
+            try:
+                self.evict()
+            except Exception:
+                logger.exception("Render disk cache eviction failed")
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    @staticmethod
+    def _unlink(path: str | Path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,33 @@
+from rest_framework import status
+
+
+class RenderError(Exception):
+    """Molecule could not be parsed or rendered."""
+
+
+class RenderServiceError(Exception):
+    """Render infrastructure failure mapped to a specific HTTP status."""
+
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+class RenderTimeout(RenderServiceError):
+    """Render exceeded its wall-clock budget."""
+
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+
+
+class RenderWorkerCrashed(RenderServiceError):
+    """Render worker process died while handling the job."""
+
+    status_code = status.HTTP_502_BAD_GATEWAY
+
+
+class RenderRejected(RenderServiceError):
+    """Render shed by admission control because the worker is saturated."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+
+def etag_for_render_key(render_key: str) -> str:
+    """Build a strong ETag from a render cache key."""
+    return quote_etag(render_key)
+
+
+def is_not_modified(request, etag: str) -> bool:
+    """Check whether If-None-Match already covers the given ETag."""
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if "*" in etags:
+        return True
+    # If-None-Match uses weak comparison.
+    return any(tag.removeprefix("W/") == etag for tag in etags)
+
+
+def patch_render_cache_headers(response, etag: str):
+    """Attach ETag, Cache-Control and Vary headers to a render response."""
+    response["ETag"] = etag
+    if settings.RENDER_CACHE_CONTROL:
+        response["Cache-Control"] = settings.RENDER_CACHE_CONTROL
+    if settings.RENDER_VARY_HEADERS:
+        patch_vary_headers(response, settings.RENDER_VARY_HEADERS)
+    return response
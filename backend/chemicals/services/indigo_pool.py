@@ -0,0 +1,130 @@
+import threading
+import weakref
+from contextlib import contextmanager
+
+from chemicals.services.exceptions import RenderError, RenderServiceError
+from chemicals.services.metrics import get_metrics_registry
+from django.conf import settings
+
+# Options that never change between renders are applied once per session.
+BASE_RENDER_OPTIONS = (
+    ("render-coloring", (True,)),
+    ("render-margins", (10, 10)),
+)
+
+
+class IndigoSession:
+    """Indigo instance with its renderer and a usage counter."""
+
+    def __init__(self):
+        from indigo import Indigo
+        from indigo.renderer import IndigoRenderer
+
+        self.indigo = Indigo()
+        self.renderer = IndigoRenderer(self.indigo)
+        self.uses = 0
+        self.reset_options()
+
+    def reset_options(self):
+        """Restore session options to the base render configuration."""
+        self.indigo.resetOptions()
+        for name, values in BASE_RENDER_OPTIONS:
+            self.indigo.setOption(name, *values)
+
+
+class IndigoPool:
+    """
+    Per-thread pool of long-lived Indigo sessions.
+
+    Indigo objects are bound to the session that created them, so every
+    thread gets its own session. A session is recycled after ``max_uses``
+    renders or as soon as Indigo fails inside it. Bad input (RenderError)
+    and shed or timed-out requests (RenderServiceError) leave it in place,
+    so clients cannot force sessions to be rebuilt.
+    """
+
+    def __init__(self, max_uses: int = 1000):
+        self.max_uses = max_uses
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._in_use = 0
+        self._created = 0
+        self._recycled = 0
+
+    @contextmanager
+    def session(self):
+        """Borrow the current thread's session for one render."""
+        session = getattr(self._local, "session", None)
+        if session is not None and session.uses >= self.max_uses:
+            self._discard(session)
+            session = None
+        if session is None:
+            session = self._create()
+
+        with self._lock:
+            self._in_use += 1
+        try:
+            yield session
+        except (RenderError, RenderServiceError):
+            self._finish(session)
+            raise
+        except Exception:
+            self._discard(session)
+            raise
+        else:
+            self._finish(session)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+
+    def stats(self) -> dict:
+        """Return pool occupancy counters."""
+        with self._lock:
+            return {
+                "live": self._live,
+                "in_use": self._in_use,
+                "idle": self._live - self._in_use,
+                "created": self._created,
+                "recycled": self._recycled,
+                "max_uses": self.max_uses,
+            }
+
+    def _create(self) -> IndigoSession:
+        session = IndigoSession()
+        weakref.finalize(session, self._release)
+        with self._lock:
+            self._live += 1
+            self._created += 1
+        self._local.session = session
+        return session
+
+    def _finish(self, session: IndigoSession):
+        session.uses += 1
+        if session.uses < self.max_uses:
+            session.reset_options()
+
+    def _discard(self, session: IndigoSession):
+        if getattr(self._local, "session", None) is session:
+            del self._local.session
+            with self._lock:
+                self._recycled += 1
+
+    def _release(self):
+        with self._lock:
+            self._live -= 1
+
+
+_pool: IndigoPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_indigo_pool() -> IndigoPool:
+    """Get the process-wide Indigo session pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = IndigoPool(max_uses=settings.INDIGO_SESSION_MAX_RENDERS)
+                get_metrics_registry().register_collector("indigo_pool", _pool.stats)
+    return _pool
@@ -0,0 +1,177 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from chemicals.models import RequestLog
+from chemicals.services.metrics import get_metrics_registry
+from django.conf import settings
+from django.core import serializers
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class RequestLogSink:
+    """
+    Background writer that batches RequestLog inserts.
+
+    Request threads enqueue unsaved ``RequestLog`` instances without touching
+    the database; a daemon thread flushes them with ``bulk_create`` whenever
+    ``batch_size`` records are pending or ``flush_interval`` seconds have
+    passed. When the queue is full, or a flush fails, records are appended to
+    ``spill_path`` as JSON Lines (loadable with ``manage.py loaddata``) or
+    dropped if no spill file is configured.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        spill_path: str = "",
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._written = 0
+        self._spilled = 0
+        self._dropped = 0
+
+    def put(self, record: RequestLog):
+        """Enqueue a record for writing without blocking the caller."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._overflow([record])
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending records and stop the writer thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+    def stats(self) -> dict:
+        """Return queue depth and written/spilled/dropped counters."""
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self._written,
+                "spilled": self._spilled,
+                "dropped": self._dropped,
+            }
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            # Threads do not survive fork, so start one per process.
+            if self._pid != os.getpid() or self._thread is None:
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="request-log-sink", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._drain(batch)
+                self._flush(batch)
+                connection.close()
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _drain(self, batch: list):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                batch.append(item)
+
+    def _flush(self, batch: list):
+        if not batch:
+            return
+        metrics = get_metrics_registry()
+        started = time.perf_counter()
+        try:
+            RequestLog.objects.bulk_create(batch)
+        except Exception:
+            logger.exception("Failed to write %d request log records", len(batch))
+            connection.close()
+            self._overflow(batch)
+        else:
+            metrics.observe("request_log_write_seconds", time.perf_counter() - started)
+            metrics.inc("request_log_records_total", {"outcome": "written"}, len(batch))
+            with self._lock:
+                self._written += len(batch)
+
+    def _overflow(self, records: list):
+        if self.spill_path:
+            try:
+                with self._lock, open(self.spill_path, "a") as spill:
+                    spill.write(serializers.serialize("jsonl", records))
+                    self._spilled += len(records)
+                get_metrics_registry().inc(
+                    "request_log_records_total", {"outcome": "spilled"}, len(records)
+                )
+                return
+            except OSError:
+                logger.exception("Failed to spill request log records")
+        with self._lock:
+            self._dropped += len(records)
+        get_metrics_registry().inc(
+            "request_log_records_total", {"outcome": "dropped"}, len(records)
+        )
+
+
+_sink: RequestLogSink | None = None
+_sink_lock = threading.Lock()
+
+
+def get_request_log_sink() -> RequestLogSink:
+    """Get the process-wide request log sink."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = RequestLogSink(
+                    max_queue=settings.REQUEST_LOG_QUEUE_SIZE,
+                    batch_size=settings.REQUEST_LOG_BATCH_SIZE,
+                    flush_interval=settings.REQUEST_LOG_FLUSH_INTERVAL,
+                    spill_path=settings.REQUEST_LOG_SPILL_PATH,
+                )
+                get_metrics_registry().register_collector(
+                    "request_log_sink", lambda: {"queued": _sink.stats()["queued"]}
+                )
+    return _sink
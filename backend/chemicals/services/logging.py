@@ -1,7 +1,13 @@
+import math
 import time
 from functools import wraps
 
-from chemicals.models import RequestLog
+from chemicals.models import RequestLog, hash_smiles
+from chemicals.services.exceptions import RenderRejected, RenderServiceError
+from chemicals.services.log_sink import get_request_log_sink
+from chemicals.services.metrics import get_metrics_registry
+from chemicals.services.timing import current_timer, timed_stage
+from django.conf import settings
 from rest_framework import status
 from rest_framework.response import Response
 
@@ -10,6 +16,7 @@ def log_request(
     request,
     method: str,
     smiles: str | None = None,
+    canonical_smiles: str | None = None,
     has_molfile: bool = False,
     width: int | None = None,
     height: int | None = None,
@@ -18,12 +25,19 @@ def log_request(
     error_message: str | None = None,
     response_time_ms: int | None = None,
 ):
-    """Log API request to database."""
+    """
+    Log API request to database, via the background sink unless disabled.
+
+    ``smiles_hash`` is taken from ``canonical_smiles`` when the view has it,
+    otherwise from the SMILES as given (e.g. when it failed to parse).
+    """
     user = request.user if request.user.is_authenticated else None
-    RequestLog.objects.create(
+    timer = current_timer()
+    record = RequestLog(
         user=user,
         method=method,
         smiles=smiles,
+        smiles_hash=hash_smiles(canonical_smiles or smiles) if smiles else None,
         has_molfile=has_molfile,
         width=width,
         height=height,
@@ -31,8 +45,18 @@ def log_request(
         success=success,
         error_message=error_message,
         response_time_ms=response_time_ms,
+        stage_timings=timer.as_dict() if timer else None,
         user_agent=request.META.get("HTTP_USER_AGENT", "")[:500],
     )
+    with timed_stage("log"):
+        if settings.REQUEST_LOG_ASYNC:
+            get_request_log_sink().put(record)
+        else:
+            metrics = get_metrics_registry()
+            started = time.perf_counter()
+            record.save()
+            metrics.observe("request_log_write_seconds", time.perf_counter() - started)
+            metrics.inc("request_log_records_total", {"outcome": "written"})
 
 
 def with_logging(method: str):
@@ -47,15 +71,28 @@ def with_logging(method: str):
                 response = view_func(self, request, *args, **kwargs)
                 response_time_ms = int((time.time() - start_time) * 1000)
 
-                # Get logging data from request (set by view)
+                # Get logging data from request (set by view, may override success)
+                log_data = getattr(request, "_log_data", {})
+                log_request(
+                    request=request,
+                    method=method,
+                    response_time_ms=response_time_ms,
+                    **{"success": True, **log_data},
+                )
+                return response
+
+            except RenderServiceError as e:
+                response_time_ms = int((time.time() - start_time) * 1000)
                 log_data = getattr(request, "_log_data", {})
                 log_request(
                     request=request,
                     method=method,
                     response_time_ms=response_time_ms,
-                    success=True,
-                    **log_data,
+                    **{**log_data, "success": False, "error_message": str(e)},
                 )
+                response = Response({"error": str(e)}, status=e.status_code)
+                if isinstance(e, RenderRejected):
+                    response["Retry-After"] = str(math.ceil(e.retry_after))
                 return response
 
             except Exception as e:
@@ -65,9 +102,7 @@ def with_logging(method: str):
                     request=request,
                     method=method,
                     response_time_ms=response_time_ms,
-                    success=False,
-                    error_message=str(e),
-                    **log_data,
+                    **{**log_data, "success": False, "error_message": str(e)},
                 )
                 return Response(
                     {"error": f"Failed to render molecule: {str(e)}"},
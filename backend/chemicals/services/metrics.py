@@ -0,0 +1,342 @@
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "http_responses_total": (
+        "counter",
+        "HTTP responses by view, method and status code.",
+        None,
+    ),
+    "http_request_duration_seconds": (
+        "histogram",
+        "Time spent handling HTTP requests.",
+        LATENCY_BUCKETS,
+    ),
+    "throttle_rejections_total": (
+        "counter",
+        "Requests rejected by rate limiting.",
+        None,
+    ),
+    "render_duration_seconds": (
+        "histogram",
+        "Time spent rendering a molecule by format and image size class.",
+        LATENCY_BUCKETS,
+    ),
+    "render_parse_failures_total": (
+        "counter",
+        "Inputs Indigo failed to parse.",
+        None,
+    ),
+    "render_rejected_smiles_hits_total": (
+        "counter",
+        "SMILES failed from the cache of inputs Indigo rejected before.",
+        None,
+    ),
+    "request_log_write_seconds": (
+        "histogram",
+        "Time spent writing RequestLog rows to the database.",
+        LATENCY_BUCKETS,
+    ),
+    "request_log_records_total": (
+        "counter",
+        "RequestLog records by outcome (written, spilled, dropped).",
+        None,
+    ),
+}
+
+GAUGE_HELP = "Sum over live processes of the component's stats() value."
+
+
+def size_class(width: int, height: int) -> str:
+    """Coarse image size label for render metrics."""
+    longest = max(width, height)
+    if longest <= 300:
+        return "small"
+    if longest <= 1000:
+        return "medium"
+    return "large"
+
+
+def _label_key(labels: dict | None) -> str:
+    return json.dumps(sorted((labels or {}).items()))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(target: dict, snapshot: dict):
+    """Add a snapshot's counters and histograms into target."""
+    for name, series in snapshot.get("counters", {}).items():
+        merged = target["counters"].setdefault(name, {})
+        for key, value in series.items():
+            merged[key] = merged.get(key, 0) + value
+    for name, series in snapshot.get("histograms", {}).items():
+        merged = target["histograms"].setdefault(name, {})
+        for key, values in series.items():
+            if key in merged:
+                merged[key] = [a + b for a, b in zip(merged[key], values)]
+            else:
+                merged[key] = list(values)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: str, extra: tuple = ()) -> str:
+    pairs = [tuple(pair) for pair in json.loads(key)] + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics shared with other workers through a directory.
+
+    Each process writes a JSON snapshot of its counters, histograms and
+    collector gauges to ``<directory>/<pid>.<token>.json``, at most every
+    ``flush_interval`` seconds while it is recording. A scrape merges every
+    snapshot: counters and histograms are summed over all processes, with
+    snapshots of exited processes folded into ``archive.json`` so totals
+    never go backwards; gauges are summed over live processes only.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        flush_interval: float = 2.0,
+        enabled: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._collectors: dict[str, tuple] = {}
+        self._pid: int | None = None
+        self._check_fork()
+        atexit.register(self.flush)
+
+    def _check_fork(self):
+        # Values inherited from a parent process belong to the parent.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._token = uuid.uuid4().hex[:8]
+            self._counters: dict[str, dict[str, float]] = {}
+            self._histograms: dict[str, dict[str, list]] = {}
+            self._last_flush = 0.0
+
+    def inc(self, name: str, labels: dict | None = None, value: float = 1):
+        """Increment a counter."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._check_fork()
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, labels: dict | None = None):
+        """Record a histogram observation."""
+        if not self.enabled:
+            return
+        buckets = METRICS[name][2]
+        key = _label_key(labels)
+        with self._lock:
+            self._check_fork()
+            series = self._histograms.setdefault(name, {})
+            # Non-cumulative bucket counts, then +Inf, sum and count.
+            data = series.setdefault(key, [0] * (len(buckets) + 3))
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    data[index] += 1
+                    break
+            else:
+                data[len(buckets)] += 1
+            data[-2] += value
+            data[-1] += 1
+        self._maybe_flush()
+
+    def register_collector(self, prefix: str, collector, label: str | None = None):
+        """
+        Export a component's ``stats()`` dict as ``<prefix>_<field>`` gauges.
+
+        If ``label`` is given, the stats dict is nested one level and its
+        keys become values of that label. Registering the same prefix again
+        replaces the previous collector.
+        """
+        with self._lock:
+            self._collectors[prefix] = (collector, label)
+
+    def flush(self):
+        """Write this process's snapshot atomically."""
+        if not self.enabled:
+            return
+        gauges = self._collect()
+        with self._lock:
+            self._check_fork()
+            self._last_flush = time.monotonic()
+            data = json.dumps(
+                {
+                    "pid": self._pid,
+                    "counters": self._counters,
+                    "histograms": self._histograms,
+                    "gauges": gauges,
+                }
+            )
+            path = self.directory / f"{self._pid}.{self._token}.json"
+        self._write(path, data)
+
+    def render(self) -> str:
+        """Return metrics merged over all processes in Prometheus text format."""
+        self.flush()
+        totals = {"counters": {}, "histograms": {}}
+        gauges: dict[str, dict[str, float]] = {}
+
+        with open(self.directory / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            archive_path = self.directory / "archive.json"
+            archive = self._read(archive_path) or {"counters": {}, "histograms": {}}
+            _merge(totals, archive)
+
+            dead = []
+            for path in self.directory.glob("*.*.json"):
+                snapshot = self._read(path)
+                if snapshot is None:
+                    continue
+                _merge(totals, snapshot)
+                if _pid_alive(snapshot["pid"]):
+                    for name, series in snapshot["gauges"].items():
+                        merged = gauges.setdefault(name, {})
+                        for key, value in series.items():
+                            merged[key] = merged.get(key, 0) + value
+                else:
+                    _merge(archive, snapshot)
+                    dead.append(path)
+
+            if dead:
+                self._write(archive_path, json.dumps(archive))
+                for path in dead:
+                    path.unlink(missing_ok=True)
+
+        return self._format(totals, gauges)
+
+    def _collect(self) -> dict:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges: dict[str, dict[str, float]] = {}
+        for prefix, (collector, label) in collectors:
+            try:
+                stats = collector()
+            except Exception:
+                continue
+            groups = stats.items() if label else [(None, stats)]
+            for group, values in groups:
+                labels = {label: group} if label else None
+                for field, value in values.items():
+                    if isinstance(value, (int, float)):
+                        series = gauges.setdefault(f"{prefix}_{field}", {})
+                        series[_label_key(labels)] = value
+        return gauges
+
+    def _format(self, totals: dict, gauges: dict) -> str:
+        lines = []
+        for name, (metric_type, help_text, buckets) in METRICS.items():
+            if metric_type == "counter":
+                series = totals["counters"].get(name)
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            else:
+                series = totals["histograms"].get(name)
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, data in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*buckets, "+Inf"), data):
+                        cumulative += count
+                        le = (("le", bound if bound == "+Inf" else repr(bound)),)
+                        bucket_labels = _format_labels(key, le)
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    labels = _format_labels(key)
+                    lines.append(f"{name}_sum{labels} {_format_value(data[-2])}")
+                    lines.append(f"{name}_count{labels} {data[-1]}")
+
+        for name, series in sorted(gauges.items()):
+            lines.append(f"# HELP {name} {GAUGE_HELP}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def _write(self, path: Path, data: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _read(path: Path) -> dict | None:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+
+_registry: MetricsRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry(
+                    settings.METRICS_DIR,
+                    flush_interval=settings.METRICS_FLUSH_INTERVAL,
+                    enabled=settings.METRICS_ENABLED,
+                )
+    return _registry
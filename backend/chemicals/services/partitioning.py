@@ -0,0 +1,223 @@
+import re
+from datetime import datetime, timezone
+
+from chemicals.models import RequestLog
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+LEGACY_SUFFIX = "_legacy"
+DEFAULT_SUFFIX = "_default"
+
+# Upper bound of a range partition, as printed by pg_get_expr().
+_UPPER_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+_SHORT_OFFSET_RE = re.compile(r"([+-]\d\d)$")
+_INDEX_DEF_RE = re.compile(r"^CREATE INDEX (\S+) ON (\S+) (USING .+)$")
+
+
+def _table() -> str:
+    return RequestLog._meta.db_table
+
+
+def _month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(moment: datetime) -> datetime:
+    if moment.month == 12:
+        return datetime(moment.year + 1, 1, 1, tzinfo=timezone.utc)
+    return datetime(moment.year, moment.month + 1, 1, tzinfo=timezone.utc)
+
+
+def _bound(moment: datetime) -> str:
+    return moment.strftime("'%Y-%m-%d %H:%M:%S+00'")
+
+
+def is_partitioned() -> bool:
+    """Whether the RequestLog table is a PostgreSQL partitioned table."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class "
+            "WHERE relname = %s AND relnamespace = current_schema()::regnamespace",
+            [_table()],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def parse_bound(value: str) -> datetime:
+    """Parse a timestamptz partition bound such as ``2024-02-01 00:00:00+00``."""
+    # Python 3.10 only reads "+HH:MM" offsets; PostgreSQL prints "+HH".
+    value = _SHORT_OFFSET_RE.sub(r"\1:00", value)
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def range_partitions() -> list[tuple[str, datetime]]:
+    """Range partitions of the RequestLog table with their upper bounds."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [_table()],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND_RE.search(bound)
+        if match:
+            partitions.append((name, parse_bound(match.group(1))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def _default_partition() -> str | None:
+    """Name of the default partition of the RequestLog table, if it has one."""
+    name = f"{_table()}{DEFAULT_SUFFIX}"
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        return name if cursor.fetchone()[0] else None
+
+
+def create_monthly_partitions(until: datetime) -> list[str]:
+    """
+    Add monthly partitions after the last existing one up to ``until``.
+
+    Rows that already landed in the default partition for a new month are
+    moved into its partition: each one is built as a plain table, filled
+    from the default partition and then attached, with writes to the default
+    partition blocked meanwhile. Run this inside a transaction.
+    """
+    qn = connection.ops.quote_name
+    table = qn(_table())
+    partitions = range_partitions()
+    start = partitions[-1][1] if partitions else _month_start(until)
+    default = _default_partition()
+    created = []
+    with connection.cursor() as cursor:
+        if default:
+            cursor.execute(f"LOCK TABLE {qn(default)} IN EXCLUSIVE MODE")
+        while start <= until:
+            end = _next_month(start)
+            name = f"{_table()}_p{start:%Y_%m}"
+            bounds = f"FROM ({_bound(start)}) TO ({_bound(end)})"
+            if default:
+                cursor.execute(
+                    f"CREATE TABLE {qn(name)} (LIKE {table} INCLUDING DEFAULTS)"
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {qn(default)} "
+                    f"WHERE created_at >= {_bound(start)} "
+                    f"AND created_at < {_bound(end)} RETURNING *) "
+                    f"INSERT INTO {qn(name)} SELECT * FROM moved"
+                )
+                cursor.execute(
+                    f"ALTER TABLE {table} ATTACH PARTITION {qn(name)} "
+                    f"FOR VALUES {bounds}"
+                )
+            else:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {qn(name)} "
+                    f"PARTITION OF {table} FOR VALUES {bounds}"
+                )
+            created.append(name)
+            start = end
+    return created
+
+
+def partition_request_log_table(months_ahead: int) -> list[str]:
+    """
+    Convert the RequestLog table into one range-partitioned by ``created_at``.
+
+    The existing table becomes the first partition, covering everything up
+    to the start of next month, so no rows are copied; attaching it scans
+    the table once under an exclusive lock. Monthly partitions are created
+    ``months_ahead`` ahead, plus a default partition. Running it again
+    only adds missing monthly partitions.
+    """
+    now = datetime.now(timezone.utc)
+    until = _month_start(now)
+    for _ in range(months_ahead):
+        until = _next_month(until)
+
+    if is_partitioned():
+        with transaction.atomic():
+            return create_monthly_partitions(until)
+
+    table = _table()
+    legacy = f"{table}{LEGACY_SUFFIX}"
+    qn = connection.ops.quote_name
+    user_model = get_user_model()
+    boundary = _next_month(now)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = %s AND schemaname = current_schema() "
+            "AND indexdef LIKE 'CREATE INDEX %%'",
+            [table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {qn(table)}")
+        max_id = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+        # Ids now come from a sequence owned by the partitioned table.
+        cursor.execute(
+            f"ALTER TABLE {qn(legacy)} ALTER COLUMN id DROP IDENTITY IF EXISTS"
+        )
+        cursor.execute(f"ALTER TABLE {qn(legacy)} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        sequence = f"{table}_partitioned_id_seq"
+        cursor.execute(
+            f"CREATE SEQUENCE {qn(sequence)} START WITH {max_id + 1} "
+            f"OWNED BY {qn(table)}.id"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{sequence}')"
+        )
+        # The partition key has to be part of the primary key.
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_part_pkey')} "
+            "PRIMARY KEY (id, created_at)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_part_user_fk')} "
+            f"FOREIGN KEY (user_id) REFERENCES {qn(user_model._meta.db_table)} "
+            f"({qn(user_model._meta.pk.column)}) DEFERRABLE INITIALLY DEFERRED"
+        )
+        for name, definition in indexes:
+            match = _INDEX_DEF_RE.match(definition)
+            if match:
+                cursor.execute(
+                    f"CREATE INDEX {qn(name[:57] + '_part')} "
+                    f"ON {qn(table)} {match.group(3)}"
+                )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(legacy)} "
+            f"FOR VALUES FROM (MINVALUE) TO ({_bound(boundary)})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {qn(table + DEFAULT_SUFFIX)} "
+            f"PARTITION OF {qn(table)} DEFAULT"
+        )
+        return [legacy, *create_monthly_partitions(until)]
+
+
+def drop_partitions_before(cutoff: datetime) -> list[str]:
+    """Drop whole partitions whose rows are all older than ``cutoff``."""
+    dropped = []
+    for name, upper in range_partitions():
+        if upper > cutoff:
+            break
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+        dropped.append(name)
+    return dropped
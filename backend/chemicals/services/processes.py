@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from chemicals.bootstrap import RENDER_PROCESS_ENV, init_render_process
+from django.conf import settings
+
+
+def is_render_process() -> bool:
+    """Whether the current process is a spawned render worker."""
+    return os.environ.get(RENDER_PROCESS_ENV) == "1"
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_render_executor() -> ProcessPoolExecutor:
+    """
+    Get the process pool used for parallel rendering.
+
+    Workers are spawned rather than forked so they never inherit Indigo
+    state or locks from a threaded web worker; each one builds its own
+    Indigo sessions on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.RENDER_PROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_render_process,
+                )
+    return _executor
+
+
+def reset_render_executor(kill: bool = False):
+    """
+    Discard the process pool, e.g. after a worker process died.
+
+    With ``kill``, worker processes still running a task (e.g. a render
+    that timed out) are killed instead of being left to finish it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            # ProcessPoolExecutor has no public way to stop busy workers.
+            processes = list((_executor._processes or {}).values()) if kill else []
+            _executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.kill()
+            _executor = None
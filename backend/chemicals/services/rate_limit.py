@@ -0,0 +1,185 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Rows idle for this many windows are deleted now and then.
+EXPIRE_AFTER_WINDOWS = 2
+CLEANUP_PROBABILITY = 0.001
+
+
+def sliding_window(
+    previous: int, current: int, elapsed: float, window: float, limit: int
+) -> tuple[bool, float]:
+    """
+    Sliding-window counter decision for one request.
+
+    The previous fixed window's count is weighted by how much of it still
+    overlaps the sliding window. Returns ``(allowed, wait)``, where
+    ``wait`` is the number of seconds until a request would be allowed.
+    """
+    weight = 1.0 - elapsed / window
+    if previous * weight + current < limit:
+        return True, 0.0
+    if current >= limit or not previous:
+        return False, window - elapsed
+    # Time until the previous window's weighted share drops enough.
+    excess = previous * weight + current - limit + 1
+    return False, min(excess * window / previous, window - elapsed)
+
+
+class SQLiteRateLimitStore:
+    """
+    Rate limit counters in a SQLite file in WAL mode, shared by every
+    process on the host.
+
+    Each key is one row holding the counts of the current and previous
+    fixed windows, so a request is one short write transaction. Counters
+    survive worker restarts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross fork() or threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window_start REAL NOT NULL, "
+                "window REAL NOT NULL, previous INTEGER NOT NULL, "
+                "current INTEGER NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        """Count a request against ``key`` if allowed; return ``(allowed, wait)``."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, previous, current FROM rate_limits "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            window_start = now - now % window
+            previous = current = 0
+            if row:
+                if row[0] == window_start:
+                    previous, current = row[1], row[2]
+                elif row[0] == window_start - window:
+                    previous = row[2]
+            allowed, wait = sliding_window(
+                previous, current, now - window_start, window, limit
+            )
+            if allowed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits "
+                    "(key, window_start, window, previous, current) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, window_start, window, previous, current + 1),
+                )
+            if random.random() < CLEANUP_PROBABILITY:
+                conn.execute(
+                    "DELETE FROM rate_limits WHERE window_start + window * ? < ?",
+                    (EXPIRE_AFTER_WINDOWS, now),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, wait
+
+    def clear(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+
+# Same sliding-window counter as above, atomically inside Redis.
+REDIS_HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local window_start = now - (now % window)
+local state = redis.call('HMGET', KEYS[1], 'start', 'previous', 'current')
+local previous, current = 0, 0
+if state[1] then
+    local start = tonumber(state[1])
+    if start == window_start then
+        previous, current = tonumber(state[2]), tonumber(state[3])
+    elseif start == window_start - window then
+        previous = tonumber(state[3])
+    end
+end
+local elapsed = now - window_start
+if previous * (1 - elapsed / window) + current < limit then
+    redis.call('HSET', KEYS[1], 'start', window_start, 'previous', previous,
+        'current', current + 1)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(window * 2000))
+    return {1, previous, current, tostring(elapsed)}
+end
+return {0, previous, current, tostring(elapsed)}
+"""
+
+
+class RedisRateLimitStore:
+    """Rate limit counters in Redis, shared across hosts (needs ``redis``)."""
+
+    def __init__(self, url: str, prefix: str = "throttle:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "THROTTLE_BACKEND=redis requires the redis package"
+            ) from e
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(REDIS_HIT_SCRIPT)
+
+    def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        """Count a request against ``key`` if allowed; return ``(allowed, wait)``."""
+        allowed, previous, current, elapsed = self.script(
+            keys=[self.prefix + key], args=[time.time(), window, limit]
+        )
+        if allowed:
+            return True, 0.0
+        return sliding_window(
+            int(previous), int(current), float(elapsed), window, limit
+        )
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rate_limit_store():
+    """Get the process-wide rate limit store configured by THROTTLE_BACKEND."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.THROTTLE_BACKEND == "redis":
+                    _store = RedisRateLimitStore(settings.THROTTLE_REDIS_URL)
+                elif settings.THROTTLE_BACKEND == "sqlite":
+                    _store = SQLiteRateLimitStore(settings.THROTTLE_SQLITE_PATH)
+                else:
+                    raise ImproperlyConfigured(
+                        f"Unknown THROTTLE_BACKEND {settings.THROTTLE_BACKEND!r}"
+                    )
+    return _store
@@ -0,0 +1,287 @@
+import hashlib
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from chemicals.services.disk_cache import DiskRenderCache
+from chemicals.services.metrics import get_metrics_registry
+from django.conf import settings
+
+# Bump when renderer output changes so persistent cache entries are not reused.
+# 2: SMILES are rendered from the prepared (serialized) molecule.
+# 3: atom maps and CXSMILES extensions are part of the molecule key.
+# 4: prepared molecules are clones, rendered exactly like a fresh parse.
+RENDER_KEY_VERSION = 4
+
+
+def make_render_key(
+    molecule_key: str, width: int, height: int, image_format: str
+) -> str:
+    """Build a content-addressed cache key for a molecule and render options."""
+    payload = f"{RENDER_KEY_VERSION}|{molecule_key}|{width}|{height}|{image_format}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# canonicalSmiles() drops atom maps ("[CH2:1]") and everything after the first
+# whitespace (CXSMILES extensions), but the renderer draws them.
+_SMILES_EXTRAS = re.compile(r":\d+\]|\s")
+
+
+def make_smiles_key(smiles: str, canonical: str) -> str:
+    """
+    Identify a SMILES input by its canonical form, plus the input itself when
+    it has atom maps or a CXSMILES extension the canonical form loses.
+    """
+    smiles = smiles.strip()
+    if _SMILES_EXTRAS.search(smiles):
+        return f"{canonical}|{smiles}"
+    return canonical
+
+
+def make_molfile_key(molfile_content: str) -> str:
+    """Identify a MOL file by its content (coordinates affect the drawing)."""
+    digest = hashlib.sha256(molfile_content.encode("utf-8")).hexdigest()
+    return f"molfile:{digest}"
+
+
+class LRURenderCache:
+    """
+    In-memory LRU cache of rendered images.
+
+    Entries are ``(image_bytes, content_type)`` tuples. The cache is bounded
+    by the total size of stored images; ``ttl`` of 0 disables expiry and
+    ``max_bytes`` of 0 disables caching.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: int = 0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, tuple[bytes, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        """Return cached image or None, refreshing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: tuple[bytes, str]):
+        """Store image, evicting least recently used entries over budget."""
+        size = self._size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), value)
+            self._size += size
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._size -= self._size_of(value)
+
+    @staticmethod
+    def _size_of(value) -> int:
+        return len(value[0])
+
+
+class PreparedMoleculeCache(LRURenderCache):
+    """
+    In-memory LRU cache of parsed, laid-out molecules.
+
+    Indigo objects belong to the Indigo instance that created them, so
+    entries are ``clone()`` copies kept per pool session and dropped when
+    the pool discards that session. A clone is exact, unlike ``serialize()``
+    or molfile round trips, so renders from it match a fresh parse byte
+    for byte. Bounded by an estimate of the molecules' native memory.
+    """
+
+    # Measured Indigo clone footprint: a fixed part plus one per atom or bond.
+    BASE_BYTES = 4096
+    BYTES_PER_ITEM = 160
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        super().__init__(max_bytes)
+        self._sessions: set[int] = set()
+
+    def get_molecule(self, session, molecule_key: str):
+        """Return the session's prepared molecule or None."""
+        entry = self.get((id(session), molecule_key))
+        return entry[0] if entry is not None else None
+
+    def set_molecule(self, session, molecule_key: str, molecule):
+        """Keep a clone of a laid-out molecule for later renders in ``session``."""
+        size = self.BASE_BYTES + self.BYTES_PER_ITEM * (
+            molecule.countAtoms() + molecule.countBonds()
+        )
+        if size > self.max_bytes:
+            return
+        session_id = id(session)
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions.add(session_id)
+                weakref.finalize(session, self._purge, session_id)
+        self.set((session_id, molecule_key), (molecule.clone(), size))
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats["sessions"] = len(self._sessions)
+        return stats
+
+    def _purge(self, session_id: int):
+        with self._lock:
+            self._sessions.discard(session_id)
+            for key in [key for key in self._entries if key[0] == session_id]:
+                self._remove(key)
+
+    @staticmethod
+    def _size_of(value) -> int:
+        return value[1]
+
+
+class CanonicalSmilesCache:
+    """Bounded LRU mapping of input SMILES to Indigo canonical SMILES."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, smiles: str) -> str | None:
+        """Return the canonical form of a previously seen SMILES."""
+        with self._lock:
+            canonical = self._entries.get(smiles)
+            if canonical is not None:
+                self._entries.move_to_end(smiles)
+            return canonical
+
+    def set(self, smiles: str, canonical: str):
+        """Remember the canonical form of a SMILES string."""
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[smiles] = canonical
+            self._entries.move_to_end(smiles)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RejectedSmilesCache(CanonicalSmilesCache):
+    """Bounded LRU mapping of SMILES Indigo rejected to its error message."""
+
+
+class TieredRenderCache:
+    """Per-process memory tier in front of the host-wide disk tier."""
+
+    def __init__(self, memory: LRURenderCache, disk: DiskRenderCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        """Look up the memory tier first, then the disk tier."""
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+        return value
+
+    def set(self, key: str, value: tuple[bytes, str]):
+        """Store image in both tiers."""
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self):
+        """Drop all entries from both tiers."""
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> dict:
+        """Return counters for each tier."""
+        return {"memory": self.memory.stats(), "disk": self.disk.stats()}
+
+
+_cache: LRURenderCache | TieredRenderCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> LRURenderCache | TieredRenderCache:
+    """Get the process-wide render cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                memory = LRURenderCache(
+                    max_bytes=settings.RENDER_CACHE_MAX_BYTES,
+                    ttl=settings.RENDER_CACHE_TTL,
+                )
+                if settings.RENDER_DISK_CACHE_MAX_BYTES:
+                    disk = DiskRenderCache(
+                        root=settings.RENDER_DISK_CACHE_DIR,
+                        max_bytes=settings.RENDER_DISK_CACHE_MAX_BYTES,
+                    )
+                    _cache = TieredRenderCache(memory, disk)
+                    stats = _cache.stats
+                else:
+                    _cache = memory
+                    stats = lambda: {"memory": memory.stats()}  # noqa: E731
+                get_metrics_registry().register_collector(
+                    "render_cache", stats, label="tier"
+                )
+    return _cache
+
+
+_prepared_cache: PreparedMoleculeCache | None = None
+_prepared_cache_lock = threading.Lock()
+
+
+def get_prepared_molecule_cache() -> PreparedMoleculeCache:
+    """Get the process-wide prepared molecule cache."""
+    global _prepared_cache
+    if _prepared_cache is None:
+        with _prepared_cache_lock:
+            if _prepared_cache is None:
+                _prepared_cache = PreparedMoleculeCache(
+                    max_bytes=settings.RENDER_PREPARED_CACHE_MAX_BYTES
+                )
+                get_metrics_registry().register_collector(
+                    "render_prepared_cache", _prepared_cache.stats
+                )
+    return _prepared_cache
@@ -0,0 +1,64 @@
+import re
+
+# Estimated render time in ms: a fixed part, a part per atom and bond
+# (mostly layout) and, for raster output, a part per megapixel. Fitted to
+# parse + layout + render times of the benchmark corpus with Indigo 1.46 on
+# one core; within about 30% up to 200 atoms and bonds, layout grows faster
+# than linearly beyond that.
+BASE_COST_MS = 0.5
+FORMAT_COSTS = {
+    # format: (ms per atom or bond, ms per megapixel)
+    "png": (0.03, 32.0),
+    "svg": (0.045, 0.0),
+    "pdf": (0.035, 0.0),
+}
+
+# Bracket atoms, then the organic subset (two-letter symbols first).
+_SMILES_ATOM = re.compile(r"\[[^\]]*\]|Br|Cl|[BCNOPSFI]|[bcnops]")
+_SMILES_RING_BOND = re.compile(r"%\d\d|\d")
+_SMILES_BRACKET = re.compile(r"\[[^\]]*\]")
+
+
+def smiles_size(smiles: str) -> tuple[int, int]:
+    """
+    Approximate ``(atoms, bonds)`` of a SMILES string without parsing it.
+
+    Hydrogens are not counted and ring-closure digits are assumed to be
+    paired, which is close enough to rank render cost.
+    """
+    atoms = len(_SMILES_ATOM.findall(smiles))
+    without_brackets = _SMILES_BRACKET.sub("", smiles)
+    ring_bonds = len(_SMILES_RING_BOND.findall(without_brackets)) // 2
+    fragments = without_brackets.count(".") + 1
+    return atoms, max(atoms - fragments, 0) + ring_bonds
+
+
+def molfile_size(molfile: str) -> tuple[int, int]:
+    """Read ``(atoms, bonds)`` from a MOL file's counts line (V2000 or V3000)."""
+    lines = molfile.splitlines()
+    for line in lines[3:]:
+        if line.startswith("M  V30 COUNTS"):
+            counts = line.split()[3:5]
+            if len(counts) == 2 and all(part.isdigit() for part in counts):
+                return int(counts[0]), int(counts[1])
+            break
+    if len(lines) > 3:
+        counts = lines[3]
+        try:
+            return int(counts[0:3]), int(counts[3:6])
+        except ValueError:
+            pass
+    # Unreadable header: assume every line is an atom or a bond.
+    return len(lines), 0
+
+
+def estimate_render_cost(
+    atoms: int, bonds: int, width: int, height: int, image_format: str
+) -> float:
+    """Estimate the render time of a molecule in milliseconds."""
+    per_item, per_megapixel = FORMAT_COSTS.get(image_format, FORMAT_COSTS["png"])
+    return (
+        BASE_COST_MS
+        + per_item * (atoms + bonds)
+        + per_megapixel * width * height / 1_000_000
+    )
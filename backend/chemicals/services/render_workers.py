@@ -0,0 +1,262 @@
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import threading
+
+from chemicals.bootstrap import run_render_worker
+from chemicals.services.exceptions import (
+    RenderError,
+    RenderRejected,
+    RenderServiceError,
+    RenderTimeout,
+    RenderWorkerCrashed,
+)
+from chemicals.services.metrics import get_metrics_registry
+from chemicals.services.timing import (
+    StageTimer,
+    activate_timer,
+    current_timer,
+    timed_stage,
+)
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Exceptions re-raised in the parent under their own class, so that
+# isolated renders map to the same HTTP statuses as in-process ones.
+REMOTE_ERRORS = {
+    cls.__name__: cls
+    for cls in (
+        RenderError,
+        RenderServiceError,
+        RenderTimeout,
+        RenderWorkerCrashed,
+        RenderRejected,
+    )
+}
+
+
+def _picklable(result: tuple) -> tuple:
+    return tuple(
+        bytes(item) if isinstance(item, memoryview) else item for item in result
+    )
+
+
+def _error_reply(e: Exception) -> tuple:
+    name = type(e).__name__
+    if name not in REMOTE_ERRORS:
+        # Anything else is a bug, as it would be in-process: 500, not 400.
+        logger.exception("Render worker call failed")
+        name = RenderServiceError.__name__
+    return ("error", (name, str(e), getattr(e, "retry_after", None)))
+
+
+def _raise_remote_error(name: str, message: str, retry_after: float | None):
+    cls = REMOTE_ERRORS.get(name, RenderServiceError)
+    if cls is RenderRejected:
+        raise RenderRejected(message, retry_after=retry_after or 1.0)
+    raise cls(message)
+
+
+def serve_render_calls(conn):
+    """Serve render calls from the parent until told to stop."""
+    from chemicals.services.chemical_renderer import ChemicalRenderer
+
+    renderer = ChemicalRenderer()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+
+        method, kwargs = message
+        timer = StageTimer()
+        try:
+            with activate_timer(timer):
+                result = getattr(renderer, method)(**kwargs)
+            # Disk cache hits are memoryviews, which cannot be pickled.
+            if isinstance(result, tuple):
+                result = _picklable(result)
+            elif isinstance(result, list):
+                result = [_picklable(item) for item in result]
+            reply = ("ok", result)
+        except Exception as e:
+            reply = _error_reply(e)
+        # ru_maxrss is reported in kilobytes on Linux.
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        conn.send((reply, rss_kb, timer.stages))
+
+
+class RenderWorker:
+    """Handle to one render subprocess and its pipe."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=run_render_worker,
+            args=(child_conn,),
+            name="render-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.rss_kb = 0
+
+    def call(self, method: str, kwargs: dict, timeout: float):
+        """Run a renderer method in the subprocess; return its reply and stages."""
+        try:
+            self.conn.send((method, kwargs))
+            if not self.conn.poll(timeout):
+                raise RenderTimeout(f"Rendering timed out after {timeout:g} seconds")
+            reply, self.rss_kb, stages = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise RenderWorkerCrashed(
+                f"Render worker exited unexpectedly (exit code "
+                f"{self.process.exitcode})"
+            ) from e
+        self.tasks += 1
+        return reply, stages
+
+    def stop(self, timeout: float = 1.0):
+        """Ask the subprocess to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self):
+        """Terminate the subprocess immediately."""
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class RenderWorkerPool:
+    """
+    Supervised pool of render subprocesses.
+
+    Each call is handed to an idle worker and bounded by ``timeout`` seconds
+    of wall-clock time. Workers that time out or crash are killed and
+    replaced; workers are also recycled after ``max_tasks`` calls or once
+    their peak RSS exceeds ``max_rss_mb``.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: float = 10.0,
+        max_tasks: int = 1000,
+        max_rss_mb: int = 512,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self.max_rss_kb = max_rss_mb * 1024
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.LifoQueue[RenderWorker] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._busy = 0
+        self._timeouts = 0
+        self._crashes = 0
+        self._recycled = 0
+        for _ in range(size):
+            self._idle.put(RenderWorker(self._context))
+
+    def call(self, method: str, **kwargs):
+        """Run a ChemicalRenderer method on a worker and return its result."""
+        try:
+            with timed_stage("worker_wait"):
+                worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RenderTimeout("No render worker became available in time")
+
+        with self._lock:
+            self._busy += 1
+        try:
+            (status, payload), stages = worker.call(method, kwargs, self.timeout)
+        except (RenderTimeout, RenderWorkerCrashed) as e:
+            with self._lock:
+                if isinstance(e, RenderTimeout):
+                    self._timeouts += 1
+                else:
+                    self._crashes += 1
+            logger.warning("Replacing render worker: %s", e)
+            worker.kill()
+            self._replace()
+            raise
+        else:
+            if worker.tasks >= self.max_tasks or worker.rss_kb >= self.max_rss_kb:
+                with self._lock:
+                    self._recycled += 1
+                worker.stop()
+                self._replace()
+            else:
+                self._idle.put(worker)
+        finally:
+            with self._lock:
+                self._busy -= 1
+
+        timer = current_timer()
+        if timer is not None:
+            timer.merge(stages)
+        if status == "error":
+            _raise_remote_error(*payload)
+        return payload
+
+    def shutdown(self):
+        """Stop all idle workers."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        """Return worker occupancy and failure counters."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "busy": self._busy,
+                "idle": self._idle.qsize(),
+                "timeouts": self._timeouts,
+                "crashes": self._crashes,
+                "recycled": self._recycled,
+            }
+
+    def _replace(self):
+        if not self._closed:
+            self._idle.put(RenderWorker(self._context))
+
+
+_pool: RenderWorkerPool | None = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+def get_render_worker_pool() -> RenderWorkerPool:
+    """Get this process's render worker pool, creating it after a fork."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = RenderWorkerPool(
+                    size=settings.RENDER_WORKER_PROCESSES,
+                    timeout=settings.RENDER_TIMEOUT,
+                    max_tasks=settings.RENDER_WORKER_MAX_TASKS,
+                    max_rss_mb=settings.RENDER_WORKER_MAX_RSS_MB,
+                )
+                _pool_pid = os.getpid()
+                atexit.register(_pool.shutdown)
+                get_metrics_registry().register_collector("render_workers", _pool.stats)
+    return _pool
@@ -0,0 +1,162 @@
+import math
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import date, datetime
+from datetime import time as dt_time
+from datetime import timedelta
+
+from chemicals.models import RequestLog, RequestLogDaily
+from chemicals.services.partitioning import drop_partitions_before, is_partitioned
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+
+def day_start(day: date) -> datetime:
+    """Start of ``day`` as an aware datetime in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+def percentile(histogram: list[tuple[int, int]], fraction: float) -> int | None:
+    """Nearest-rank percentile of sorted ``(value, count)`` pairs."""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    rank = max(math.ceil(fraction * total), 1)
+    seen = 0
+    for value, count in histogram:
+        seen += count
+        if seen >= rank:
+            return value
+    return histogram[-1][0]
+
+
+def rollup_day(day: date) -> int | None:
+    """
+    Recompute the RequestLogDaily rows of ``day`` from raw RequestLog rows.
+
+    Days without raw rows are left alone, so rollups outlive pruning.
+    Returns the number of rollup rows written, or None if skipped.
+    """
+    rows = (
+        RequestLog.objects.filter(
+            created_at__gte=day_start(day),
+            created_at__lt=day_start(day + timedelta(days=1)),
+        )
+        .order_by()
+        .values("user_id", "image_format", "response_time_ms")
+        .annotate(n=Count("id"), errors=Count("id", filter=Q(success=False)))
+    )
+    # One row per distinct latency gives exact percentiles without
+    # pulling every request into memory.
+    groups = defaultdict(lambda: {"requests": 0, "errors": 0, "latencies": []})
+    for row in rows:
+        group = groups[(row["user_id"], row["image_format"])]
+        group["requests"] += row["n"]
+        group["errors"] += row["errors"]
+        if row["response_time_ms"] is not None:
+            group["latencies"].append((row["response_time_ms"], row["n"]))
+    if not groups:
+        return None
+
+    rollups = []
+    for (user_id, image_format), group in groups.items():
+        latencies = sorted(group["latencies"])
+        rollups.append(
+            RequestLogDaily(
+                day=day,
+                user_id=user_id,
+                image_format=image_format,
+                requests=group["requests"],
+                errors=group["errors"],
+                latency_sum_ms=sum(value * count for value, count in latencies),
+                latency_count=sum(count for _, count in latencies),
+                p50_ms=percentile(latencies, 0.50),
+                p95_ms=percentile(latencies, 0.95),
+                p99_ms=percentile(latencies, 0.99),
+                max_ms=latencies[-1][0] if latencies else None,
+            )
+        )
+    with transaction.atomic():
+        RequestLogDaily.objects.filter(day=day).delete()
+        RequestLogDaily.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def last_rolled_up_day() -> date | None:
+    return RequestLogDaily.objects.aggregate(day=Max("day"))["day"]
+
+
+def days_to_roll_up(since: date | None = None, include_today: bool = False):
+    """
+    Days that still need rolling up, oldest first.
+
+    Starts at ``since``, else at the last rolled-up day (recomputed in case
+    it was partial), else at the oldest raw row; ends yesterday.
+    """
+    today = timezone.localdate()
+    end = today if include_today else today - timedelta(days=1)
+    start = since or last_rolled_up_day()
+    if start is None:
+        oldest = RequestLog.objects.aggregate(oldest=Min("created_at"))["oldest"]
+        if oldest is None:
+            return []
+        start = timezone.localdate(oldest)
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def rollup_request_logs(
+    since: date | None = None, include_today: bool = False
+) -> Iterator[tuple[date, int | None]]:
+    """Roll up each pending day, yielding ``(day, rows written)``."""
+    for day in days_to_roll_up(since, include_today):
+        yield day, rollup_day(day)
+
+
+def prune_cutoff(retention_days: int, force: bool = False) -> datetime | None:
+    """
+    Raw rows created before this moment may be deleted.
+
+    Unless ``force`` is set, rows of days not yet rolled up are kept.
+    Returns None when nothing may be pruned.
+    """
+    if retention_days <= 0:
+        return None
+    cutoff = day_start(timezone.localdate() - timedelta(days=retention_days))
+    if force:
+        return cutoff
+    last_day = last_rolled_up_day()
+    if last_day is None:
+        return None
+    # The last rolled-up day is kept too, since it is recomputed next time.
+    return min(cutoff, day_start(last_day))
+
+
+def drop_old_partitions(cutoff: datetime) -> list[str]:
+    """On a partitioned table, drop partitions entirely before ``cutoff``."""
+    if not is_partitioned():
+        return []
+    return drop_partitions_before(cutoff)
+
+
+def prune_request_logs(
+    cutoff: datetime, chunk_size: int, pause: float = 0.0
+) -> Iterator[int]:
+    """
+    Delete raw RequestLog rows created before ``cutoff``, yielding counts.
+
+    Rows are deleted ``chunk_size`` at a time in short transactions,
+    sleeping ``pause`` seconds between chunks so concurrent log writes are
+    not blocked for long.
+    """
+    old_rows = RequestLog.objects.filter(created_at__lt=cutoff).order_by()
+    while True:
+        ids = list(old_rows.values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            return
+        # created_at lets PostgreSQL skip partitions that cannot match.
+        deleted, _ = old_rows.filter(id__in=ids).delete()
+        yield deleted
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,82 @@
+import gzip
+from collections.abc import Iterator
+from typing import BinaryIO
+
+GZIP_MAGIC = b"\x1f\x8b"
+RECORD_SEPARATOR = b"$$$$"
+
+
+def open_sdf_stream(fileobj: BinaryIO) -> BinaryIO:
+    """Return a binary stream over the SDF, decompressing gzip on the fly."""
+    head = fileobj.read(len(GZIP_MAGIC))
+    fileobj.seek(0)
+    if head == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    return fileobj
+
+
+def iter_sdf_records(
+    fileobj: BinaryIO,
+    max_records: int = 10000,
+    max_record_bytes: int = 1024 * 1024,
+) -> Iterator[dict]:
+    """
+    Yield SDF records one at a time without reading the whole file.
+
+    Each record is ``{"index", "name", "molfile"}``, or ``{"index", "name",
+    "error"}`` if it exceeds ``max_record_bytes``. After ``max_records``
+    records a final error entry is yielded and reading stops.
+    """
+    stream = open_sdf_stream(fileobj)
+    lines: list[bytes] = []
+    size = 0
+    oversized = False
+    index = 0
+
+    while True:
+        # Bounded reads so a file without newlines cannot exhaust memory.
+        line = stream.readline(max_record_bytes + 1)
+        if not line or line.rstrip() == RECORD_SEPARATOR:
+            if not line and not any(part.strip() for part in lines):
+                return
+            index += 1
+            if index > max_records:
+                yield {
+                    "index": index,
+                    "name": "",
+                    "error": f"Record limit of {max_records} reached, "
+                    "remaining records were skipped",
+                }
+                return
+            yield _make_record(index, lines, oversized, max_record_bytes)
+            if not line:
+                return
+            lines, size, oversized = [], 0, False
+            continue
+
+        if oversized:
+            continue
+        size += len(line)
+        if size > max_record_bytes:
+            # Keep the header line so the record can still be named.
+            oversized = True
+            lines = lines[:1]
+        else:
+            lines.append(line)
+
+
+def _make_record(
+    index: int, lines: list[bytes], oversized: bool, max_record_bytes: int
+) -> dict:
+    name = lines[0].decode("utf-8", errors="replace").strip() if lines else ""
+    if oversized:
+        return {
+            "index": index,
+            "name": name,
+            "error": f"Record exceeds {max_record_bytes} bytes",
+        }
+    return {
+        "index": index,
+        "name": name,
+        "molfile": b"".join(lines).decode("utf-8", errors="replace"),
+    }
@@ -0,0 +1,173 @@
+import fcntl
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from chemicals.services.exceptions import RenderTimeout
+from chemicals.services.metrics import get_metrics_registry
+from chemicals.services.timing import timed_stage
+from django.conf import settings
+
+# Cross-process locks are striped over this many lock files.
+LOCK_STRIPES = 1024
+LOCK_POLL_INTERVAL = 0.005
+
+
+class _Flight:
+    """One in-progress call that duplicates can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait up to ``timeout`` seconds and get the same result or
+    exception. With ``lock_dir`` set, leaders in different processes also
+    serialize on a lock file per key, so a later leader can pick up the
+    result from a shared cache through ``recheck`` instead of recomputing.
+    """
+
+    def __init__(self, timeout: float = 10.0, lock_dir: str = "", enabled: bool = True):
+        self.timeout = timeout
+        self.lock_dir = lock_dir
+        self.enabled = enabled
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+        self._timeouts = 0
+        self._lock_waits = 0
+        self._lock_timeouts = 0
+        self._recheck_hits = 0
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+    def do(self, key: str, fn, recheck=None):
+        """
+        Return ``fn()``, sharing one execution among concurrent callers.
+
+        ``recheck`` is called by a leader after it waited on another
+        process's lock; a non-None result is used instead of calling ``fn``.
+        """
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._leaders += 1
+                leader = True
+            else:
+                flight.waiters += 1
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            return self._wait(flight)
+
+        try:
+            with self._process_lock(key) as waited:
+                result = recheck() if waited and recheck is not None else None
+                if result is not None:
+                    with self._lock:
+                        self._recheck_hits += 1
+                else:
+                    result = fn()
+            flight.result = result
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _wait(self, flight: _Flight):
+        with timed_stage("coalesce"):
+            finished = flight.done.wait(self.timeout)
+        if not finished:
+            with self._lock:
+                self._timeouts += 1
+            raise RenderTimeout(
+                f"Identical render still in progress after {self.timeout:g}s"
+            )
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    @contextmanager
+    def _process_lock(self, key: str):
+        """Hold the key's lock file; yields whether another process held it."""
+        if not self.lock_dir:
+            yield False
+            return
+        stripe = zlib.crc32(key.encode("utf-8")) % LOCK_STRIPES
+        path = os.path.join(self.lock_dir, f"{stripe:04d}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            waited = False
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if not waited:
+                        waited = True
+                        with self._lock:
+                            self._lock_waits += 1
+                    if time.monotonic() >= deadline:
+                        # Render without the lock rather than fail.
+                        with self._lock:
+                            self._lock_timeouts += 1
+                        break
+                    time.sleep(LOCK_POLL_INTERVAL)
+            yield waited
+        finally:
+            os.close(fd)
+
+    def stats(self) -> dict:
+        """Return coalescing counters."""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "waiting": sum(flight.waiters for flight in self._flights.values()),
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "timeouts": self._timeouts,
+                "lock_waits": self._lock_waits,
+                "lock_timeouts": self._lock_timeouts,
+                "recheck_hits": self._recheck_hits,
+            }
+
+
+_single_flight: SingleFlight | None = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide render coalescer (RENDER_SINGLE_FLIGHT* settings)."""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(
+                    timeout=settings.RENDER_SINGLE_FLIGHT_TIMEOUT,
+                    lock_dir=settings.RENDER_SINGLE_FLIGHT_LOCK_DIR,
+                    enabled=settings.RENDER_SINGLE_FLIGHT,
+                )
+                get_metrics_registry().register_collector(
+                    "render_single_flight", _single_flight.stats
+                )
+    return _single_flight
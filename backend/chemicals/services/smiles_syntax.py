@@ -0,0 +1,90 @@
+import re
+
+# One SMILES token: bracket atom, organic-subset atom, bond, branch, ring
+# closure or fragment separator.
+_TOKEN = re.compile(
+    r"(?P<bracket>\[[^\[\]]+\])"
+    r"|(?P<atom>Cl|Br|[BCNOPSFI]|[bcnops]|\*)"
+    r"|(?P<bond>[-=#$:/\\])"
+    r"|(?P<open>\()"
+    r"|(?P<close>\))"
+    r"|(?P<ring>%\d\d|\d)"
+    r"|(?P<dot>\.)"
+)
+_WHITESPACE = re.compile(r"\s")
+# Isotope, then the atom symbol of a bracket atom.
+_BRACKET_SYMBOL = re.compile(r"\[\d*(\*|R\d+|[A-Z][a-z]?|[a-z]{1,2})")
+
+ELEMENTS = frozenset(
+    "H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni "
+    "Cu Zn Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe "
+    "Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg "
+    "Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr Rf Db Sg "
+    "Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og".split()
+)
+# Lowercase symbols Indigo accepts in brackets.
+AROMATIC = frozenset("c n o p s as bi se si te".split())
+
+
+def smiles_syntax_error(smiles: str) -> str | None:
+    """
+    Return why Indigo would reject ``smiles`` as SMILES, or None if it may not.
+
+    A pure-Python check of tokens, brackets, branches and ring closures, so
+    malformed input fails before it reaches the native library. It only
+    rejects what Indigo rejects too: Indigo tolerates stray bond symbols,
+    empty fragments and unclosed branches, and valence or aromaticity are
+    not checked at all. Anything after the first whitespace (a name or
+    CXSMILES extension) is left to Indigo.
+    """
+    text = _WHITESPACE.split(smiles, maxsplit=1)[0]
+
+    depth = 0
+    open_rings: set[int] = set()
+    has_atom = False
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            char = text[position]
+            if char == "[":
+                return f"Unclosed '[' at position {position + 1}"
+            return f"Unexpected character {char!r} at position {position + 1}"
+        kind = match.lastgroup
+        if kind == "bracket":
+            error = _bracket_atom_error(match.group())
+            if error:
+                return f"{error} at position {position + 1}"
+            has_atom = True
+        elif kind == "atom":
+            has_atom = True
+        elif kind == "open":
+            depth += 1
+        elif kind == "close":
+            if not depth:
+                return f"Unmatched ')' at position {position + 1}"
+            depth -= 1
+        elif kind == "ring":
+            if not has_atom:
+                return f"Ring bond at position {position + 1} has no atom before it"
+            open_rings ^= {int(match.group().lstrip("%"))}
+        position = match.end()
+
+    if open_rings:
+        return f"Unclosed ring bond {', '.join(map(str, sorted(open_rings)))}"
+    return None
+
+
+def _bracket_atom_error(token: str) -> str | None:
+    match = _BRACKET_SYMBOL.match(token)
+    if match is None:
+        # Indigo also reads e.g. a charge before the symbol.
+        return None
+    symbol = match.group(1)
+    if symbol[0] in "*R":
+        return None
+    # A second letter that is not part of the symbol is left to Indigo.
+    known = ELEMENTS if symbol[0].isupper() else AROMATIC
+    if symbol not in known and symbol[0] not in known:
+        return f"Unknown element {symbol!r}"
+    return None
@@ -0,0 +1,71 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Accumulates wall-clock milliseconds per named request stage."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block and add it to ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def add(self, name: str, ms: float):
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def merge(self, stages: dict[str, float]):
+        """Add stage timings measured elsewhere, e.g. in a render worker."""
+        for name, ms in stages.items():
+            self.add(name, ms)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self) -> dict[str, float]:
+        """Stage timings rounded for storage."""
+        return {name: round(ms, 3) for name, ms in self.stages.items()}
+
+    def server_timing(self) -> str:
+        """Format stages and the total as a Server-Timing header value."""
+        metrics = [f"{name};dur={ms:.2f}" for name, ms in self.stages.items()]
+        metrics.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(metrics)
+
+
+_local = threading.local()
+
+
+def current_timer() -> StageTimer | None:
+    """Return the timer of the request handled by this thread, if any."""
+    return getattr(_local, "timer", None)
+
+
+@contextmanager
+def activate_timer(timer: StageTimer):
+    """Make ``timer`` the current timer for the enclosed block."""
+    previous = current_timer()
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+
+@contextmanager
+def timed_stage(name: str):
+    """Time the enclosed block on the current timer; no-op without one."""
+    timer = current_timer()
+    if timer is None:
+        yield
+    else:
+        with timer.stage(name):
+            yield
@@ -0,0 +1,141 @@
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from datetime import timedelta
+from functools import partial
+
+from chemicals.models import RequestLog
+from chemicals.services.chemical_renderer import ChemicalRenderer, get_chemical_renderer
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Min
+from django.utils import timezone
+
+
+def popular_render_requests(limit: int, window_hours: float) -> list[dict]:
+    """
+    Most requested successful SMILES renders over the last ``window_hours``.
+
+    Returns ``{"smiles", "width", "height", "format", "hits"}`` dicts with
+    defaults applied, most popular first.
+    """
+    since = timezone.now() - timedelta(hours=window_hours)
+    # Grouped on the fixed-width hash of the canonical SMILES rather than
+    # the SMILES text; spellings of one molecule count together.
+    rows = (
+        RequestLog.objects.filter(
+            success=True,
+            has_molfile=False,
+            smiles_hash__isnull=False,
+            created_at__gte=since,
+        )
+        .order_by()
+        .values("smiles_hash", "width", "height", "image_format")
+        .annotate(hits=Count("id"), smiles=Min("smiles"))
+        .order_by("-hits")[:limit]
+    )
+    items = []
+    for row in rows:
+        width, height, image_format = ChemicalRenderer.normalize_options(
+            row["width"], row["height"], row["image_format"]
+        )
+        items.append(
+            {
+                "smiles": row["smiles"],
+                "width": width,
+                "height": height,
+                "format": image_format,
+                "hits": row["hits"],
+            }
+        )
+    return items
+
+
+def warm_render_item(item: dict, renderer: ChemicalRenderer | None = None) -> dict:
+    """Render one item so it lands in the render cache; return its size."""
+    renderer = renderer or get_chemical_renderer()
+    try:
+        image_bytes, _ = renderer.render_smiles(
+            smiles=item["smiles"],
+            width=item["width"],
+            height=item["height"],
+            image_format=item["format"],
+        )
+    except Exception as e:
+        return {"bytes": 0, "error": str(e)}
+    return {"bytes": len(image_bytes)}
+
+
+def warm_render_cache(
+    items: list[dict],
+    executor: Executor,
+    concurrency: int,
+    time_budget: float,
+    byte_budget: int,
+    render=warm_render_item,
+) -> dict:
+    """
+    Pre-render ``items`` in order on ``executor`` within the given budgets.
+
+    At most ``concurrency`` renders are in flight. No new work is started
+    once ``time_budget`` seconds have passed or ``byte_budget`` bytes have
+    been rendered.
+    """
+    started = time.monotonic()
+    deadline = started + time_budget
+    queue = deque(items)
+    pending = set()
+    stats = {"candidates": len(items), "rendered": 0, "failed": 0, "bytes": 0}
+    stopped = None
+
+    while True:
+        if stopped is None:
+            if time.monotonic() >= deadline:
+                stopped = "time"
+            elif stats["bytes"] >= byte_budget:
+                stopped = "bytes"
+            else:
+                while queue and len(pending) < concurrency:
+                    pending.add(executor.submit(render, queue.popleft()))
+        if not pending:
+            break
+        # Once stopped, only the few renders already in flight are awaited.
+        done, pending = wait(
+            pending,
+            timeout=None if stopped else max(deadline - time.monotonic(), 0),
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            result = future.result()
+            if "error" in result:
+                stats["failed"] += 1
+            else:
+                stats["rendered"] += 1
+                stats["bytes"] += result["bytes"]
+
+    stats["skipped"] = len(queue)
+    stats["stopped"] = stopped
+    stats["elapsed"] = round(time.monotonic() - started, 3)
+    return stats
+
+
+def warm_in_process(renderer: ChemicalRenderer) -> dict:
+    """
+    Warm ``renderer``'s cache from RequestLog on threads (RENDER_WARM_* settings).
+
+    Used before gunicorn forks its workers, so the database connection is
+    closed again and the renderer should not share Indigo sessions.
+    """
+    items = popular_render_requests(
+        settings.RENDER_WARM_TOP_N, settings.RENDER_WARM_WINDOW_HOURS
+    )
+    connections.close_all()
+    with ThreadPoolExecutor(settings.RENDER_WARM_CONCURRENCY) as executor:
+        return warm_render_cache(
+            items,
+            executor,
+            concurrency=settings.RENDER_WARM_CONCURRENCY,
+            time_budget=settings.RENDER_WARM_TIME_BUDGET,
+            byte_budget=settings.RENDER_WARM_MAX_BYTES,
+            render=partial(warm_render_item, renderer=renderer),
+        )
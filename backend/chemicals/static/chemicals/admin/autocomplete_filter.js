@@ -0,0 +1,12 @@
+'use strict';
+// Apply an autocomplete list filter as soon as a value is picked.
+window.addEventListener('load', function() {
+    django.jQuery('select[data-filter-parameter]').on('select2:select', function(event) {
+        const params = new URLSearchParams(window.location.search);
+        params.set(this.dataset.filterParameter, event.params.data.id);
+        for (const name of ['p', 'before', 'after', 'e']) {
+            params.delete(name);
+        }
+        window.location.search = params.toString();
+    });
+});
@@ -0,0 +1,38 @@
+import atexit
+import tempfile
+from pathlib import Path
+
+from chemicals.services import metrics
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class IsolatedPathsTestRunner(DiscoverRunner):
+    """
+    Test runner that keeps the disk render cache, metrics snapshots and
+    throttle counters in a temporary directory instead of the real paths.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # Background threads (disk cache eviction, metrics flushes) may still
+        # write while the directory is removed.
+        self._directory = tempfile.TemporaryDirectory(
+            prefix="chemicals-tests-", ignore_cleanup_errors=True
+        )
+        root = Path(self._directory.name)
+        self._paths = override_settings(
+            MEDIA_ROOT=root / "media",
+            RENDER_DISK_CACHE_DIR=str(root / "media" / "render_cache"),
+            METRICS_DIR=str(root / "metrics"),
+            THROTTLE_SQLITE_PATH=str(root / "throttle.sqlite3"),
+        )
+        self._paths.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # The registry would otherwise write a final snapshot at exit.
+        if metrics._registry is not None:
+            atexit.unregister(metrics._registry.flush)
+        self._paths.disable()
+        self._directory.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,107 @@
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from chemicals.admin import RequestLogAdmin
+from chemicals.admin_pagination import EstimatedCountPaginator
+from chemicals.models import RequestLog
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+@mock.patch.object(RequestLogAdmin, "list_per_page", 3)
+class KeysetChangeListTests(TestCase):
+    url = "/admin/chemicals/requestlog/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        now = timezone.now()
+        # Ids 1-7 from oldest to newest; even ids failed.
+        cls.logs = [
+            RequestLog.objects.create(
+                method="GET",
+                smiles="C" * n,
+                success=n % 2 == 1,
+                created_at=now - timedelta(minutes=10 - n),
+            )
+            for n in range(1, 8)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist(self, query=None):
+        response = self.client.get(self.url, query or {})
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def page(self, query=None) -> list[int]:
+        return [log.pk for log in self.changelist(query).result_list]
+
+    def ids(self, *numbers) -> list[int]:
+        return [self.logs[n - 1].pk for n in numbers]
+
+    def follow(self, url: str | None) -> dict:
+        self.assertIsNotNone(url)
+        return {key: values[0] for key, values in parse_qs(urlsplit(url).query).items()}
+
+    def test_first_page_is_newest(self):
+        cl = self.changelist()
+        self.assertEqual(self.page(), self.ids(7, 6, 5))
+        self.assertIsNone(cl.keyset_newer_url)
+        self.assertEqual(
+            self.follow(cl.keyset_older_url), {"before": str(self.logs[4].pk)}
+        )
+        self.assertEqual(cl.result_count, 7)
+
+    def test_walk_older_and_back(self):
+        older = self.follow(self.changelist().keyset_older_url)
+        cl = self.changelist(older)
+        self.assertEqual([log.pk for log in cl.result_list], self.ids(4, 3, 2))
+
+        last = self.changelist(self.follow(cl.keyset_older_url))
+        self.assertEqual([log.pk for log in last.result_list], self.ids(1))
+        self.assertIsNone(last.keyset_older_url)
+
+        # Back from the last page; close to the newest rows, the first page.
+        self.assertEqual(
+            self.page(self.follow(last.keyset_newer_url)), self.ids(4, 3, 2)
+        )
+        self.assertEqual(self.page(self.follow(cl.keyset_newer_url)), self.ids(7, 6, 5))
+
+    def test_filters_are_kept_across_pages(self):
+        cl = self.changelist({"success__exact": "0"})
+        self.assertEqual([log.pk for log in cl.result_list], self.ids(6, 4, 2))
+        self.assertIsNone(cl.keyset_older_url)
+
+        cl = self.changelist({"success__exact": "1", "before": self.logs[6].pk})
+        self.assertEqual([log.pk for log in cl.result_list], self.ids(5, 3, 1))
+        self.assertEqual(self.follow(cl.keyset_newest_url), {"success__exact": "1"})
+
+    def test_keyset_page_runs_no_offset_query(self):
+        table = RequestLog._meta.db_table
+        with (
+            CaptureQueriesContext(connection) as queries,
+            mock.patch.object(EstimatedCountPaginator, "page") as page,
+        ):
+            self.page({"before": self.logs[4].pk})
+        page.assert_not_called()
+        pages = [
+            query["sql"]
+            for query in queries.captured_queries
+            # Row queries, not the anchor's created_at lookup.
+            if query["sql"].startswith(f'SELECT "{table}"."id"')
+        ]
+        self.assertEqual(len(pages), 1)
+        self.assertNotIn("OFFSET", pages[0])
+
+    def test_custom_ordering_uses_page_numbers(self):
+        cl = self.changelist({"o": "1"})
+        self.assertFalse(cl.keyset)
+        self.assertEqual([log.pk for log in cl.result_list], self.ids(1, 2, 3))
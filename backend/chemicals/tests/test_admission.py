@@ -0,0 +1,231 @@
+import threading
+import time
+from unittest import mock
+
+from chemicals.services import ChemicalRenderer, LRURenderCache
+from chemicals.services.admission import AdmissionController
+from chemicals.services.exceptions import RenderRejected
+from chemicals.services.indigo_pool import IndigoPool
+from chemicals.services.rate_limit import get_rate_limit_store
+from chemicals.services.render_cost import (
+    estimate_render_cost,
+    molfile_size,
+    smiles_size,
+)
+from chemicals.services.singleflight import SingleFlight
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+
+def hold_slot(controller: AdmissionController):
+    """Occupy one slot from another thread until the returned event is set."""
+    release = threading.Event()
+    held = threading.Event()
+
+    def run():
+        with controller.admit():
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    held.wait(5)
+    return release, thread
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class AdmissionControllerTests(SimpleTestCase):
+    def test_full_queue_is_shed_at_once(self):
+        controller = AdmissionController(1, 0, 5, retry_after=2.5)
+        release, thread = hold_slot(controller)
+        try:
+            with self.assertRaises(RenderRejected) as caught:
+                with controller.admit():
+                    pass
+            self.assertEqual(caught.exception.retry_after, 2.5)
+            self.assertEqual(controller.stats()["shed_queue_full"], 1)
+        finally:
+            release.set()
+            thread.join()
+
+    def test_queue_timeout_is_shed(self):
+        controller = AdmissionController(1, 4, 0.05)
+        release, thread = hold_slot(controller)
+        try:
+            with self.assertRaises(RenderRejected):
+                with controller.admit():
+                    pass
+            stats = controller.stats()
+            self.assertEqual(stats["shed_timeout"], 1)
+            self.assertEqual(stats["queued"], 0)
+        finally:
+            release.set()
+            thread.join()
+
+    def test_cheapest_waiter_goes_first(self):
+        controller = AdmissionController(1, 10, 5)
+        release, thread = hold_slot(controller)
+        order = []
+
+        def wait(cost):
+            with controller.admit(cost):
+                order.append(cost)
+
+        waiters = []
+        for count, cost in enumerate((300, 10, 50), start=1):
+            waiter = threading.Thread(target=wait, args=(cost,))
+            waiter.start()
+            waiters.append(waiter)
+            wait_until(lambda count=count: controller.stats()["queued"] == count)
+        release.set()
+        thread.join()
+        for waiter in waiters:
+            waiter.join()
+        self.assertEqual(order, [10, 50, 300])
+        self.assertEqual(controller.stats()["in_flight"], 0)
+
+    def queue_in_order(self, controller, costs, clock):
+        """Queue one waiter per cost, ``clock`` seconds apart; return admit order."""
+        release, thread = hold_slot(controller)
+        order = []
+
+        def wait(cost):
+            with controller.admit(cost):
+                order.append(cost)
+
+        waiters = []
+        with mock.patch("chemicals.services.admission.time.monotonic") as monotonic:
+            for count, cost in enumerate(costs, start=1):
+                monotonic.return_value = count * clock
+                waiter = threading.Thread(target=wait, args=(cost,))
+                waiter.start()
+                waiters.append(waiter)
+                wait_until(lambda count=count: controller.stats()["queued"] == count)
+        release.set()
+        thread.join()
+        for waiter in waiters:
+            waiter.join()
+        return order
+
+    def test_equal_costs_are_first_in_first_out(self):
+        controller = AdmissionController(1, 10, 5)
+        self.assertEqual(self.queue_in_order(controller, (20, 20, 20), 0), [20] * 3)
+        self.assertEqual(controller.stats()["reordered"], 0)
+
+    def test_waiting_ages_a_costly_render_ahead(self):
+        # 400 ms queued 1 s before a 10 ms render: 400 < 10 + 500.
+        controller = AdmissionController(1, 10, 5, aging=500)
+        self.assertEqual(self.queue_in_order(controller, (400, 10), 1.0), [400, 10])
+        self.assertEqual(controller.stats()["reordered"], 0)
+
+    def test_aging_does_not_outweigh_a_large_cost_gap(self):
+        controller = AdmissionController(1, 10, 5, aging=500)
+        self.assertEqual(self.queue_in_order(controller, (900, 10), 1.0), [10, 900])
+        self.assertEqual(controller.stats()["reordered"], 1)
+
+    def test_disabled_controller_admits_everything(self):
+        controller = AdmissionController(0, 0, 0)
+        with controller.admit(), controller.admit():
+            pass
+        self.assertEqual(controller.stats()["admitted"], 0)
+
+
+class RenderCostTests(SimpleTestCase):
+    def test_smiles_size(self):
+        self.assertEqual(smiles_size("CCO"), (3, 2))
+        self.assertEqual(smiles_size("c1ccccc1"), (6, 6))
+        self.assertEqual(smiles_size("C%10CC%10"), (3, 3))
+        self.assertEqual(smiles_size("[NH4+].[Cl-]"), (2, 0))
+
+    def test_molfile_size(self):
+        v2000 = "\n\n\n  3  2  0  0  0  0  0  0  0  0999 V2000\n"
+        v3000 = (
+            "\n\n\n  0  0  0     0  0            999 V3000\nM  V30 COUNTS 12 11 0 0 0\n"
+        )
+        self.assertEqual(molfile_size(v2000), (3, 2))
+        self.assertEqual(molfile_size(v3000), (12, 11))
+        self.assertEqual(molfile_size("a\nb"), (2, 0))
+
+    def test_raster_cost_grows_with_pixels(self):
+        small = estimate_render_cost(10, 10, 300, 300, "png")
+        large = estimate_render_cost(10, 10, 2000, 2000, "png")
+        self.assertAlmostEqual(large - small, 32.0 * (4.0 - 0.09))
+        self.assertEqual(
+            estimate_render_cost(10, 10, 300, 300, "svg"),
+            estimate_render_cost(10, 10, 2000, 2000, "svg"),
+        )
+
+    def test_unknown_format_is_priced_as_png(self):
+        self.assertEqual(
+            estimate_render_cost(10, 10, 300, 300, "bmp"),
+            estimate_render_cost(10, 10, 300, 300, "png"),
+        )
+
+    def test_cheap_threshold(self):
+        cheap = settings.RENDER_ADMISSION_CHEAP_COST
+        # A drug-sized molecule as a thumbnail skips admission...
+        self.assertLessEqual(estimate_render_cost(30, 32, 300, 300, "png"), cheap)
+        self.assertLessEqual(estimate_render_cost(30, 32, 300, 300, "svg"), cheap)
+        # ...large images and large molecules do not.
+        self.assertGreater(estimate_render_cost(30, 32, 1000, 1000, "png"), cheap)
+        self.assertGreater(estimate_render_cost(300, 320, 2000, 2000, "pdf"), cheap)
+        self.assertGreater(estimate_render_cost(150, 160, 300, 300, "svg"), cheap)
+
+
+@override_settings(RENDER_ADMISSION_CHEAP_COST=0)
+class RendererAdmissionTests(SimpleTestCase):
+    def test_queued_render_does_not_hold_a_session(self):
+        pool = IndigoPool()
+        controller = AdmissionController(1, 4, 0.3)
+        renderer = ChemicalRenderer(
+            pool=pool,
+            cache=LRURenderCache(0),
+            flights=SingleFlight(enabled=False),
+            admission=controller,
+        )
+        release, thread = hold_slot(controller)
+        errors = []
+
+        def render():
+            try:
+                renderer.render_smiles("CCO", 600, 600, "png")
+            except RenderRejected as e:
+                errors.append(e)
+
+        try:
+            worker = threading.Thread(target=render)
+            worker.start()
+            wait_until(lambda: controller.stats()["queued"] == 1)
+            self.assertEqual(pool.stats()["in_use"], 0)
+            worker.join()
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(pool.stats()["recycled"], 0)
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+class ShedResponseTests(TestCase):
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def test_rejected_render_returns_503_with_retry_after(self):
+        renderer = mock.Mock()
+        renderer.canonical_smiles.return_value = "CCO"
+        renderer.render_key.return_value = "key"
+        renderer.render_smiles.side_effect = RenderRejected("busy", retry_after=2.5)
+        with mock.patch(
+            "chemicals.views.chemical.get_chemical_renderer", return_value=renderer
+        ):
+            response = self.client.get("/api/v1/answer/", {"smiles": "CCO"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertEqual(response.json(), {"error": "busy"})
@@ -0,0 +1,178 @@
+import io
+import json
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from chemicals.services.batch import (
+    build_zip_archive,
+    render_batch,
+    render_batch_item,
+    stream_zip_archive,
+)
+from chemicals.services.rate_limit import get_rate_limit_store
+from django.test import SimpleTestCase, TestCase, override_settings
+
+
+def item(smiles: str, image_format: str = "png") -> dict:
+    return {"smiles": smiles, "width": 200, "height": 200, "format": image_format}
+
+
+def read_archive(data: bytes) -> tuple[list[dict], set[str]]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return json.loads(archive.read("manifest.json")), set(archive.namelist())
+
+
+class BatchManifestTests(SimpleTestCase):
+    def setUp(self):
+        self.results = [
+            render_batch_item(item("CCO")),
+            render_batch_item(item("C1CC")),
+            render_batch_item(item("C(C)(C)(C)(C)C", "svg")),
+            render_batch_item(item("c1ccccc1", "svg")),
+        ]
+
+    def test_syntax_errors_are_reported_per_item(self):
+        self.assertTrue(self.results[1]["error"].startswith("Invalid SMILES: "))
+        self.assertNotIn("image", self.results[1])
+
+    def test_manifest_lists_files_and_errors(self):
+        manifest, names = read_archive(build_zip_archive(self.results))
+        self.assertEqual([entry["index"] for entry in manifest], [1, 2, 3, 4])
+        self.assertEqual(manifest[0]["file"], "0001.png")
+        self.assertEqual(manifest[1]["smiles"], "C1CC")
+        self.assertIn("Unclosed ring bond", manifest[1]["error"])
+        self.assertNotIn("file", manifest[1])
+        for entry in manifest:
+            self.assertNotIn("image", entry)
+            self.assertEqual("file" in entry, "error" not in entry)
+            if "file" in entry:
+                self.assertIn(entry["file"], names)
+        self.assertEqual(
+            names,
+            {"manifest.json"}
+            | {entry["file"] for entry in manifest if "file" in entry},
+        )
+
+    def test_streamed_archive_matches(self):
+        streamed = b"".join(stream_zip_archive(iter(self.results)))
+        self.assertEqual(
+            read_archive(streamed), read_archive(build_zip_archive(self.results))
+        )
+
+
+class CrashingExecutor:
+    """Executor whose worker died before running the second item."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, item):
+        self.submitted += 1
+        future = Future()
+        if self.submitted == 2:
+            future.set_exception(BrokenProcessPool("worker died"))
+        else:
+            future.set_result(fn(item))
+        return future
+
+
+@override_settings(RENDER_TIMEOUT=0.2)
+class RenderBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        reset = mock.patch("chemicals.services.batch.reset_render_executor")
+        self.reset = reset.start()
+        self.addCleanup(reset.stop)
+
+    def use_executor(self, executor):
+        patcher = mock.patch(
+            "chemicals.services.batch.get_render_executor", return_value=executor
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stuck_on(self, smiles):
+        """render_batch_item that hangs on ``smiles`` until the test ends."""
+        # Registered after the executor's shutdown, so it runs before it.
+        self.addCleanup(self.release.set)
+
+        def render(batch_item):
+            if batch_item["smiles"] == smiles:
+                self.release.wait(5)
+            return render_batch_item(batch_item)
+
+        return mock.patch("chemicals.services.batch.render_batch_item", render)
+
+    def test_results_keep_item_order(self):
+        executor = ThreadPoolExecutor(2)
+        self.addCleanup(executor.shutdown)
+        self.use_executor(executor)
+        results = render_batch([item("CCO"), item("C1CC"), item("c1ccccc1")])
+        self.assertEqual([r["smiles"] for r in results], ["CCO", "C1CC", "c1ccccc1"])
+        self.assertIn("image", results[0])
+        self.assertIn("error", results[1])
+        self.reset.assert_not_called()
+
+    def test_stuck_render_times_out_per_item(self):
+        executor = ThreadPoolExecutor(1)
+        self.addCleanup(executor.shutdown)
+        self.use_executor(executor)
+        with self.stuck_on("CCC"):
+            results = render_batch([item("CCO"), item("CCC"), item("CCN")])
+        self.assertIn("image", results[0])
+        self.assertEqual(results[1]["error"], "Rendering timed out after 0.2 seconds")
+        self.assertEqual(results[2]["error"], "Not rendered: an earlier item timed out")
+        self.reset.assert_called_once_with(kill=True)
+
+        manifest, names = read_archive(build_zip_archive(results))
+        self.assertEqual(names, {"manifest.json", "0001.png"})
+        self.assertIn("timed out", manifest[1]["error"])
+
+    def test_crashed_worker_fails_only_its_items(self):
+        self.use_executor(CrashingExecutor())
+        results = render_batch([item("CCO"), item("CCN"), item("CCC")])
+        self.assertIn("image", results[0])
+        self.assertEqual(results[1]["error"], "Render worker exited unexpectedly")
+        self.assertIn("image", results[2])
+        self.reset.assert_called_once_with(kill=False)
+
+
+def render_in_process(items):
+    return [render_batch_item(batch_item) for batch_item in items]
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+@mock.patch("chemicals.views.chemical.render_batch", render_in_process)
+class BatchViewTests(TestCase):
+    url = "/api/v1/answer/batch/"
+
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, content_type="application/json")
+
+    def test_failed_items_do_not_fail_the_batch(self):
+        response = self.post(
+            {"items": [{"smiles": "CCO"}, {"smiles": "C1CC"}], "format": "svg"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        manifest, names = read_archive(response.content)
+        self.assertEqual(manifest[0]["file"], "0001.svg")
+        self.assertIn("error", manifest[1])
+        self.assertEqual(names, {"manifest.json", "0001.svg"})
+
+    def test_item_options_override_shared_ones(self):
+        response = self.post(
+            {"items": [{"smiles": "CCO", "width": 400, "format": "png"}], "width": 100}
+        )
+        manifest, _ = read_archive(response.content)
+        self.assertEqual((manifest[0]["width"], manifest[0]["format"]), (400, "png"))
+
+    def test_invalid_request_is_rejected(self):
+        self.assertEqual(self.post({"items": []}).status_code, 400)
+        self.assertEqual(self.post({"items": [{"width": 100}]}).status_code, 400)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from chemicals.services import DiskRenderCache
+from django.test import SimpleTestCase
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class DiskRenderCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def cache(self, **kwargs):
+        cache = DiskRenderCache(self.directory.name, **kwargs)
+        # Let background scans finish before the directory is removed.
+        self.addCleanup(wait_until, lambda: not cache._scan_pending)
+        return cache
+
+    def test_round_trip(self):
+        cache = self.cache()
+        cache.set("ab" * 32, (b"image", "image/png"))
+        data, content_type = cache.get("ab" * 32)
+        self.assertEqual((bytes(data), content_type), (b"image", "image/png"))
+        self.assertIsNone(cache.get("cd" * 32))
+
+    def test_writes_do_not_scan_the_directory(self):
+        cache = self.cache(max_bytes=10)
+        scans = []
+        with mock.patch.object(
+            DiskRenderCache,
+            "_scan",
+            side_effect=lambda: scans.append(threading.current_thread().name),
+        ):
+            cache.set("ab" * 32, (b"x" * 100, "image/png"))
+            wait_until(lambda: scans)
+        self.assertEqual(scans, ["render-disk-cache-evictor"])
+
+    def test_background_eviction_removes_least_recently_used(self):
+        keys = [f"{n:064x}" for n in range(5)]
+        writer = self.cache()
+        with mock.patch.object(DiskRenderCache, "_scan"):
+            for age, key in enumerate(keys):
+                writer.set(key, (b"x" * 500, "image/png"))
+                mtime = time.time() - 1000 * (age + 1)
+                os.utime(writer._path(key), (mtime, mtime))
+
+        cache = self.cache(max_bytes=2000)
+        cache.set("ff" * 32, (b"x" * 500, "image/png"))
+        wait_until(lambda: cache.stats()["evictions"] >= 1)
+        self.assertLessEqual(cache.stats()["bytes"], 2000 * cache.LOW_WATERMARK)
+        self.assertIsNotNone(cache.get("ff" * 32))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[-1]))
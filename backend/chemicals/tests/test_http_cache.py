@@ -0,0 +1,45 @@
+from chemicals.services.rate_limit import get_rate_limit_store
+from django.test import TestCase, override_settings
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+class RenderETagTests(TestCase):
+    url = "/api/v1/answer/"
+
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def get(self, smiles, **headers):
+        return self.client.get(self.url, {"smiles": smiles, "format": "svg"}, **headers)
+
+    def test_response_has_etag(self):
+        response = self.get("CCO")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"].startswith('"'))
+
+    def test_matching_etag_returns_304(self):
+        etag = self.get("CCO")["ETag"]
+        response = self.get("OCC", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_weak_etag_matches(self):
+        etag = self.get("CCO")["ETag"]
+        response = self.get("CCO", HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_options_do_not_match(self):
+        etag = self.get("CCO")["ETag"]
+        response = self.client.get(
+            self.url,
+            {"smiles": "CCO", "format": "svg", "width": 400},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_atom_maps_do_not_match_unmapped_etag(self):
+        etag = self.get("[CH2]C")["ETag"]
+        response = self.get("[CH2:1]C", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,44 @@
+from chemicals.services import ChemicalRenderer, LRURenderCache, RenderError
+from chemicals.services.exceptions import RenderRejected
+from chemicals.services.indigo_pool import IndigoPool
+from django.test import SimpleTestCase
+
+
+class IndigoPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = IndigoPool(max_uses=100)
+
+    def test_session_is_reused(self):
+        with self.pool.session() as first:
+            pass
+        with self.pool.session() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(self.pool.stats()["created"], 1)
+
+    def test_parse_error_keeps_session(self):
+        renderer = ChemicalRenderer(pool=self.pool, cache=LRURenderCache(0))
+        with self.pool.session() as session:
+            pass
+        for _ in range(3):
+            with self.assertRaises(RenderError):
+                renderer.render_smiles("C1C1.O")
+        with self.pool.session() as after:
+            pass
+        self.assertIs(after, session)
+        self.assertEqual(self.pool.stats()["recycled"], 0)
+
+    def test_shed_request_keeps_session(self):
+        with self.assertRaises(RenderRejected):
+            with self.pool.session():
+                raise RenderRejected("busy")
+        self.assertEqual(self.pool.stats()["recycled"], 0)
+
+    def test_unexpected_error_discards_session(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.session() as broken:
+                raise RuntimeError("native failure")
+        with self.pool.session() as replacement:
+            pass
+        self.assertIsNot(replacement, broken)
+        self.assertEqual(self.pool.stats()["recycled"], 1)
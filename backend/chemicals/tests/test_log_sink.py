@@ -0,0 +1,109 @@
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from chemicals.models import RequestLog
+from chemicals.services.log_sink import RequestLogSink
+from django.test import SimpleTestCase
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def record(smiles: str) -> RequestLog:
+    return RequestLog(method=RequestLog.Method.GET, smiles=smiles)
+
+
+class RequestLogSinkTests(SimpleTestCase):
+    def setUp(self):
+        # Batches are captured instead of written from the sink's thread.
+        self.batches = []
+        patcher = mock.patch.object(
+            RequestLog.objects,
+            "bulk_create",
+            side_effect=lambda batch: self.batches.append(
+                [log.smiles for log in batch]
+            ),
+        )
+        self.bulk_create = patcher.start()
+        self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spill_path = Path(directory.name) / "spill.jsonl"
+
+    def sink(self, **kwargs) -> RequestLogSink:
+        sink = RequestLogSink(**kwargs)
+        self.addCleanup(sink.close)
+        return sink
+
+    def spilled(self) -> list[str]:
+        lines = self.spill_path.read_text().splitlines()
+        return [json.loads(line)["fields"]["smiles"] for line in lines]
+
+    def test_flushes_full_batches(self):
+        sink = self.sink(batch_size=2, flush_interval=60)
+        for smiles in ("C", "CC", "CCC"):
+            sink.put(record(smiles))
+        wait_until(lambda: self.batches)
+        self.assertEqual(self.batches, [["C", "CC"]])
+        self.assertEqual(sink.stats()["queued"], 0)
+        self.assertEqual(sink.stats()["written"], 2)
+
+    def test_flushes_partial_batch_after_interval(self):
+        sink = self.sink(batch_size=100, flush_interval=0.05)
+        sink.put(record("C"))
+        wait_until(lambda: self.batches)
+        self.assertEqual(self.batches, [["C"]])
+
+    def test_close_flushes_pending_records(self):
+        sink = self.sink(batch_size=100, flush_interval=60)
+        for smiles in ("C", "CC", "CCC"):
+            sink.put(record(smiles))
+        sink.close()
+        self.assertEqual(self.batches, [["C", "CC", "CCC"]])
+        self.assertFalse(sink._thread.is_alive())
+
+    def fill_queue(self, sink: RequestLogSink, release: threading.Event):
+        """Block the writer in a flush, fill the queue, then overflow it."""
+        self.bulk_create.side_effect = lambda batch: release.wait(5)
+        sink.put(record("C"))
+        wait_until(lambda: self.bulk_create.called)
+        sink.put(record("CC"))
+        sink.put(record("CCC"))
+
+    def test_overflow_spills_to_jsonl(self):
+        sink = self.sink(max_queue=1, batch_size=1, spill_path=str(self.spill_path))
+        release = threading.Event()
+        self.fill_queue(sink, release)
+        release.set()
+        sink.close()
+        self.assertEqual(self.spilled(), ["CCC"])
+        self.assertEqual(sink.stats()["spilled"], 1)
+        self.assertEqual(sink.stats()["written"], 2)
+
+    def test_overflow_without_spill_file_drops(self):
+        sink = self.sink(max_queue=1, batch_size=1)
+        release = threading.Event()
+        self.fill_queue(sink, release)
+        release.set()
+        sink.close()
+        self.assertEqual(sink.stats()["dropped"], 1)
+        self.assertEqual(sink.stats()["written"], 2)
+
+    def test_failed_flush_spills_the_batch(self):
+        self.bulk_create.side_effect = RuntimeError("database is down")
+        sink = self.sink(batch_size=2, spill_path=str(self.spill_path))
+        sink.put(record("C"))
+        sink.put(record("CC"))
+        with self.assertLogs("chemicals.services.log_sink", "ERROR"):
+            sink.close()
+        self.assertEqual(self.spilled(), ["C", "CC"])
+        self.assertEqual(sink.stats()["written"], 0)
@@ -0,0 +1,40 @@
+from chemicals.models import RequestLog
+from chemicals.services import with_logging
+from chemicals.services.exceptions import RenderError, RenderRejected
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, override_settings
+
+
+class FailingView:
+    def __init__(self, error):
+        self.error = error
+
+    @with_logging("POST")
+    def post(self, request):
+        # Views may record a provisional outcome before rendering fails.
+        request._log_data = {"smiles": "CCO", "success": True, "error_message": ""}
+        raise self.error
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+class WithLoggingTests(TestCase):
+    def call(self, error):
+        request = RequestFactory().post("/api/v1/answer/")
+        request.user = AnonymousUser()
+        return FailingView(error).post(request)
+
+    def test_render_error_overrides_logged_outcome(self):
+        response = self.call(RenderError("bad smiles"))
+        self.assertEqual(response.status_code, 400)
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertEqual(record.error_message, "bad smiles")
+        self.assertEqual(record.smiles, "CCO")
+
+    def test_service_error_overrides_logged_outcome(self):
+        response = self.call(RenderRejected("busy", retry_after=1))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertEqual(record.error_message, "busy")
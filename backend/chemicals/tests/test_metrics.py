@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsAccessTests(TestCase):
+    url = "/metrics"
+
+    def test_anonymous_request_is_rejected(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_wrong_token_is_rejected(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_grants_access(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(METRICS_TOKEN="")
+    def test_empty_token_is_never_accepted(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(response.status_code, 401)
+
+    def test_staff_user_has_access(self):
+        user = get_user_model().objects.create_user("ops", password="x", is_staff=True)
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_regular_user_is_rejected(self):
+        user = get_user_model().objects.create_user("user", password="x")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
@@ -0,0 +1,51 @@
+import unittest
+from datetime import timedelta
+
+from chemicals.models import RequestLog
+from chemicals.services.partitioning import (
+    DEFAULT_SUFFIX,
+    create_monthly_partitions,
+    is_partitioned,
+    partition_request_log_table,
+    range_partitions,
+)
+from django.db import connection, transaction
+from django.test import TestCase
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "needs PostgreSQL")
+class MonthlyPartitionTests(TestCase):
+    def setUp(self):
+        partition_request_log_table(months_ahead=0)
+        self.table = RequestLog._meta.db_table
+
+    def count(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0]
+
+    def test_table_is_partitioned(self):
+        self.assertTrue(is_partitioned())
+        self.assertEqual(range_partitions()[0][0], f"{self.table}_legacy")
+
+    def test_rows_in_the_default_partition_move_to_the_new_month(self):
+        last_bound = range_partitions()[-1][1]
+        later = last_bound + timedelta(days=40)
+        RequestLog.objects.create(method="GET", smiles="CCO", created_at=later)
+        self.assertEqual(self.count(self.table + DEFAULT_SUFFIX), 1)
+
+        with transaction.atomic():
+            created = create_monthly_partitions(later)
+
+        self.assertEqual(
+            created,
+            [f"{self.table}_p{last_bound:%Y_%m}", f"{self.table}_p{later:%Y_%m}"],
+        )
+        self.assertEqual(self.count(self.table + DEFAULT_SUFFIX), 0)
+        self.assertEqual(self.count(created[-1]), 1)
+        self.assertEqual(RequestLog.objects.get().created_at, later)
+
+    def test_running_again_adds_nothing(self):
+        until = range_partitions()[-1][1] - timedelta(days=1)
+        with transaction.atomic():
+            self.assertEqual(create_monthly_partitions(until), [])
@@ -0,0 +1,78 @@
+import gc
+
+from chemicals.services import ChemicalRenderer, LRURenderCache
+from chemicals.services.indigo_pool import IndigoPool
+from chemicals.services.render_cache import PreparedMoleculeCache
+from django.test import SimpleTestCase
+
+SMILES = (
+    "[CH2:1]C",
+    "[CH3:1][CH2:2][OH:3]",
+    "[13CH4]",
+    "C[C@H](N)C(=O)O",
+    "F/C=C/F",
+    "c1ccccc1C(=O)O",
+    "CCO |$R1;;$|",
+    "[Na+].[Cl-]",
+)
+VARIANTS = (("png", 300, 300), ("svg", 300, 300), ("png", 640, 480), ("pdf", 200, 200))
+
+
+class PreparedMoleculeCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = IndigoPool()
+        self.prepared = PreparedMoleculeCache()
+        self.renderer = ChemicalRenderer(
+            pool=self.pool, cache=LRURenderCache(0), prepared=self.prepared
+        )
+
+    def direct(self, smiles, image_format, width, height):
+        return self.renderer._parse_and_render(
+            smiles, "smiles", width, height, image_format
+        )
+
+    def test_prepared_renders_match_direct_renders(self):
+        for smiles in SMILES:
+            for image_format, width, height in VARIANTS:
+                with self.subTest(smiles=smiles, format=image_format, width=width):
+                    expected = self.direct(smiles, image_format, width, height)
+                    # First call prepares the molecule, the second reuses it.
+                    for _ in range(2):
+                        self.assertEqual(
+                            self.renderer.render_smiles(
+                                smiles, width, height, image_format
+                            ),
+                            expected,
+                        )
+        self.assertGreater(self.prepared.stats()["hits"], 0)
+
+    def test_variants_match_direct_renders(self):
+        results = self.renderer.render_variants("[CH2:1]C", list(VARIANTS))
+        self.assertEqual(
+            results, [self.direct("[CH2:1]C", *variant) for variant in VARIANTS]
+        )
+
+    def test_atom_maps_are_kept(self):
+        self.renderer.render_smiles("[CH2]C", image_format="svg")
+        self.assertNotEqual(
+            self.renderer.render_smiles("[CH2:1]C", image_format="svg"),
+            self.renderer.render_smiles("[CH2]C", image_format="svg"),
+        )
+
+    def test_entries_are_dropped_with_their_session(self):
+        self.renderer.render_smiles("CCO")
+        self.assertEqual(self.prepared.stats()["entries"], 1)
+        self.pool.max_uses = 0
+        self.renderer.render_smiles("CCN")
+        gc.collect()
+        stats = self.prepared.stats()
+        self.assertEqual(stats["sessions"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_disabled_cache_still_renders(self):
+        renderer = ChemicalRenderer(
+            pool=self.pool, cache=LRURenderCache(0), prepared=PreparedMoleculeCache(0)
+        )
+        self.assertEqual(
+            renderer.render_smiles("[CH2:1]C"), self.direct("[CH2:1]C", "png", 300, 300)
+        )
@@ -0,0 +1,183 @@
+import multiprocessing
+import sys
+import tempfile
+import types
+from pathlib import Path
+from unittest import mock
+
+from chemicals.services.rate_limit import (
+    RedisRateLimitStore,
+    SQLiteRateLimitStore,
+    get_rate_limit_store,
+    sliding_window,
+)
+from chemicals.throttling import SharedAnonRateThrottle, SharedUserRateThrottle
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+def hit_many(path: str, hits: int) -> int:
+    """Hit one key from a separate process; return how many were allowed."""
+    store = SQLiteRateLimitStore(path)
+    return sum(store.hit("shared", 50, 3600)[0] for _ in range(hits))
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def test_below_limit_is_allowed(self):
+        self.assertEqual(sliding_window(0, 9, 30, 60, 10), (True, 0.0))
+        # Half of the previous window still overlaps: 10 * 0.5 + 4 < 10.
+        self.assertEqual(sliding_window(10, 4, 30, 60, 10), (True, 0.0))
+
+    def test_limit_is_exclusive(self):
+        self.assertEqual(sliding_window(10, 5, 30, 60, 10), (False, 6.0))
+        self.assertEqual(sliding_window(10, 0, 0, 60, 10), (False, 6.0))
+
+    def test_full_current_window_waits_for_the_next_one(self):
+        self.assertEqual(sliding_window(0, 10, 45, 60, 10), (False, 15.0))
+        self.assertEqual(sliding_window(3, 10, 45, 60, 10), (False, 15.0))
+
+    def test_wait_is_when_the_previous_share_has_decayed(self):
+        allowed, wait = sliding_window(100, 5, 50, 60, 10)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 7.6)
+        self.assertFalse(sliding_window(100, 5, 50 + wait - 1, 60, 10)[0])
+        self.assertTrue(sliding_window(100, 5, 50 + wait, 60, 10)[0])
+
+
+class SQLiteRateLimitStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / "throttle.sqlite3")
+        self.store = SQLiteRateLimitStore(self.path)
+
+    def hit_at(self, now: float, key: str = "key", limit: int = 3):
+        with mock.patch("chemicals.services.rate_limit.time.time", return_value=now):
+            return self.store.hit(key, limit, 60)
+
+    def test_limit_per_key(self):
+        self.assertEqual([self.hit_at(600)[0] for _ in range(4)], [1, 1, 1, 0])
+        self.assertEqual(self.hit_at(615), (False, 45))
+        self.assertTrue(self.hit_at(615, key="other")[0])
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(3):
+            self.hit_at(600)
+        # 3 * (1 - 20 / 60) = 2 counted from the previous window.
+        self.assertEqual(self.hit_at(680), (True, 0.0))
+        self.assertEqual(self.hit_at(680), (False, 20.0))
+        # Two windows later the old counts are gone.
+        self.assertEqual([self.hit_at(780)[0] for _ in range(4)], [1, 1, 1, 0])
+
+    def test_rejected_hits_are_not_counted(self):
+        for _ in range(10):
+            self.hit_at(600)
+        self.assertEqual(self.hit_at(660 + 40), (True, 0.0))
+
+    def test_counts_are_shared_between_processes(self):
+        context = multiprocessing.get_context("fork")
+        with context.Pool(4) as pool:
+            allowed = pool.starmap(hit_many, [(self.path, 20)] * 4)
+        self.assertEqual(sum(allowed), 50)
+        self.assertFalse(self.store.hit("shared", 50, 3600)[0])
+
+    def test_clear(self):
+        for _ in range(3):
+            self.hit_at(600)
+        self.store.clear()
+        self.assertTrue(self.hit_at(600)[0])
+
+
+class RedisRateLimitStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.script = mock.Mock()
+        client = mock.Mock()
+        client.register_script.return_value = self.script
+        redis = types.ModuleType("redis")
+        redis.Redis = mock.Mock()
+        redis.Redis.from_url.return_value = client
+        patcher = mock.patch.dict(sys.modules, {"redis": redis})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = RedisRateLimitStore("redis://localhost/0")
+
+    def test_allowed_hit(self):
+        self.script.return_value = [1, 0, 2, b"12.5"]
+        self.assertEqual(self.store.hit("anon_1", 10, 60), (True, 0.0))
+        kwargs = self.script.call_args.kwargs
+        self.assertEqual(kwargs["keys"], ["throttle:anon_1"])
+        self.assertEqual(kwargs["args"][1:], [60, 10])
+
+    def test_rejected_hit_computes_the_wait(self):
+        # Redis returns the counts; the wait is computed as for SQLite.
+        self.script.return_value = [0, 10, 5, b"30"]
+        self.assertEqual(self.store.hit("anon_1", 10, 60), (False, 6.0))
+
+    def test_missing_package(self):
+        with mock.patch.dict(sys.modules, {"redis": None}):
+            with self.assertRaises(ImproperlyConfigured):
+                RedisRateLimitStore("redis://localhost/0")
+
+
+class TwoPerMinuteAnon(SharedAnonRateThrottle):
+    rate = "2/min"
+
+
+class TwoPerMinuteUser(SharedUserRateThrottle):
+    rate = "2/min"
+
+
+class SharedThrottleTests(TestCase):
+    factory = APIRequestFactory()
+
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def request(self, user=None, ip="10.0.0.1"):
+        request = self.factory.get("/", REMOTE_ADDR=ip)
+        if user is not None:
+            force_authenticate(request, user)
+        request = Request(request)
+        request.user = user or AnonymousUser()
+        return request
+
+    def allowed(self, throttle_class, request) -> bool:
+        throttle = throttle_class()
+        result = throttle.allow_request(request, None)
+        self.last = throttle
+        return result
+
+    def test_anonymous_limit_is_per_address(self):
+        request = self.request()
+        self.assertEqual(
+            [self.allowed(TwoPerMinuteAnon, request) for _ in range(3)],
+            [True, True, False],
+        )
+        self.assertGreater(self.last.wait(), 0)
+        self.assertLessEqual(self.last.wait(), 60)
+        self.assertTrue(self.allowed(TwoPerMinuteAnon, self.request(ip="10.0.0.2")))
+
+    def test_allowed_request_has_no_wait(self):
+        self.assertTrue(self.allowed(TwoPerMinuteAnon, self.request()))
+        self.assertIsNone(self.last.wait())
+
+    def test_anonymous_throttle_ignores_users(self):
+        user = get_user_model().objects.create_user("alice", password="x")
+        for _ in range(3):
+            self.assertTrue(self.allowed(TwoPerMinuteAnon, self.request(user)))
+
+    def test_user_limit_is_per_user(self):
+        users = [
+            get_user_model().objects.create_user(name, password="x")
+            for name in ("alice", "bob")
+        ]
+        first = self.request(users[0])
+        self.assertEqual(
+            [self.allowed(TwoPerMinuteUser, first) for _ in range(3)],
+            [True, True, False],
+        )
+        self.assertTrue(self.allowed(TwoPerMinuteUser, self.request(users[1])))
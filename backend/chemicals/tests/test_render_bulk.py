@@ -0,0 +1,117 @@
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from chemicals.management.commands.render_bulk import input_fingerprint
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+SMILES = ["CCO ethanol", "c1ccccc1 benzene", "C1CC broken", "CC(=O)O", "[Cq] bad"]
+
+
+def in_process_executor(max_workers, **kwargs):
+    """Stand-in for the spawn process pool; runs chunks on threads."""
+    return ThreadPoolExecutor(max_workers)
+
+
+@mock.patch(
+    "chemicals.management.commands.render_bulk.ProcessPoolExecutor",
+    in_process_executor,
+)
+class RenderBulkTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.input = self.root / "input.smi"
+        self.input.write_text("\n".join(SMILES) + "\n")
+        self.output = self.root / "out"
+
+    def run_command(self, *args):
+        stdout = StringIO()
+        call_command(
+            "render_bulk",
+            str(self.input),
+            "--output-dir",
+            str(self.output),
+            "--chunk-size",
+            "2",
+            "--workers",
+            "2",
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def images(self) -> list[str]:
+        return sorted(path.name for path in self.output.rglob("*.png"))
+
+    def state_chunks(self) -> list[int]:
+        lines = (self.output / ".render_bulk.state").read_text().splitlines()
+        return sorted(int(line) for line in lines[1:])
+
+    def test_renders_items_and_records_chunks(self):
+        output = self.run_command()
+        self.assertEqual(
+            self.images(),
+            ["0000001_ethanol.png", "0000002_benzene.png", "0000004.png"],
+        )
+        self.assertEqual(self.state_chunks(), [1, 3, 5])
+        self.assertIn("Rendered 3 images from 5 items", output)
+
+    def test_failures_are_reported_per_item(self):
+        self.run_command()
+        lines = (self.output / "failures.jsonl").read_text().splitlines()
+        failures = sorted(
+            (json.loads(line) for line in lines), key=lambda f: f["index"]
+        )
+        self.assertEqual([f["index"] for f in failures], [3, 5])
+        self.assertEqual(failures[0]["name"], "broken")
+        self.assertEqual(failures[0]["smiles"], "C1CC")
+        self.assertEqual(failures[0]["format"], "png")
+        self.assertIn("cycle 1 not closed", failures[0]["error"])
+
+    def test_resume_skips_completed_chunks(self):
+        self.run_command()
+        # As if the run had been interrupted after the first chunk.
+        state = self.output / ".render_bulk.state"
+        header = state.read_text().splitlines()[0]
+        state.write_text(f"{header}\n1\n")
+        for path in self.output.rglob("*.png"):
+            path.unlink()
+
+        output = self.run_command()
+        self.assertIn("Resuming: 1 chunks already done", output)
+        self.assertIn("2 skipped as already done", output)
+        self.assertEqual(self.images(), ["0000004.png"])
+        self.assertEqual(self.state_chunks(), [1, 3, 5])
+
+    def test_finished_run_renders_nothing_again(self):
+        self.run_command()
+        output = self.run_command()
+        self.assertIn("Rendered 0 images from 0 items (5 skipped", output)
+
+    def test_changed_options_refuse_to_resume(self):
+        self.run_command()
+        with self.assertRaisesMessage(CommandError, "pass --restart"):
+            self.run_command("--width", "400")
+        output = self.run_command("--width", "400", "--restart")
+        self.assertIn("Rendered 3 images", output)
+        self.assertEqual(
+            len((self.output / "failures.jsonl").read_text().splitlines()), 2
+        )
+
+    def test_fingerprint_covers_the_input_file(self):
+        options = {
+            "formats": ["png"],
+            "width": 300,
+            "height": 300,
+            "chunk_size": 2,
+            "output_dir": str(self.output),
+        }
+        before = input_fingerprint([str(self.input)], options)
+        self.input.write_text("CCO\n")
+        self.assertNotEqual(input_fingerprint([str(self.input)], options), before)
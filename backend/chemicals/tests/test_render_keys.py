@@ -0,0 +1,58 @@
+from chemicals.services import ChemicalRenderer, LRURenderCache
+from chemicals.services.indigo_pool import IndigoPool
+from chemicals.services.render_cache import (
+    make_molfile_key,
+    make_render_key,
+    make_smiles_key,
+)
+from django.test import SimpleTestCase
+
+
+class RenderKeyTests(SimpleTestCase):
+    def setUp(self):
+        self.renderer = ChemicalRenderer(pool=IndigoPool(), cache=LRURenderCache(0))
+
+    def key(self, smiles, *options):
+        return self.renderer.smiles_render_key(smiles, *options)
+
+    def test_equivalent_smiles_share_a_key(self):
+        self.assertEqual(self.key("OCC"), self.key("CCO"))
+        self.assertEqual(self.key("C(C)O"), self.key("CCO"))
+
+    def test_key_is_stable(self):
+        self.assertEqual(
+            make_render_key("CCO", 300, 300, "png"),
+            make_render_key("CCO", 300, 300, "png"),
+        )
+        self.assertEqual(len(make_render_key("CCO", 300, 300, "png")), 64)
+
+    def test_options_change_the_key(self):
+        keys = {
+            self.key("CCO"),
+            self.key("CCO", 301, 300, "png"),
+            self.key("CCO", 300, 301, "png"),
+            self.key("CCO", 300, 300, "svg"),
+        }
+        self.assertEqual(len(keys), 4)
+
+    def test_default_options_are_normalized(self):
+        self.assertEqual(self.key("CCO"), self.key("CCO", 300, 300, "png"))
+        self.assertEqual(self.key("CCO", None, None, "bmp"), self.key("CCO"))
+
+    def test_atom_maps_are_part_of_the_key(self):
+        self.assertNotEqual(self.key("[CH2:1]C"), self.key("[CH2]C"))
+        self.assertNotEqual(self.key("[CH2:1]C"), self.key("[CH2:2]C"))
+
+    def test_cxsmiles_extension_is_part_of_the_key(self):
+        self.assertNotEqual(self.key("CCO |$R;;$|"), self.key("CCO"))
+
+    def test_plain_smiles_key_is_canonical(self):
+        self.assertEqual(make_smiles_key(" OCC ", "CCO"), "CCO")
+        self.assertEqual(make_smiles_key("[CH2:1]C", "[CH2]C"), "[CH2]C|[CH2:1]C")
+
+    def test_molfile_key_does_not_collide_with_smiles(self):
+        self.assertTrue(make_molfile_key("CCO").startswith("molfile:"))
+        self.assertNotEqual(
+            make_render_key(make_molfile_key("CCO"), 300, 300, "png"),
+            make_render_key("CCO", 300, 300, "png"),
+        )
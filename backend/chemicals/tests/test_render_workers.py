@@ -0,0 +1,66 @@
+import multiprocessing
+import threading
+from unittest import mock
+
+from chemicals.services.exceptions import (
+    RenderError,
+    RenderRejected,
+    RenderServiceError,
+    RenderTimeout,
+)
+from chemicals.services.render_workers import _raise_remote_error, serve_render_calls
+from django.test import SimpleTestCase
+
+
+class FailingRenderer:
+    def __init__(self, error):
+        self.error = error
+
+    def render_smiles(self, **kwargs):
+        raise self.error
+
+
+class WorkerErrorTests(SimpleTestCase):
+    def call_worker(self, error):
+        """Serve one call in a thread and return the worker's reply."""
+        parent, child = multiprocessing.Pipe()
+        with mock.patch(
+            "chemicals.services.chemical_renderer.ChemicalRenderer",
+            return_value=FailingRenderer(error),
+        ):
+            thread = threading.Thread(target=serve_render_calls, args=(child,))
+            thread.start()
+            parent.send(("render_smiles", {"smiles": "CCO"}))
+            (status, payload), _, _ = parent.recv()
+            parent.send(None)
+            thread.join()
+        self.assertEqual(status, "error")
+        return payload
+
+    def reraise(self, error):
+        payload = self.call_worker(error)
+        with self.assertRaises(Exception) as caught:
+            _raise_remote_error(*payload)
+        return caught.exception
+
+    def test_render_error_stays_a_client_error(self):
+        error = self.reraise(RenderError("bad SMILES"))
+        self.assertIs(type(error), RenderError)
+        self.assertEqual(str(error), "bad SMILES")
+
+    def test_rejected_keeps_retry_after(self):
+        error = self.reraise(RenderRejected("busy", retry_after=2.5))
+        self.assertIs(type(error), RenderRejected)
+        self.assertEqual(error.retry_after, 2.5)
+        self.assertEqual(error.status_code, 503)
+
+    def test_timeout_maps_to_504(self):
+        error = self.reraise(RenderTimeout("too slow"))
+        self.assertIs(type(error), RenderTimeout)
+        self.assertEqual(error.status_code, 504)
+
+    def test_unexpected_errors_are_server_errors(self):
+        with self.assertLogs("chemicals.services.render_workers", "ERROR"):
+            error = self.reraise(ValueError("boom"))
+        self.assertIs(type(error), RenderServiceError)
+        self.assertEqual(error.status_code, 500)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from chemicals.models import RequestLog, hash_smiles
+from chemicals.services.logging import log_request
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+
+class RequestLogCreatedAtTests(TestCase):
+    def test_set_when_record_is_built(self):
+        before = timezone.now()
+        record = RequestLog(method=RequestLog.Method.GET, smiles="CCO")
+        self.assertIsNotNone(record.created_at)
+        self.assertGreaterEqual(record.created_at, before)
+
+    def test_enqueue_time_survives_a_late_write(self):
+        enqueued_at = timezone.now() - timedelta(seconds=30)
+        record = RequestLog(
+            method=RequestLog.Method.GET, smiles="CCO", created_at=enqueued_at
+        )
+        RequestLog.objects.bulk_create([record])
+        self.assertEqual(RequestLog.objects.get().created_at, enqueued_at)
+
+
+class RequestLogSmilesHashTests(TestCase):
+    def log(self, smiles, canonical, count=1):
+        for _ in range(count):
+            RequestLog.objects.create(
+                method=RequestLog.Method.GET,
+                smiles=smiles,
+                smiles_hash=hash_smiles(canonical) if canonical else None,
+            )
+
+    def test_hash_is_fixed_width(self):
+        self.assertEqual(len(hash_smiles("C" * 5000)), 32)
+        self.assertNotEqual(hash_smiles("CCO"), hash_smiles("CCN"))
+
+    def test_for_canonical_smiles_matches_every_spelling(self):
+        self.log("CCO", "CCO")
+        self.log("OCC", "CCO")
+        self.log("CCN", "CCN")
+        queryset = RequestLog.objects.for_canonical_smiles("CCO")
+        self.assertEqual(
+            sorted(queryset.values_list("smiles", flat=True)), ["CCO", "OCC"]
+        )
+        # Looked up by the indexed hash, not the unindexed SMILES text.
+        sql = str(queryset.query)
+        self.assertIn(hash_smiles("CCO"), sql)
+        self.assertNotIn('"smiles" =', sql)
+
+    def test_count_by_smiles_groups_on_the_hash(self):
+        self.log("CCO", "CCO", count=2)
+        self.log("OCC", "CCO")
+        self.log("CCN", "CCN")
+        self.log("C1CC", None, count=5)
+        self.assertEqual(
+            list(RequestLog.objects.count_by_smiles()),
+            [
+                {"smiles_hash": hash_smiles("CCO"), "requests": 3},
+                {"smiles_hash": hash_smiles("CCN"), "requests": 1},
+            ],
+        )
+
+    @override_settings(REQUEST_LOG_ASYNC=False)
+    def test_log_request_hashes_the_canonical_smiles(self):
+        request = RequestFactory().get("/api/v1/answer/")
+        request.user = AnonymousUser()
+        log_request(request, "GET", smiles="OCC", canonical_smiles="CCO")
+        log_request(request, "GET", smiles="C1CC", success=False)
+        logged, failed = RequestLog.objects.order_by("id")
+        self.assertEqual(logged.smiles_hash, hash_smiles("CCO"))
+        self.assertEqual(failed.smiles_hash, hash_smiles("C1CC"))
@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta, timezone
+
+from chemicals.models import RequestLog, RequestLogDaily
+from chemicals.services.partitioning import parse_bound
+from chemicals.services.retention import day_start, percentile, rollup_day
+from django.test import SimpleTestCase, TestCase
+
+
+class PercentileTests(SimpleTestCase):
+    def test_empty_histogram(self):
+        self.assertIsNone(percentile([], 0.5))
+        self.assertIsNone(percentile([(10, 0)], 0.5))
+
+    def test_nearest_rank(self):
+        histogram = [(value, 1) for value in range(1, 101)]
+        self.assertEqual(percentile(histogram, 0.50), 50)
+        self.assertEqual(percentile(histogram, 0.95), 95)
+        self.assertEqual(percentile(histogram, 0.99), 99)
+        self.assertEqual(percentile(histogram, 1.0), 100)
+        self.assertEqual(percentile(histogram, 0.0), 1)
+
+    def test_counts_are_weights(self):
+        histogram = [(10, 90), (500, 9), (2000, 1)]
+        self.assertEqual(percentile(histogram, 0.50), 10)
+        self.assertEqual(percentile(histogram, 0.95), 500)
+        self.assertEqual(percentile(histogram, 0.99), 500)
+        self.assertEqual(percentile(histogram, 0.995), 2000)
+
+
+class PartitionBoundTests(SimpleTestCase):
+    def test_short_offset(self):
+        self.assertEqual(
+            parse_bound("2024-02-01 00:00:00+00"),
+            datetime(2024, 2, 1, tzinfo=timezone.utc),
+        )
+
+    def test_offset_is_converted_to_utc(self):
+        self.assertEqual(
+            parse_bound("2024-02-01 03:00:00+03"),
+            datetime(2024, 2, 1, tzinfo=timezone.utc),
+        )
+        self.assertEqual(
+            parse_bound("2024-02-01 05:30:00+05:30"),
+            datetime(2024, 2, 1, tzinfo=timezone.utc),
+        )
+
+
+class RollupDayTests(TestCase):
+    day = date(2024, 3, 10)
+
+    def log(self, response_time_ms, success=True, image_format="png", day=None):
+        record = RequestLog.objects.create(
+            method=RequestLog.Method.GET,
+            smiles="CCO",
+            image_format=image_format,
+            success=success,
+            response_time_ms=response_time_ms,
+        )
+        created_at = day_start(day or self.day) + timedelta(hours=12)
+        RequestLog.objects.filter(pk=record.pk).update(created_at=created_at)
+
+    def test_day_without_rows_is_skipped(self):
+        self.assertIsNone(rollup_day(self.day))
+        self.assertFalse(RequestLogDaily.objects.exists())
+
+    def test_rollup_counts_and_percentiles(self):
+        for value in range(1, 101):
+            self.log(value, success=value % 10 != 0)
+        self.log(None, success=False)
+        self.log(5000, day=self.day + timedelta(days=1))
+
+        self.assertEqual(rollup_day(self.day), 1)
+        rollup = RequestLogDaily.objects.get(day=self.day)
+        self.assertEqual(rollup.requests, 101)
+        self.assertEqual(rollup.errors, 11)
+        self.assertEqual(rollup.latency_count, 100)
+        self.assertEqual(rollup.latency_sum_ms, 5050)
+        self.assertEqual(
+            (rollup.p50_ms, rollup.p95_ms, rollup.p99_ms, rollup.max_ms),
+            (50, 95, 99, 100),
+        )
+
+    def test_rows_are_grouped_by_format(self):
+        self.log(10)
+        self.log(20, image_format="svg")
+        self.log(30, image_format="svg")
+        self.assertEqual(rollup_day(self.day), 2)
+        svg = RequestLogDaily.objects.get(day=self.day, image_format="svg")
+        self.assertEqual((svg.requests, svg.p50_ms, svg.max_ms), (2, 20, 30))
+
+    def test_rollup_is_recomputed(self):
+        self.log(10)
+        rollup_day(self.day)
+        self.log(20)
+        rollup_day(self.day)
+        rollup = RequestLogDaily.objects.get(day=self.day)
+        self.assertEqual(rollup.requests, 2)
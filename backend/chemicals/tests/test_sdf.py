@@ -0,0 +1,124 @@
+import gzip
+import io
+from unittest import mock
+
+from chemicals.models import RequestLog
+from chemicals.services.batch import render_molfile_item
+from chemicals.services.rate_limit import get_rate_limit_store
+from chemicals.services.sdf import iter_sdf_records
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+ETHANOL = b"""ethanol
+  -INDIGO-
+
+  3  2  0  0  0  0  0  0  0  0999 V2000
+    0.0000    0.0000    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0
+    1.2990    0.7500    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0
+    2.5981    0.0000    0.0000 O   0  0  0  0  0  0  0  0  0  0  0  0
+  1  2  1  0  0  0  0
+  2  3  1  0  0  0  0
+M  END
+> <NAME>
+ethanol
+
+$$$$
+"""
+BROKEN = b"""broken
+  not a molfile
+M  END
+$$$$
+"""
+
+
+def records(data: bytes, **kwargs) -> list[dict]:
+    return list(iter_sdf_records(io.BytesIO(data), **kwargs))
+
+
+class SdfRecordTests(SimpleTestCase):
+    def test_records_are_split(self):
+        parsed = records(ETHANOL + BROKEN)
+        self.assertEqual([record["index"] for record in parsed], [1, 2])
+        self.assertEqual([record["name"] for record in parsed], ["ethanol", "broken"])
+        self.assertIn("M  END", parsed[0]["molfile"])
+        self.assertNotIn("$$$$", parsed[0]["molfile"])
+
+    def test_gzip_is_decompressed(self):
+        self.assertEqual(
+            records(gzip.compress(ETHANOL + BROKEN)), records(ETHANOL + BROKEN)
+        )
+
+    def test_last_record_without_separator(self):
+        parsed = records(ETHANOL + BROKEN.replace(b"$$$$\n", b""))
+        self.assertEqual(len(parsed), 2)
+        self.assertIn("M  END", parsed[1]["molfile"])
+
+    def test_empty_file_and_trailing_blank_lines(self):
+        self.assertEqual(records(b""), [])
+        self.assertEqual(len(records(ETHANOL + b"\n\n")), 1)
+
+    def test_oversized_record_is_an_error(self):
+        parsed = records(ETHANOL + BROKEN, max_record_bytes=100)
+        self.assertEqual(parsed[0]["name"], "ethanol")
+        self.assertIn("exceeds 100 bytes", parsed[0]["error"])
+        self.assertNotIn("error", parsed[1])
+
+    def test_record_limit(self):
+        parsed = records(ETHANOL * 3, max_records=2)
+        self.assertEqual(len(parsed), 3)
+        self.assertIn("molfile", parsed[1])
+        self.assertIn("Record limit of 2", parsed[2]["error"])
+
+    def test_malformed_record_fails_alone(self):
+        options = {"width": 300, "height": 300, "format": "svg"}
+        good, bad = (
+            render_molfile_item({**record, **options})
+            for record in records(ETHANOL + BROKEN)
+        )
+        self.assertEqual(good["content_type"], "image/svg+xml")
+        self.assertNotIn("error", good)
+        self.assertEqual(bad["name"], "broken")
+        self.assertTrue(bad["error"])
+        self.assertNotIn("image", bad)
+
+    def test_oversized_record_is_not_rendered(self):
+        (record,) = records(ETHANOL, max_record_bytes=100)
+        result = render_molfile_item(
+            {**record, "width": 300, "height": 300, "format": "png"}
+        )
+        self.assertEqual(result["error"], record["error"])
+
+
+def render_in_process(items):
+    return map(render_molfile_item, items)
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+@mock.patch("chemicals.views.chemical.render_sdf_stream", render_in_process)
+class SdfViewLoggingTests(TestCase):
+    url = "/api/v1/answer/sdf/"
+
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def test_streamed_request_is_logged_with_stage_timings(self):
+        upload = SimpleUploadedFile("molecules.sdf", ETHANOL + BROKEN)
+        response = self.client.post(self.url, {"sdf": upload, "format": "svg"})
+        self.assertEqual(response.status_code, 200)
+        # Logged only once the archive has been streamed.
+        self.assertFalse(RequestLog.objects.exists())
+        b"".join(response.streaming_content)
+
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertEqual(record.error_message, "1 of 2 SDF records failed")
+        self.assertEqual(record.image_format, "svg")
+        self.assertIn("validate", record.stage_timings)
+        self.assertGreater(record.stage_timings["render"], 0)
+
+    def test_invalid_request_is_logged(self):
+        response = self.client.post(self.url, {"width": 10})
+        self.assertEqual(response.status_code, 400)
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertIn("validate", record.stage_timings)
@@ -0,0 +1,161 @@
+import fcntl
+import os
+import tempfile
+import threading
+import time
+import zlib
+from unittest import mock
+
+from chemicals.services.exceptions import RenderTimeout
+from chemicals.services.singleflight import LOCK_STRIPES, SingleFlight
+from django.test import SimpleTestCase
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class Call(threading.Thread):
+    """Run ``flight.do`` in a thread and keep its result or exception."""
+
+    def __init__(self, flight: SingleFlight, key: str, fn, recheck=None):
+        super().__init__()
+        self.flight, self.key, self.fn, self.recheck = flight, key, fn, recheck
+        self.result = self.error = None
+        self.start()
+
+    def run(self):
+        try:
+            self.result = self.flight.do(self.key, self.fn, self.recheck)
+        except Exception as e:
+            self.error = e
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def blocking(self, result=None, error=None):
+        """fn that blocks until ``self.release`` is set."""
+
+        def fn():
+            self.release.wait(5)
+            if error is not None:
+                raise error
+            return result
+
+        return mock.Mock(side_effect=fn)
+
+    def lead_and_wait(self, flight: SingleFlight, fn):
+        leader = Call(flight, "key", fn)
+        wait_until(lambda: flight.stats()["in_flight"] == 1)
+        waiter = Call(flight, "key", fn)
+        wait_until(lambda: flight.stats()["waiting"] == 1)
+        return leader, waiter
+
+    def test_waiter_shares_the_leaders_result(self):
+        flight = SingleFlight()
+        result = object()
+        fn = self.blocking(result)
+        leader, waiter = self.lead_and_wait(flight, fn)
+        self.release.set()
+        leader.join()
+        waiter.join()
+        self.assertIs(leader.result, result)
+        self.assertIs(waiter.result, result)
+        fn.assert_called_once()
+        stats = flight.stats()
+        self.assertEqual((stats["leaders"], stats["coalesced"]), (1, 1))
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_exception_reaches_waiters(self):
+        flight = SingleFlight()
+        error = ValueError("bad molecule")
+        leader, waiter = self.lead_and_wait(flight, self.blocking(error=error))
+        self.release.set()
+        leader.join()
+        waiter.join()
+        self.assertIs(leader.error, error)
+        self.assertIs(waiter.error, error)
+
+    def test_waiter_times_out(self):
+        flight = SingleFlight(timeout=0.05)
+        leader, waiter = self.lead_and_wait(flight, self.blocking("done"))
+        waiter.join()
+        self.assertIsInstance(waiter.error, RenderTimeout)
+        self.release.set()
+        leader.join()
+        self.assertEqual(leader.result, "done")
+        self.assertEqual(flight.stats()["timeouts"], 1)
+
+    def test_finished_key_runs_again(self):
+        flight = SingleFlight()
+        fn = mock.Mock(side_effect=["first", "second"])
+        self.assertEqual(flight.do("key", fn), "first")
+        self.assertEqual(flight.do("key", fn), "second")
+
+    def test_disabled_runs_every_call(self):
+        flight = SingleFlight(enabled=False)
+        fn = self.blocking("done")
+        calls = [Call(flight, "key", fn) for _ in range(2)]
+        wait_until(lambda: fn.call_count == 2)
+        self.release.set()
+        for call in calls:
+            call.join()
+        self.assertEqual(flight.stats()["leaders"], 0)
+
+
+class SingleFlightLockTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.lock_dir = directory.name
+
+    def hold_lock(self, key: str) -> int:
+        """Take the key's stripe lock as another process would."""
+        stripe = zlib.crc32(key.encode("utf-8")) % LOCK_STRIPES
+        fd = os.open(
+            os.path.join(self.lock_dir, f"{stripe:04d}.lock"), os.O_RDWR | os.O_CREAT
+        )
+        self.addCleanup(os.close, fd)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def test_leader_rechecks_after_waiting_for_the_lock(self):
+        flight = SingleFlight(lock_dir=self.lock_dir)
+        fd = self.hold_lock("key")
+        fn = mock.Mock(return_value="rendered")
+        call = Call(flight, "key", fn, recheck=lambda: "from cache")
+        wait_until(lambda: flight.stats()["lock_waits"] == 1)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        call.join()
+        self.assertEqual(call.result, "from cache")
+        fn.assert_not_called()
+        self.assertEqual(flight.stats()["recheck_hits"], 1)
+
+    def test_recheck_miss_runs_fn(self):
+        flight = SingleFlight(lock_dir=self.lock_dir)
+        fd = self.hold_lock("key")
+        call = Call(flight, "key", lambda: "rendered", recheck=lambda: None)
+        wait_until(lambda: flight.stats()["lock_waits"] == 1)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        call.join()
+        self.assertEqual(call.result, "rendered")
+        self.assertEqual(flight.stats()["recheck_hits"], 0)
+
+    def test_uncontended_lock_skips_recheck(self):
+        flight = SingleFlight(lock_dir=self.lock_dir)
+        recheck = mock.Mock(return_value="from cache")
+        self.assertEqual(flight.do("key", lambda: "rendered", recheck), "rendered")
+        recheck.assert_not_called()
+
+    def test_lock_timeout_renders_anyway(self):
+        flight = SingleFlight(timeout=0.05, lock_dir=self.lock_dir)
+        self.hold_lock("key")
+        self.assertEqual(flight.do("key", lambda: "rendered", lambda: None), "rendered")
+        self.assertEqual(flight.stats()["lock_timeouts"], 1)
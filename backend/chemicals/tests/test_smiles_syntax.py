@@ -0,0 +1,108 @@
+from unittest import mock
+
+from chemicals.models import RequestLog
+from chemicals.services import ChemicalRenderer, LRURenderCache, RenderError
+from chemicals.services.indigo_pool import IndigoPool
+from chemicals.services.rate_limit import get_rate_limit_store
+from chemicals.services.smiles_syntax import smiles_syntax_error
+from django.test import SimpleTestCase, TestCase, override_settings
+
+# Input Indigo accepts, so the check must accept it too.
+ACCEPTED = [
+    "CCO",
+    "c1ccccc1",
+    "C%10CC%10",
+    "C1CC%01",
+    "C1.C1",
+    "CC(C",
+    "[NH4+]",
+    "[O--]",
+    "[Fe+3]",
+    "[cH-]1cccc1",
+    "[13CH4]",
+    "[2H]O",
+    "[C@@H](F)(Cl)Br",
+    "[se]1cccc1",
+    "[te]",
+    "[bi]",
+    "[*]C",
+    "CCO |$R;;$|",
+]
+
+# Input Indigo rejects, with the start of the reason the check gives.
+REJECTED = [
+    ("C1CC", "Unclosed ring bond 1"),
+    ("C%1CC%1", "Unexpected character '%'"),
+    ("C)C", "Unmatched ')'"),
+    ("[C", "Unclosed '['"),
+    ("1CC", "Ring bond at position 1 has no atom before it"),
+    ("[Xx]", "Unknown element 'Xx'"),
+    ("[ge]", "Unknown element 'ge'"),
+    ("CC?", "Unexpected character '?'"),
+]
+
+
+class SmilesSyntaxTests(SimpleTestCase):
+    def test_accepted(self):
+        for smiles in ACCEPTED:
+            with self.subTest(smiles=smiles):
+                self.assertIsNone(smiles_syntax_error(smiles))
+
+    def test_rejected(self):
+        for smiles, reason in REJECTED:
+            with self.subTest(smiles=smiles):
+                self.assertTrue(smiles_syntax_error(smiles).startswith(reason))
+
+
+class RejectedSmilesCacheTests(SimpleTestCase):
+    def test_indigo_rejection_is_not_parsed_again(self):
+        renderer = ChemicalRenderer(pool=IndigoPool(), cache=LRURenderCache(0))
+        # Well-formed for the syntax check, but not for Indigo.
+        smiles = "[Cq]"
+        self.assertIsNone(smiles_syntax_error(smiles))
+        with self.assertRaises(RenderError) as first:
+            renderer.render_smiles(smiles)
+
+        with mock.patch.object(renderer, "_load_molecule") as load_molecule:
+            with self.assertRaises(RenderError) as second:
+                renderer.render_smiles(smiles)
+        load_molecule.assert_not_called()
+        self.assertEqual(str(second.exception), str(first.exception))
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+class InvalidSmilesLoggingTests(TestCase):
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def assert_logged_failure(self, response, smiles):
+        self.assertEqual(response.status_code, 400)
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertEqual(record.smiles, smiles)
+        self.assertIn("Invalid SMILES", record.error_message)
+
+    def test_get(self):
+        response = self.client.get("/api/v1/answer/", {"smiles": "C1CC"})
+        self.assert_logged_failure(response, "C1CC")
+
+    def test_post(self):
+        response = self.client.post("/api/v1/answer/", {"smiles": "C1CC"})
+        self.assert_logged_failure(response, "C1CC")
+
+    def test_variants(self):
+        response = self.client.post(
+            "/api/v1/answer/variants/",
+            {"smiles": "C1CC", "variants": [{"width": 100, "height": 100}]},
+            content_type="application/json",
+        )
+        self.assert_logged_failure(response, "C1CC")
+
+    def test_batch(self):
+        response = self.client.post(
+            "/api/v1/answer/batch/", {"items": []}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertIsNotNone(record.error_message)
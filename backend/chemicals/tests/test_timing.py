@@ -0,0 +1,104 @@
+import re
+import threading
+from unittest import mock
+
+from chemicals.models import RequestLog
+from chemicals.services.rate_limit import get_rate_limit_store
+from chemicals.services.timing import (
+    StageTimer,
+    activate_timer,
+    current_timer,
+    timed_stage,
+)
+from django.test import SimpleTestCase, TestCase, override_settings
+
+SERVER_TIMING_ENTRY = re.compile(r"^[a-z_]+;dur=\d+\.\d\d$")
+
+
+class StageTimerTests(SimpleTestCase):
+    def test_stages_accumulate(self):
+        timer = StageTimer()
+        with mock.patch("chemicals.services.timing.time.perf_counter") as clock:
+            clock.side_effect = [1.0, 1.002, 2.0, 2.0005]
+            with timer.stage("parse"):
+                pass
+            with timer.stage("parse"):
+                pass
+        self.assertAlmostEqual(timer.stages["parse"], 2.5)
+
+    def test_merge_adds_worker_stages(self):
+        timer = StageTimer()
+        timer.add("render", 1.0)
+        timer.merge({"render": 2.0, "layout": 0.5})
+        self.assertEqual(timer.stages, {"render": 3.0, "layout": 0.5})
+
+    def test_as_dict_rounds(self):
+        timer = StageTimer()
+        timer.add("parse", 1.23456)
+        self.assertEqual(timer.as_dict(), {"parse": 1.235})
+
+    def test_server_timing_format(self):
+        timer = StageTimer()
+        timer.add("validate", 0.5)
+        timer.add("render", 12.345)
+        header = timer.server_timing()
+        entries = header.split(", ")
+        self.assertEqual(entries[:2], ["validate;dur=0.50", "render;dur=12.35"])
+        self.assertTrue(entries[2].startswith("total;dur="))
+        for entry in entries:
+            self.assertRegex(entry, SERVER_TIMING_ENTRY)
+
+    def test_timed_stage_without_timer_is_a_noop(self):
+        self.assertIsNone(current_timer())
+        with timed_stage("parse"):
+            pass
+
+    def test_timed_stage_records_on_the_active_timer(self):
+        timer = StageTimer()
+        with activate_timer(timer):
+            with timed_stage("parse"):
+                pass
+        self.assertIn("parse", timer.stages)
+        self.assertIsNone(current_timer())
+
+    def test_timers_are_per_thread(self):
+        timer = StageTimer()
+        seen = []
+        with activate_timer(timer):
+            thread = threading.Thread(target=lambda: seen.append(current_timer()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [None])
+
+    def test_activation_nests(self):
+        outer, inner = StageTimer(), StageTimer()
+        with activate_timer(outer):
+            with activate_timer(inner):
+                self.assertIs(current_timer(), inner)
+            self.assertIs(current_timer(), outer)
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+class ServerTimingHeaderTests(TestCase):
+    url = "/api/v1/answer/"
+
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_header_lists_request_stages(self):
+        response = self.client.get(self.url, {"smiles": "CCO", "format": "svg"})
+        self.assertEqual(response.status_code, 200)
+        entries = response["Server-Timing"].split(", ")
+        names = [entry.split(";")[0] for entry in entries]
+        self.assertEqual(names[-1], "total")
+        self.assertTrue({"auth", "throttle", "validate"} <= set(names))
+        for entry in entries:
+            self.assertRegex(entry, SERVER_TIMING_ENTRY)
+        self.assertIn("validate", RequestLog.objects.get().stage_timings)
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_header_can_be_disabled(self):
+        response = self.client.get(self.url, {"smiles": "CCO", "format": "svg"})
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn("validate", RequestLog.objects.get().stage_timings)
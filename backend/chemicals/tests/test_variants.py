@@ -0,0 +1,82 @@
+import io
+import json
+import zipfile
+
+from chemicals.models import RequestLog, hash_smiles
+from chemicals.services.rate_limit import get_rate_limit_store
+from django.test import TestCase, override_settings
+
+
+@override_settings(REQUEST_LOG_ASYNC=False)
+class VariantsViewTests(TestCase):
+    url = "/api/v1/answer/variants/"
+
+    def setUp(self):
+        get_rate_limit_store().clear()
+
+    def post(self, smiles, variants):
+        return self.client.post(
+            self.url,
+            {"smiles": smiles, "variants": variants},
+            content_type="application/json",
+        )
+
+    def test_archive_has_every_variant(self):
+        response = self.post(
+            "OCC",
+            [
+                {"width": 100, "height": 100},
+                {"width": 400, "height": 300, "format": "svg"},
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            self.assertEqual(
+                [(e["file"], e["width"], e["height"]) for e in manifest],
+                [("0001.png", 100, 100), ("0002.svg", 400, 300)],
+            )
+            self.assertTrue(archive.read("0001.png").startswith(b"\x89PNG"))
+            self.assertIn(b"<svg", archive.read("0002.svg"))
+
+    def test_manifest_urls_serve_the_same_images(self):
+        response = self.post("CCO", [{"width": 120, "height": 80, "format": "svg"}])
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            (entry,) = json.loads(archive.read("manifest.json"))
+            image = archive.read(entry["file"])
+        self.assertEqual(
+            entry["url"], "/api/v1/answer/?smiles=CCO&width=120&height=80&format=svg"
+        )
+        served = self.client.get(entry["url"])
+        self.assertEqual(served.status_code, 200)
+        self.assertEqual(served.content, image)
+
+    def test_request_is_logged_with_the_first_variant(self):
+        self.post(
+            "OCC",
+            [
+                {"width": 100, "height": 100, "format": "svg"},
+                {"width": 400, "height": 400},
+            ],
+        )
+        record = RequestLog.objects.get()
+        self.assertTrue(record.success)
+        self.assertEqual(record.smiles, "OCC")
+        self.assertEqual(record.smiles_hash, hash_smiles("CCO"))
+        self.assertEqual(
+            (record.width, record.height, record.image_format), (100, 100, "svg")
+        )
+
+    def test_smiles_rejected_by_indigo_fails_the_request(self):
+        # Well-formed for the syntax check; Indigo rejects the element.
+        response = self.post("[Cq]", [{"width": 100, "height": 100}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Failed to render molecule", response.json()["error"])
+        record = RequestLog.objects.get()
+        self.assertFalse(record.success)
+        self.assertEqual(record.smiles, "[Cq]")
+        self.assertEqual(record.width, 100)
+
+    def test_empty_variants_are_rejected(self):
+        self.assertEqual(self.post("CCO", []).status_code, 400)
@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from chemicals.models import RequestLog, hash_smiles
+from chemicals.services.warming import popular_render_requests, warm_render_cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+
+def log(smiles, canonical=None, count=1, **fields):
+    for _ in range(count):
+        RequestLog.objects.create(
+            method="GET",
+            smiles=smiles,
+            smiles_hash=hash_smiles(canonical or smiles),
+            **fields,
+        )
+
+
+class PopularRenderRequestsTests(TestCase):
+    def test_spellings_of_one_molecule_count_together(self):
+        log("CCO", count=2)
+        log("OCC", canonical="CCO", count=2)
+        log("c1ccccc1", count=3)
+        items = popular_render_requests(limit=10, window_hours=1)
+        self.assertEqual(
+            [(item["smiles"], item["hits"]) for item in items],
+            [("CCO", 4), ("c1ccccc1", 3)],
+        )
+
+    def test_defaults_are_applied_and_options_kept_apart(self):
+        log("CCO", count=2)
+        log("CCO", width=600, height=600, image_format="svg")
+        items = popular_render_requests(limit=10, window_hours=1)
+        self.assertEqual(
+            [(i["width"], i["height"], i["format"], i["hits"]) for i in items],
+            [(300, 300, "png", 2), (600, 600, "svg", 1)],
+        )
+
+    def test_only_recent_successful_smiles_renders(self):
+        log("CCO")
+        log("CCN", count=2, success=False)
+        log("CCC", count=2, has_molfile=True)
+        log("CCCl", count=2, created_at=timezone.now() - timedelta(hours=2))
+        items = popular_render_requests(limit=10, window_hours=1)
+        self.assertEqual([item["smiles"] for item in items], ["CCO"])
+
+    def test_limit(self):
+        log("CCO", count=2)
+        log("CCN")
+        self.assertEqual(len(popular_render_requests(limit=1, window_hours=1)), 1)
+
+
+def items(count: int) -> list[dict]:
+    return [
+        {"smiles": "C" * n, "width": 300, "height": 300, "format": "png"}
+        for n in range(1, count + 1)
+    ]
+
+
+class WarmRenderCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(1)
+        self.addCleanup(self.executor.shutdown)
+
+    def warm(self, render, **budgets):
+        options = {"concurrency": 1, "time_budget": 60, "byte_budget": 10**6}
+        return warm_render_cache(
+            items(5), self.executor, render=render, **{**options, **budgets}
+        )
+
+    def test_renders_everything_within_budget(self):
+        stats = self.warm(lambda item: {"bytes": 100})
+        self.assertEqual(stats["rendered"], 5)
+        self.assertEqual(stats["bytes"], 500)
+        self.assertEqual((stats["skipped"], stats["stopped"]), (0, None))
+
+    def test_byte_budget_stops_new_renders(self):
+        stats = self.warm(lambda item: {"bytes": 100}, byte_budget=250)
+        self.assertEqual(stats["rendered"], 3)
+        self.assertEqual((stats["skipped"], stats["stopped"]), (2, "bytes"))
+
+    def test_time_budget_stops_new_renders(self):
+        clock = [0.0]
+
+        def render(item):
+            clock[0] += 1.0
+            return {"bytes": 100}
+
+        with mock.patch(
+            "chemicals.services.warming.time.monotonic", side_effect=lambda: clock[0]
+        ):
+            stats = self.warm(render, time_budget=2.5)
+        self.assertEqual(stats["rendered"], 3)
+        self.assertEqual((stats["skipped"], stats["stopped"]), (2, "time"))
+
+    def test_failures_are_counted(self):
+        stats = self.warm(
+            lambda item: {"bytes": 0, "error": "bad"}
+            if item["smiles"] == "CC"
+            else {"bytes": 10}
+        )
+        self.assertEqual((stats["rendered"], stats["failed"]), (4, 1))
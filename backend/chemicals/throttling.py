@@ -0,0 +1,38 @@
+from chemicals.services.rate_limit import get_rate_limit_store
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+
+class SharedRateThrottleMixin:
+    """
+    Keep throttle counters in the shared rate limit store.
+
+    DRF's throttles keep a list of request timestamps in Django's cache,
+    which is per-process LocMem here and costs O(limit) per request. This
+    uses a sliding-window counter that all workers on the host (or in
+    Redis) share, with O(1) work per request.
+    """
+
+    def allow_request(self, request, view):
+        self._wait = None
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, wait = get_rate_limit_store().hit(
+            self.key, self.num_requests, self.duration
+        )
+        if not allowed:
+            self._wait = wait
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class SharedAnonRateThrottle(SharedRateThrottleMixin, AnonRateThrottle):
+    """Anonymous request limit (``anon`` rate), shared across workers."""
+
+
+class SharedUserRateThrottle(SharedRateThrottleMixin, UserRateThrottle):
+    """Authenticated request limit (``user`` rate), shared across workers."""
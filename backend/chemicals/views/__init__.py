@@ -1,8 +1,19 @@
 from chemicals.views.auth import UserRegistrationView
-from chemicals.views.chemical import ChemicalRenderView, index_view
+from chemicals.views.chemical import (
+    ChemicalBatchRenderView,
+    ChemicalRenderView,
+    ChemicalSdfRenderView,
+    ChemicalVariantsRenderView,
+    index_view,
+)
+from chemicals.views.metrics import metrics_view
 
 __all__ = [
     "UserRegistrationView",
     "ChemicalRenderView",
+    "ChemicalBatchRenderView",
+    "ChemicalSdfRenderView",
+    "ChemicalVariantsRenderView",
     "index_view",
+    "metrics_view",
 ]
@@ -1,37 +1,85 @@
-from chemicals.schemas import get_extended_schema, post_extended_schema
-from chemicals.serializers import ChemicalPostSerializer, SmilesGetSerializer
+import time
+
+from chemicals.schemas import (
+    batch_extended_schema,
+    get_extended_schema,
+    post_extended_schema,
+    sdf_extended_schema,
+    variants_extended_schema,
+)
+from chemicals.serializers import (
+    BatchRenderSerializer,
+    ChemicalPostSerializer,
+    SdfRenderSerializer,
+    SmilesGetSerializer,
+    VariantsRenderSerializer,
+)
 from chemicals.services import ChemicalRenderer, get_chemical_renderer, with_logging
-from django.http import HttpResponse
+from chemicals.services.batch import (
+    build_zip_archive,
+    render_batch,
+    render_sdf_stream,
+    stream_zip_archive,
+)
+from chemicals.services.http_cache import (
+    etag_for_render_key,
+    is_not_modified,
+    patch_render_cache_headers,
+)
+from chemicals.services.logging import log_request
+from chemicals.services.render_cache import make_smiles_key
+from chemicals.services.sdf import iter_sdf_records
+from chemicals.services.timing import activate_timer, current_timer, timed_stage
+from chemicals.throttling import SharedAnonRateThrottle
+from chemicals.views.mixins import StageTimingMixin
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.http import urlencode
 from rest_framework import status
-from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
 from rest_framework.views import APIView
 
 
+def invalid_request(request, serializer, **log_data) -> Response:
+    """Return the 400 for a request that failed validation and log it as failed."""
+    data = serializer.initial_data
+    smiles = data.get("smiles") if hasattr(data, "get") else None
+    request._log_data = {
+        "smiles": smiles if isinstance(smiles, str) else None,
+        **log_data,
+        "success": False,
+        "error_message": str(serializer.errors),
+    }
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 def index_view(request):
     """Render the main page with the chemical structure form."""
     return render(request, "chemicals/index.html")
 
 
-class ChemicalRenderView(APIView):
+class ChemicalRenderView(StageTimingMixin, APIView):
     """
     API endpoint for rendering chemical structures.
     Supports both SMILES strings and MOL files for chemical structure visualization.
     """
 
     parser_classes = [MultiPartParser, FormParser]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [SharedAnonRateThrottle]
 
     @get_extended_schema
     @with_logging("GET")
     def get(self, request):
         """Render a chemical structure from SMILES string via GET request."""
-        serializer = SmilesGetSerializer(data=request.query_params)
+        with timed_stage("validate"):
+            serializer = SmilesGetSerializer(data=request.query_params)
+            is_valid = serializer.is_valid()
 
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not is_valid:
+            return invalid_request(request, serializer)
 
         data = serializer.validated_data
         image_format = data.get("format") or ChemicalRenderer.DEFAULT_FORMAT
@@ -44,7 +92,21 @@ class ChemicalRenderView(APIView):
             "image_format": image_format,
         }
 
-        image_bytes, content_type = get_chemical_renderer().render_smiles(
+        renderer = get_chemical_renderer()
+        canonical = renderer.canonical_smiles(data["smiles"])
+        request._log_data["canonical_smiles"] = canonical
+        etag = etag_for_render_key(
+            renderer.render_key(
+                make_smiles_key(data["smiles"], canonical),
+                width=data.get("width"),
+                height=data.get("height"),
+                image_format=image_format,
+            )
+        )
+        if is_not_modified(request, etag):
+            return patch_render_cache_headers(HttpResponseNotModified(), etag)
+
+        image_bytes, content_type = renderer.render_smiles(
             smiles=data["smiles"],
             width=data.get("width"),
             height=data.get("height"),
@@ -52,6 +114,7 @@ class ChemicalRenderView(APIView):
         )
 
         response = HttpResponse(image_bytes, content_type=content_type)
+        patch_render_cache_headers(response, etag)
 
         # Add download header if requested
         download = request.query_params.get("download", "").lower() in ("true", "1")
@@ -65,10 +128,14 @@ class ChemicalRenderView(APIView):
     @with_logging("POST")
     def post(self, request):
         """Render a chemical structure from SMILES string or MOL file via POST request."""
-        serializer = ChemicalPostSerializer(data=request.data)
+        with timed_stage("validate"):
+            serializer = ChemicalPostSerializer(data=request.data)
+            is_valid = serializer.is_valid()
 
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not is_valid:
+            return invalid_request(
+                request, serializer, has_molfile="molfile" in request.data
+            )
 
         data = serializer.validated_data
         image_format = data.get("format") or ChemicalRenderer.DEFAULT_FORMAT
@@ -85,12 +152,15 @@ class ChemicalRenderView(APIView):
         }
 
         if smiles:
-            image_bytes, content_type = get_chemical_renderer().render_smiles(
+            renderer = get_chemical_renderer()
+            image_bytes, content_type = renderer.render_smiles(
                 smiles=smiles,
                 width=data.get("width"),
                 height=data.get("height"),
                 image_format=image_format,
             )
+            # Just parsed by the render, so normally a canonical cache hit.
+            request._log_data["canonical_smiles"] = renderer.canonical_smiles(smiles)
         else:
             molfile_content = data["molfile"].read().decode("utf-8")
             image_bytes, content_type = get_chemical_renderer().render_molfile(
@@ -101,3 +171,204 @@ class ChemicalRenderView(APIView):
             )
 
         return HttpResponse(image_bytes, content_type=content_type)
+
+
+class ChemicalBatchRenderView(StageTimingMixin, APIView):
+    """
+    API endpoint for rendering many SMILES strings in one request.
+    Items are rendered in parallel on a process pool and returned as a ZIP archive.
+    """
+
+    parser_classes = [JSONParser]
+    throttle_classes = [SharedAnonRateThrottle]
+
+    @batch_extended_schema
+    @with_logging("POST")
+    def post(self, request):
+        """Render a batch of SMILES strings into a ZIP archive."""
+        with timed_stage("validate"):
+            serializer = BatchRenderSerializer(data=request.data)
+            is_valid = serializer.is_valid()
+
+        if not is_valid:
+            return invalid_request(request, serializer)
+
+        data = serializer.validated_data
+        results = render_batch(data["items"])
+        failed = sum(1 for result in results if "error" in result)
+
+        # One summary log record for the whole batch
+        request._log_data = {
+            "width": data.get("width"),
+            "height": data.get("height"),
+            "image_format": data.get("format"),
+            "success": not failed,
+            "error_message": (
+                f"{failed} of {len(results)} batch items failed" if failed else None
+            ),
+        }
+
+        response = HttpResponse(
+            build_zip_archive(results), content_type="application/zip"
+        )
+        response["Content-Disposition"] = 'attachment; filename="molecules.zip"'
+        return response
+
+
+class ChemicalVariantsRenderView(StageTimingMixin, APIView):
+    """
+    API endpoint for rendering one SMILES string in several sizes and formats.
+    The molecule is parsed and laid out once; the variants are returned as a ZIP archive.
+    """
+
+    parser_classes = [JSONParser]
+    throttle_classes = [SharedAnonRateThrottle]
+
+    @variants_extended_schema
+    @with_logging("POST")
+    def post(self, request):
+        """Render size and format variants of a SMILES string into a ZIP archive."""
+        with timed_stage("validate"):
+            serializer = VariantsRenderSerializer(data=request.data)
+            is_valid = serializer.is_valid()
+
+        if not is_valid:
+            return invalid_request(request, serializer)
+
+        data = serializer.validated_data
+        smiles = data["smiles"]
+        variants = [
+            (variant["format"], variant["width"], variant["height"])
+            for variant in data["variants"]
+        ]
+        # One log record per request; the first variant stands for its options.
+        first = data["variants"][0]
+        request._log_data = {
+            "smiles": smiles,
+            "width": first["width"],
+            "height": first["height"],
+            "image_format": first["format"],
+        }
+
+        renderer = get_chemical_renderer()
+        images = renderer.render_variants(smiles, variants)
+        request._log_data["canonical_smiles"] = renderer.canonical_smiles(smiles)
+
+        url = reverse("answer")
+        results = [
+            {
+                "smiles": smiles,
+                "width": width,
+                "height": height,
+                "format": image_format,
+                # Served from the render cache the variant was just stored in.
+                "url": f"{url}?"
+                + urlencode(
+                    {
+                        "smiles": smiles,
+                        "width": width,
+                        "height": height,
+                        "format": image_format,
+                    }
+                ),
+                "image": bytes(image_bytes),
+                "content_type": content_type,
+            }
+            for (image_format, width, height), (image_bytes, content_type) in zip(
+                variants, images
+            )
+        ]
+
+        response = HttpResponse(
+            build_zip_archive(results), content_type="application/zip"
+        )
+        response["Content-Disposition"] = 'attachment; filename="variants.zip"'
+        return response
+
+
+class ChemicalSdfRenderView(StageTimingMixin, APIView):
+    """
+    API endpoint for rendering every record of an uploaded SDF file.
+    Records are read from the upload one at a time and the ZIP is streamed back.
+    """
+
+    parser_classes = [MultiPartParser]
+    throttle_classes = [SharedAnonRateThrottle]
+
+    @sdf_extended_schema
+    def post(self, request):
+        """Render an SDF file into a streamed ZIP archive."""
+        start_time = time.time()
+        with timed_stage("validate"):
+            serializer = SdfRenderSerializer(data=request.data)
+            is_valid = serializer.is_valid()
+
+        if not is_valid:
+            log_request(
+                request=request,
+                method="POST",
+                has_molfile=True,
+                success=False,
+                error_message=str(serializer.errors),
+                response_time_ms=int((time.time() - start_time) * 1000),
+            )
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        options = {
+            "width": data["width"],
+            "height": data["height"],
+            "format": data["format"],
+        }
+        records = (
+            {**record, **options}
+            for record in iter_sdf_records(
+                data["sdf"],
+                max_records=settings.RENDER_SDF_MAX_RECORDS,
+                max_record_bytes=settings.RENDER_SDF_MAX_RECORD_BYTES,
+            )
+        )
+
+        # The archive is streamed after dispatch has deactivated the timer,
+        # so the stream times its renders and logs on it explicitly.
+        timer = current_timer()
+
+        def stream():
+            # Logged once the archive is complete, or the client went away.
+            total = failed = 0
+            error_message = None
+            results = render_sdf_stream(records)
+            try:
+                while True:
+                    # Time spent waiting for the client is not render time.
+                    with timer.stage("render"):
+                        result = next(results, None)
+                    if result is None:
+                        break
+                    total += 1
+                    failed += "error" in result
+                    yield result
+            except Exception as e:
+                error_message = f"Failed to render SDF: {e}"
+                raise
+            finally:
+                if error_message is None and failed:
+                    error_message = f"{failed} of {total} SDF records failed"
+                with activate_timer(timer):
+                    log_request(
+                        request=request,
+                        method="POST",
+                        has_molfile=True,
+                        width=options["width"],
+                        height=options["height"],
+                        image_format=options["format"],
+                        success=error_message is None,
+                        error_message=error_message,
+                        response_time_ms=int((time.time() - start_time) * 1000),
+                    )
+
+        response = StreamingHttpResponse(
+            stream_zip_archive(stream()), content_type="application/zip"
+        )
+        response["Content-Disposition"] = 'attachment; filename="molecules.zip"'
+        return response
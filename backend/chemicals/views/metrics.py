@@ -0,0 +1,30 @@
+import hmac
+
+from chemicals.services.metrics import get_metrics_registry
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def has_metrics_access(request) -> bool:
+    """Staff users, or scrapers sending ``Authorization: Bearer METRICS_TOKEN``."""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    if not token:
+        return False
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def metrics_view(request):
+    """Expose metrics aggregated over all worker processes for Prometheus."""
+    registry = get_metrics_registry()
+    if not registry.enabled:
+        raise Http404
+    if not has_metrics_access(request):
+        response = HttpResponse("Authentication required.\n", status=401)
+        response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,29 @@
+from chemicals.services.timing import StageTimer, activate_timer, timed_stage
+from django.conf import settings
+
+
+class StageTimingMixin:
+    """
+    Time request stages on a per-request StageTimer.
+
+    Authentication and throttling are timed here; serializer validation,
+    renderer stages and the log write add themselves through
+    ``timed_stage``. The timings are stored on the RequestLog row and, with
+    SERVER_TIMING_ENABLED, returned in a Server-Timing header.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        timer = StageTimer()
+        with activate_timer(timer):
+            response = super().dispatch(request, *args, **kwargs)
+        if settings.SERVER_TIMING_ENABLED:
+            response["Server-Timing"] = timer.server_timing()
+        return response
+
+    def perform_authentication(self, request):
+        with timed_stage("auth"):
+            super().perform_authentication(request)
+
+    def check_throttles(self, request):
+        with timed_stage("throttle"):
+            super().check_throttles(request)
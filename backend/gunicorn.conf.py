@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration for production serving.
+
+Usage: gunicorn -c gunicorn.conf.py
+
+Django and the Indigo native libraries are loaded once in the master
+(``preload_app``) and shared copy-on-write by the forked workers. Indigo
+calls release the GIL, so each worker serves requests from a thread pool.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = "backend.wsgi:application"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Workers and threads
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+preload_app = True
+
+# Recycling and timeouts
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Logging
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    """Preload Indigo, and optionally warm the render cache, before workers fork."""
+    from chemicals.services import (
+        ChemicalRenderer,
+        IndigoPool,
+        LRURenderCache,
+        warm_up_renderer,
+    )
+
+    # Uncached, throwaway sessions: nothing here should be shared via fork.
+    warm_up_renderer(ChemicalRenderer(pool=IndigoPool(), cache=LRURenderCache(0)))
+    server.log.info("Indigo renderer preloaded")
+
+    from django.conf import settings
+
+    if settings.RENDER_WARM_ON_START:
+        from chemicals.services import get_render_cache
+        from chemicals.services.warming import warm_in_process
+
+        # Fill the shared render cache, which every forked worker inherits;
+        # the Indigo sessions used for it are again throwaway.
+        stats = warm_in_process(
+            ChemicalRenderer(pool=IndigoPool(), cache=get_render_cache())
+        )
+        server.log.info(
+            "Render cache warmed: %d of %d renders, %d bytes in %.1fs",
+            stats["rendered"],
+            stats["candidates"],
+            stats["bytes"],
+            stats["elapsed"],
+        )
+
+
+def post_worker_init(worker):
+    """Warm up the worker's own renderer (and render subprocesses, if any)."""
+    from chemicals.services import warm_up_renderer
+
+    warm_up_renderer()
+
+
+def worker_exit(server, worker):
+    """Flush buffered request logs before the worker goes away."""
+    from chemicals.services import get_request_log_sink
+
+    get_request_log_sink().close()
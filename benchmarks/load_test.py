@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+"""
+HTTP load test for the chemical rendering API.
+
+Drives GET and POST /api/v1/answer/ with molecules from ``corpus/`` at a
+given concurrency and reports throughput and latency percentiles per
+method, input, format and size. Results are written as JSON and can be
+compared against a stored baseline to catch regressions.
+
+Examples:
+    # Start a local gunicorn server and benchmark it
+    python benchmarks/load_test.py --start-server --output results.json
+
+    # Benchmark a running server and compare with a baseline
+    python benchmarks/load_test.py --url http://localhost:8000 \\
+        --baseline benchmarks/baseline.json --tolerance 0.15
+
+    # Defeat the render caches by varying the image width per request
+    python benchmarks/load_test.py --start-server --cold
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent / "backend"
+CORPUS_DIR = BENCH_DIR / "corpus"
+API_PATH = "/api/v1/answer/"
+
+
+def load_smiles_corpus(path: Path = CORPUS_DIR / "smiles.tsv") -> list[tuple]:
+    """Read (name, smiles) pairs, skipping comments and blank lines."""
+    corpus = []
+    for line in path.read_text().splitlines():
+        if line and not line.startswith("#"):
+            name, smiles = line.split("\t")[:2]
+            corpus.append((name, smiles))
+    return corpus
+
+
+def load_molfile_corpus(path: Path = CORPUS_DIR / "molfiles") -> list[tuple]:
+    """Read (name, molfile content) pairs from .mol files."""
+    return [(mol.stem, mol.read_text()) for mol in sorted(path.glob("*.mol"))]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def encode_multipart(fields: dict, files: dict) -> tuple[bytes, str]:
+    """Encode form fields and files as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            f"\r\n\r\n{value}\r\n".encode()
+        )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: chemical/x-mdl-molfile'
+            f"\r\n\r\n".encode()
+            + content.encode()
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Client:
+    """Keep-alive HTTP connection per benchmark thread."""
+
+    def __init__(self, base_url: str, headers: dict):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.headers = headers
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body=None, headers=None) -> int:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn_class = (
+                http.client.HTTPSConnection
+                if self.https
+                else http.client.HTTPConnection
+            )
+            conn = self._local.conn = conn_class(self.host, self.port, timeout=60)
+        try:
+            conn.request(
+                method, path, body=body, headers={**self.headers, **(headers or {})}
+            )
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def build_scenarios(args) -> list[dict]:
+    """Cross product of method/input, format and size requested on the CLI."""
+    scenarios = []
+    for method in args.methods:
+        inputs = ["smiles"] if method == "GET" else args.post_inputs
+        for source in inputs:
+            for image_format in args.formats:
+                for size in args.sizes:
+                    scenarios.append(
+                        {
+                            "name": f"{method} {source} {image_format} {size}px",
+                            "method": method,
+                            "source": source,
+                            "format": image_format,
+                            "size": size,
+                        }
+                    )
+    return scenarios
+
+
+def run_scenario(client: Client, scenario: dict, args, smiles, molfiles) -> dict:
+    """Send ``args.requests`` requests at ``args.concurrency`` and summarise."""
+    items = smiles if scenario["source"] == "smiles" else molfiles
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    errors = 0
+    lock = threading.Lock()
+
+    def one(index: int):
+        nonlocal errors
+        name, payload = items[index % len(items)]
+        width = scenario["size"] + (index % 997 if args.cold else 0)
+        options = {
+            "width": width,
+            "height": scenario["size"],
+            "format": scenario["format"],
+        }
+        started = time.perf_counter()
+        try:
+            if scenario["method"] == "GET":
+                status = client.request(
+                    "GET", f"{API_PATH}?{urlencode({'smiles': payload, **options})}"
+                )
+            elif scenario["source"] == "smiles":
+                body = urlencode({"smiles": payload, **options})
+                status = client.request(
+                    "POST",
+                    API_PATH,
+                    body=body,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                )
+            else:
+                body, content_type = encode_multipart(
+                    options, {"molfile": (f"{name}.mol", payload)}
+                )
+                status = client.request(
+                    "POST", API_PATH, body=body, headers={"Content-Type": content_type}
+                )
+        except (http.client.HTTPException, OSError):
+            with lock:
+                errors += 1
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed_ms)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status >= 400:
+                errors += 1
+
+    for index in range(args.warmup):
+        one(index)
+    latencies.clear()
+    statuses.clear()
+    errors = 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(one, range(args.requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        **scenario,
+        "requests": args.requests,
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions beyond ``tolerance`` (a fraction)."""
+    regressions = []
+    previous = {s["name"]: s for s in baseline.get("scenarios", [])}
+    for current in results["scenarios"]:
+        before = previous.get(current["name"])
+        if before is None:
+            continue
+        if before["rps"] and current["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{current['name']}: rps {before['rps']} -> {current['rps']}"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            if before[key] and current[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f"{current['name']}: {key} {before[key]} -> {current[key]}"
+                )
+    return regressions
+
+
+def print_table(scenarios: list[dict]):
+    header = f"{'scenario':<32} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>5}"
+    print(header)
+    print("-" * len(header))
+    for s in scenarios:
+        print(
+            f"{s['name']:<32} {s['rps']:>9.1f} {s['p50_ms']:>9.1f} "
+            f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['errors']:>5}"
+        )
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    """Start gunicorn for the backend with throttling effectively disabled."""
+    env = {
+        **os.environ,
+        "DJANGO_CONFIGURATION": os.getenv("DJANGO_CONFIGURATION", "Development"),
+        "DEBUG": "False",
+        "SECRET_KEY": os.getenv("SECRET_KEY", "benchmark-secret-key"),
+        "THROTTLE_ANON_RATE": "1000000/s",
+        "THROTTLE_USER_RATE": "1000000/s",
+        "GUNICORN_WORKERS": str(workers),
+        "GUNICORN_ACCESS_LOG": "",
+    }
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "--noinput", "-v0"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", f"{API_PATH}?smiles=C")
+            conn.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Benchmark server did not start within 60 seconds")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--start-server",
+        action="store_true",
+        help="Start a local gunicorn server for the run (uses --port)",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Per scenario")
+    parser.add_argument("--methods", nargs="+", default=["GET", "POST"])
+    parser.add_argument(
+        "--post-inputs", nargs="+", default=["smiles", "molfile"], dest="post_inputs"
+    )
+    parser.add_argument("--formats", nargs="+", default=["png", "svg", "pdf"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[300, 1000])
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Vary the width per request so the render caches do not hit",
+    )
+    parser.add_argument("--token", help="JWT access token sent as Bearer")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Compare with this results JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Allowed relative regression against the baseline (default 0.10)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    smiles = load_smiles_corpus()
+    molfiles = load_molfile_corpus()
+
+    server = None
+    base_url = args.url
+    if args.start_server:
+        server = start_server(args.port, args.server_workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    client = Client(base_url, headers)
+    try:
+        scenarios = []
+        for scenario in build_scenarios(args):
+            result = run_scenario(client, scenario, args, smiles, molfiles)
+            scenarios.append(result)
+            print(f"done: {result['name']}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "url": base_url,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "cold": args.cold,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "scenarios": scenarios,
+    }
+    print_table(scenarios)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        regressions = compare_with_baseline(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())